@@ -2,6 +2,12 @@
 # protect-branch.sh
 # Claude Code Hooks 用の保護ブランチガードスクリプト
 # 配置場所: ~/.claude/hooks/protect-branch.sh
+#
+# ツール呼び出しごとに実行されるため、外部プロセスの起動を最小限にしている:
+# - 現在のブランチは .git/HEAD を直接読んで判定する（worktree / gitdir ファイル対応）
+#   detached HEAD や特殊な構成の場合のみ git にフォールバックする
+# - パターン照合はシェル内の正規表現（[[ =~ ]]）で行う
+# - 設定ファイルから組み立てた正規表現はキャッシュし、mtime で無効化する
 
 # -u を削除（未設定変数でエラー終了しない）
 set -eo pipefail
@@ -16,25 +22,179 @@ log_debug() {
     fi
 }
 
-# スクリプトのディレクトリを取得
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+# スクリプトのディレクトリを取得（サブシェル・dirname を使わない）
+SCRIPT_PATH="${BASH_SOURCE[0]}"
+[[ "$SCRIPT_PATH" == */* ]] || SCRIPT_PATH="./${SCRIPT_PATH}"
+SCRIPT_DIR="${SCRIPT_PATH%/*}"
+[[ "$SCRIPT_DIR" == /* ]] || SCRIPT_DIR="${PWD}/${SCRIPT_DIR}"
 CONFIG_FILE="${SCRIPT_DIR}/protect-branch.conf"
 
+# 組み立て済み設定のキャッシュ（スクリプト配置ディレクトリごと）
+CACHE_DIR="${XDG_CACHE_HOME:-$HOME/.cache}/claude-hooks"
+CACHE_FILE="${CACHE_DIR}/protect-branch${SCRIPT_DIR//\//_}.cache"
+
 # デフォルト設定
 PROTECTED_BRANCHES="main|master|develop"
 DANGEROUS_OPS="git commit|git push|git merge"
 BLOCK_MESSAGE="保護ブランチへの直接操作は禁止です。新しいブランチを作成してください。"
 
-# 設定ファイルが存在すれば読み込む
-if [[ -f "$CONFIG_FILE" ]]; then
+# シェル内で照合する packed-refs の上限（バイト）。超える場合は git rev-parse で判定する
+PACKED_REFS_MAX_BYTES=65536
+
+# 正規表現パターンを構築
+compile_patterns() {
+    BRANCH_PATTERN="^(${PROTECTED_BRANCHES})$"
+    OPS_PATTERN="(${DANGEROUS_OPS})"
+}
+
+# 組み立て済みの設定をキャッシュする
+write_config_cache() {
+    local conf_debug_set="$1"
+    local tmp_file="${CACHE_FILE}.$$"
+
+    {
+        mkdir -p "$CACHE_DIR" && chmod 700 "$CACHE_DIR" && {
+            # declare -p は関数内で source するとローカル変数になるため代入文で出力
+            printf '%s=%q\n' \
+                BRANCH_PATTERN "$BRANCH_PATTERN" \
+                OPS_PATTERN "$OPS_PATTERN" \
+                BLOCK_MESSAGE "$BLOCK_MESSAGE"
+            if [[ -n "$conf_debug_set" ]]; then
+                printf '%s=%q\n' DEBUG "$DEBUG"
+            fi
+        } > "$tmp_file" && mv -f "$tmp_file" "$CACHE_FILE"
+    } 2>/dev/null || rm -f "$tmp_file" 2>/dev/null || true
+}
+
+load_config() {
+    compile_patterns
+
+    # 設定ファイルが存在しなければデフォルト設定を使用
+    if [[ ! -f "$CONFIG_FILE" ]]; then
+        return 0
+    fi
+
     # セキュリティ検証：設定ファイルの所有者が現在のユーザーであることを確認
-    if [[ "$(stat -f '%u' "$CONFIG_FILE" 2>/dev/null || stat -c '%u' "$CONFIG_FILE" 2>/dev/null)" != "$(id -u)" ]]; then
+    if [[ ! -O "$CONFIG_FILE" ]]; then
         log_debug "WARNING: Config file owner mismatch, skipping load"
-    else
+        return 0
+    fi
+
+    # キャッシュが設定ファイル・本スクリプトより新しければそれを使う（外部プロセス不要）
+    if [[ -O "$CACHE_FILE" && "$CACHE_FILE" -nt "$CONFIG_FILE" && "$CACHE_FILE" -nt "$SCRIPT_PATH" ]]; then
         # shellcheck source=/dev/null
-        source "$CONFIG_FILE"
+        source "$CACHE_FILE"
+        return 0
     fi
-fi
+
+    # 設定ファイル内で DEBUG が設定されたかを判別するため一時的に退避
+    local env_debug="$DEBUG"
+    unset DEBUG
+
+    # shellcheck source=/dev/null
+    source "$CONFIG_FILE"
+
+    local conf_debug_set=""
+    if [[ -n "${DEBUG+x}" ]]; then
+        conf_debug_set=1
+    else
+        DEBUG="$env_debug"
+    fi
+
+    compile_patterns
+    write_config_cache "$conf_debug_set"
+}
+
+# カレントディレクトリから上位へ .git を探す（git_dir, common_dir を設定）
+find_git_dir() {
+    local dir="$PWD"
+    local line=""
+
+    while true; do
+        if [[ -d "$dir/.git" ]]; then
+            git_dir="$dir/.git"
+            break
+        fi
+        if [[ -f "$dir/.git" ]]; then
+            # worktree / submodule: "gitdir: <path>"
+            IFS= read -r line < "$dir/.git" || [[ -n "$line" ]] || return 1
+            [[ "$line" == "gitdir: "* ]] || return 1
+            git_dir="${line#gitdir: }"
+            [[ "$git_dir" == /* ]] || git_dir="$dir/$git_dir"
+            break
+        fi
+        if [[ -z "$dir" || "$dir" == "/" ]]; then
+            return 1
+        fi
+        dir="${dir%/*}"
+    done
+
+    # worktree の場合、refs は共通ディレクトリにある
+    common_dir="$git_dir"
+    if [[ -f "$git_dir/commondir" ]]; then
+        line=""
+        IFS= read -r line < "$git_dir/commondir" || [[ -n "$line" ]] || return 1
+        [[ "$line" == /* ]] && common_dir="$line" || common_dir="$git_dir/$line"
+    fi
+    return 0
+}
+
+# ブランチが実在するか（未コミットのブランチでは git rev-parse は失敗するため、同じ判定にそろえる）
+branch_ref_exists() {
+    local name="$1"
+    local packed=""
+
+    [[ -f "$common_dir/refs/heads/$name" ]] && return 0
+    [[ -f "$common_dir/packed-refs" ]] || return 1
+    # 読み込みは PACKED_REFS_MAX_BYTES までに限る。それより大きい packed-refs は
+    # シェルで全体を照合するより git のほうが速いため、不明（1）として git に任せる
+    IFS= read -r -d '' -n "$PACKED_REFS_MAX_BYTES" packed < "$common_dir/packed-refs" || true
+    (( ${#packed} < PACKED_REFS_MAX_BYTES )) || return 1
+    [[ "$packed" == *" refs/heads/${name}"$'\n'* ]]
+}
+
+# 現在のブランチを取得（Git リポジトリ外の場合は空）
+resolve_current_branch() {
+    local git_dir="" common_dir="" head=""
+
+    # GIT_DIR 等で明示されている場合は git の解決に任せる
+    if [[ -z "${GIT_DIR:-}" && -z "${GIT_WORK_TREE:-}" ]] && find_git_dir && [[ -f "$git_dir/HEAD" ]]; then
+        IFS= read -r head < "$git_dir/HEAD" || true
+        if [[ "$head" == "ref: refs/heads/"* ]]; then
+            local name="${head#ref: refs/heads/}"
+            if branch_ref_exists "$name"; then
+                current_branch="$name"
+                log_debug "Branch resolved from $git_dir/HEAD"
+                return 0
+            fi
+        fi
+    fi
+
+    # detached HEAD・未コミットのブランチ・特殊な構成は git にフォールバック
+    log_debug "Falling back to git rev-parse"
+    current_branch=$(git rev-parse --abbrev-ref HEAD 2>/dev/null || echo "")
+}
+
+# いずれかの行が正規表現にマッチするか（grep と同じ行単位の判定）
+matches_any_line() {
+    local text="$1"
+    local regex="$2"
+    local line
+
+    if [[ "$text" != *$'\n'* ]]; then
+        [[ "$text" =~ $regex ]]
+        return
+    fi
+
+    while IFS= read -r line; do
+        if [[ "$line" =~ $regex ]]; then
+            return 0
+        fi
+    done <<< "$text"
+    return 1
+}
+
+load_config
 
 log_debug "Hook started"
 log_debug "CLAUDE_TOOL_INPUT: ${CLAUDE_TOOL_INPUT:-NOT_SET}"
@@ -46,14 +206,10 @@ if [[ -z "$tool_input" ]]; then
     exit 0
 fi
 
-# 正規表現パターンを構築
-BRANCH_PATTERN="^(${PROTECTED_BRANCHES})$"
-OPS_PATTERN="(${DANGEROUS_OPS})"
-
 log_debug "OPS_PATTERN: $OPS_PATTERN"
 
-# 現在のブランチを取得（Git リポジトリ外の場合は空）
-current_branch=$(git rev-parse --abbrev-ref HEAD 2>/dev/null || echo "")
+current_branch=""
+resolve_current_branch
 log_debug "Current branch: ${current_branch:-NONE}"
 
 # Git リポジトリ外の場合は許可
@@ -63,10 +219,10 @@ if [[ -z "$current_branch" ]]; then
 fi
 
 # 保護ブランチかチェック
-if echo "$current_branch" | grep -qE "$BRANCH_PATTERN"; then
+if [[ "$current_branch" =~ $BRANCH_PATTERN ]]; then
     log_debug "On protected branch: $current_branch"
     # 危険な操作かチェック
-    if echo "$tool_input" | grep -qE "$OPS_PATTERN"; then
+    if matches_any_line "$tool_input" "$OPS_PATTERN"; then
         log_debug "BLOCKED: $tool_input on protected branch $current_branch"
         echo "BLOCK: ${BLOCK_MESSAGE}" >&2
         echo "現在のブランチ: ${current_branch}" >&2
@@ -2,6 +2,11 @@
 # protect-secrets.sh
 # Claude Code Hooks 用の秘密情報保護スクリプト
 # 配置場所: ~/.claude/hooks/protect-secrets.sh
+#
+# ツール呼び出しごとに実行されるため、外部プロセスの起動を最小限にしている:
+# - CLAUDE_TOOL_INPUT の解析は jq 1回のみ
+# - パターン照合はシェル内の正規表現（[[ =~ ]]）で行う
+# - 設定ファイルから組み立てた照合用正規表現はキャッシュし、mtime で無効化する
 
 # -u を削除（未設定変数でエラー終了しない）
 set -eo pipefail
@@ -16,26 +21,96 @@ log_debug() {
     fi
 }
 
-# スクリプトのディレクトリを取得
-SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+# スクリプトのディレクトリを取得（サブシェル・dirname を使わない）
+SCRIPT_PATH="${BASH_SOURCE[0]}"
+[[ "$SCRIPT_PATH" == */* ]] || SCRIPT_PATH="./${SCRIPT_PATH}"
+SCRIPT_DIR="${SCRIPT_PATH%/*}"
+[[ "$SCRIPT_DIR" == /* ]] || SCRIPT_DIR="${PWD}/${SCRIPT_DIR}"
 CONFIG_FILE="${SCRIPT_DIR}/protect-secrets.conf"
 
+# 照合用正規表現のキャッシュ（スクリプト配置ディレクトリごと）
+CACHE_DIR="${XDG_CACHE_HOME:-$HOME/.cache}/claude-hooks"
+CACHE_FILE="${CACHE_DIR}/protect-secrets${SCRIPT_DIR//\//_}.cache"
+
 # デフォルト設定
 SECRETS_PATTERNS="\.env|\.secrets|credentials|credential|private[_-]?key|api[_-]?key|password|passwd|token|secret"
 SECRETS_EXTENSIONS="\.pem|\.key|\.p12|\.pfx|id_rsa|id_ed25519|\.ppk"
 SECRETS_FILES="\.netrc|\.npmrc|\.pypirc|service-account\.json|keystore"
 BLOCK_MESSAGE="秘密情報ファイルへのアクセスはブロックされました。"
 
-# 設定ファイルが存在すれば読み込む
-if [[ -f "$CONFIG_FILE" ]]; then
+# 読み取り系コマンドのパターン（パイプ区切り）
+READ_COMMANDS="cat|less|more|head|tail|vim|nano|vi|emacs|grep|awk|sed"
+
+# 照合用の正規表現を組み立てる（POSIX ERE のみ使用、bash 3.2 互換）
+compile_matcher() {
+    # パターン・拡張子・ファイル名（小文字化したパスに適用）
+    SECRETS_REGEX="(${SECRETS_PATTERNS})|(${SECRETS_EXTENSIONS})|(${SECRETS_FILES})"
+    # 特定ディレクトリ（~/.secrets, ~/.aws, ~/.ssh）
+    SECRETS_DIR_REGEX="(^|/)\.secrets(/|$)|(^|/)\.aws(/|$)|(^|/)\.ssh(/|$)"
+    # 行頭またはパイプ・区切り文字の後に続く読み取り系コマンド
+    READ_COMMAND_REGEX="(^|[|;&])[[:space:]]*(${READ_COMMANDS})([^[:alnum:]_]|$)"
+}
+
+# 設定ファイルを読み込み、組み立て済みの照合器をキャッシュする
+write_matcher_cache() {
+    local conf_debug_set="$1"
+    local tmp_file="${CACHE_FILE}.$$"
+
+    {
+        mkdir -p "$CACHE_DIR" && chmod 700 "$CACHE_DIR" && {
+            # declare -p は関数内で source するとローカル変数になるため代入文で出力
+            printf '%s=%q\n' \
+                SECRETS_REGEX "$SECRETS_REGEX" \
+                SECRETS_DIR_REGEX "$SECRETS_DIR_REGEX" \
+                READ_COMMAND_REGEX "$READ_COMMAND_REGEX" \
+                BLOCK_MESSAGE "$BLOCK_MESSAGE"
+            if [[ -n "$conf_debug_set" ]]; then
+                printf '%s=%q\n' DEBUG "$DEBUG"
+            fi
+        } > "$tmp_file" && mv -f "$tmp_file" "$CACHE_FILE"
+    } 2>/dev/null || rm -f "$tmp_file" 2>/dev/null || true
+}
+
+load_config() {
+    compile_matcher
+
+    # 設定ファイルが存在しなければデフォルト設定を使用
+    if [[ ! -f "$CONFIG_FILE" ]]; then
+        return 0
+    fi
+
     # セキュリティ検証：設定ファイルの所有者が現在のユーザーであることを確認
-    if [[ "$(stat -f '%u' "$CONFIG_FILE" 2>/dev/null || stat -c '%u' "$CONFIG_FILE" 2>/dev/null)" != "$(id -u)" ]]; then
+    if [[ ! -O "$CONFIG_FILE" ]]; then
         log_debug "WARNING: Config file owner mismatch, skipping load"
-    else
+        return 0
+    fi
+
+    # キャッシュが設定ファイル・本スクリプトより新しければそれを使う（外部プロセス不要）
+    if [[ -O "$CACHE_FILE" && "$CACHE_FILE" -nt "$CONFIG_FILE" && "$CACHE_FILE" -nt "$SCRIPT_PATH" ]]; then
         # shellcheck source=/dev/null
-        source "$CONFIG_FILE"
+        source "$CACHE_FILE"
+        return 0
     fi
-fi
+
+    # 設定ファイル内で DEBUG が設定されたかを判別するため一時的に退避
+    local env_debug="$DEBUG"
+    unset DEBUG
+
+    # shellcheck source=/dev/null
+    source "$CONFIG_FILE"
+
+    local conf_debug_set=""
+    if [[ -n "${DEBUG+x}" ]]; then
+        conf_debug_set=1
+    else
+        DEBUG="$env_debug"
+    fi
+
+    compile_matcher
+    write_matcher_cache "$conf_debug_set"
+}
+
+load_config
 
 log_debug "Hook started"
 log_debug "CLAUDE_TOOL_INPUT: ${CLAUDE_TOOL_INPUT:-NOT_SET}"
@@ -47,46 +122,83 @@ if [[ -z "$tool_input" ]]; then
     exit 0
 fi
 
-# JSONからfile_pathを抽出（Read toolの場合）
-if command -v jq &>/dev/null; then
-    file_path=$(echo "$tool_input" | jq -r '.file_path // empty' 2>/dev/null || echo "")
-else
+# jq がない（または JSON として解釈できない）場合の抽出
+extract_with_grep() {
     file_path=$(echo "$tool_input" | grep -oE '"file_path"\s*:\s*"[^"]*"' | sed 's/"file_path"\s*:\s*"\([^"]*\)"/\1/' || echo "")
-fi
+    bash_command=$(echo "$tool_input" | grep -oE '"command"\s*:\s*"[^"]*"' | sed 's/"command"\s*:\s*"\([^"]*\)"/\1/' || echo "")
+}
 
-# Bashコマンドの場合、commandを抽出
+# JSONから file_path（Read tool）と command（Bash tool）を1回の jq 呼び出しで抽出
+file_path=""
+bash_command=""
 if command -v jq &>/dev/null; then
-    bash_command=$(echo "$tool_input" | jq -r '.command // empty' 2>/dev/null || echo "")
+    # 値は @sh でクォートされるため eval しても安全
+    # （jq -r と $(...) の組み合わせと同様に、末尾の改行は取り除く）
+    if extracted=$(jq -r '
+        def field($name):
+            if type == "object" then (.[$name] // "") else "" end
+            | if type == "string" then . else tojson end
+            | sub("\n+\\z"; "");
+        "file_path=\(field("file_path") | @sh); bash_command=\(field("command") | @sh)"
+    ' <<< "$tool_input" 2>/dev/null); then
+        eval "$extracted"
+    else
+        # sub() は正規表現ライブラリ（oniguruma）なしの jq では失敗する。
+        # 抽出できないまま許可しないよう、1項目ずつの jq、さらに grep で抽出する
+        log_debug "Single jq extraction failed, falling back to per-field extraction"
+        if ! file_path=$(jq -r '.file_path // empty' <<< "$tool_input" 2>/dev/null) \
+            || ! bash_command=$(jq -r '.command // empty' <<< "$tool_input" 2>/dev/null); then
+            extract_with_grep
+        fi
+    fi
 else
-    bash_command=$(echo "$tool_input" | grep -oE '"command"\s*:\s*"[^"]*"' | sed 's/"command"\s*:\s*"\([^"]*\)"/\1/' || echo "")
+    extract_with_grep
 fi
 
 log_debug "Extracted file_path: ${file_path:-NONE}"
 log_debug "Extracted bash_command: ${bash_command:-NONE}"
 
-# ファイルパスが秘密情報パターンにマッチするかチェック
-check_secrets_pattern() {
-    local path="$1"
-    local path_lower
-    path_lower=$(echo "$path" | tr '[:upper:]' '[:lower:]')
+# いずれかの行が正規表現にマッチするか（grep と同じ行単位の判定）
+matches_any_line() {
+    local text="$1"
+    local regex="$2"
+    local line
 
-    # パターンマッチ
-    if echo "$path_lower" | grep -qE "$SECRETS_PATTERNS"; then
-        return 0  # マッチ（ブロック対象）
+    if [[ "$text" != *$'\n'* ]]; then
+        [[ "$text" =~ $regex ]]
+        return
     fi
 
-    # 拡張子チェック
-    if echo "$path_lower" | grep -qE "$SECRETS_EXTENSIONS"; then
-        return 0  # マッチ（ブロック対象）
+    while IFS= read -r line; do
+        if [[ "$line" =~ $regex ]]; then
+            return 0
+        fi
+    done <<< "$text"
+    return 1
+}
+
+# 小文字化（bash 4 以降は組み込み、bash 3.2 では tr を使用）
+to_lower() {
+    if (( BASH_VERSINFO[0] >= 4 )); then
+        lowered="${1,,}"
+    else
+        lowered=$(echo "$1" | tr '[:upper:]' '[:lower:]')
     fi
+}
+
+# ファイルパスが秘密情報パターンにマッチするかチェック
+check_secrets_pattern() {
+    local path="$1"
+    local lowered
 
-    # ファイル名チェック
-    if echo "$path_lower" | grep -qE "$SECRETS_FILES"; then
+    # パターン・拡張子・ファイル名チェック
+    to_lower "$path"
+    if matches_any_line "$lowered" "$SECRETS_REGEX"; then
         return 0  # マッチ（ブロック対象）
     fi
 
     # 特定ディレクトリチェック（~/.secrets, ~/.aws, ~/.ssh）
-    if echo "$path" | grep -qE "(^|/)\.secrets(/|$)|(^|/)\.aws(/|$)|(^|/)\.ssh(/|$)"; then
+    if matches_any_line "$path" "$SECRETS_DIR_REGEX"; then
         return 0  # マッチ（ブロック対象）
     fi
 
@@ -107,22 +219,14 @@ fi
 
 # Bash tool のチェック（cat, less, more, head, tail, vim, nano等でのファイル読み取り）
 if [[ -n "$bash_command" ]]; then
-    # 読み取り系コマンドのパターン（パイプ区切り）
-    read_commands="cat|less|more|head|tail|vim|nano|vi|emacs|grep|awk|sed"
-
-    # コマンドが読み取り系かチェック
-    for cmd in ${read_commands//|/ }; do
-        if echo "$bash_command" | grep -qE "(^|[|;&])\s*${cmd}\b"; then
-            # コマンドライン全体に対して秘密情報パターンをチェック
-            if check_secrets_pattern "$bash_command"; then
-                log_debug "BLOCKED: Bash read command on secrets: $bash_command"
-                echo "BLOCK: ${BLOCK_MESSAGE}" >&2
-                echo "ブロックされたコマンド: ${bash_command}" >&2
-                echo "理由: このコマンドは秘密情報を読み取る可能性があります。" >&2
-                exit 1
-            fi
-        fi
-    done
+    # 読み取り系コマンドを含む場合、コマンドライン全体に対して秘密情報パターンをチェック
+    if matches_any_line "$bash_command" "$READ_COMMAND_REGEX" && check_secrets_pattern "$bash_command"; then
+        log_debug "BLOCKED: Bash read command on secrets: $bash_command"
+        echo "BLOCK: ${BLOCK_MESSAGE}" >&2
+        echo "ブロックされたコマンド: ${bash_command}" >&2
+        echo "理由: このコマンドは秘密情報を読み取る可能性があります。" >&2
+        exit 1
+    fi
 fi
 
 # 条件に該当しなければ許可
@@ -1,12 +1,139 @@
 #!/bin/bash
 # Integrated statusLine script for Claude Code
 # Displays: CWD | ccstatusline output
+#
+# The status line is redrawn constantly, so results are cached per cwd and
+# session_id for STATUSLINE_CACHE_TTL seconds (default: 2, 0 disables).
+# Renders served from the cache run no external process. The cache lives in
+# $XDG_RUNTIME_DIR (tmpfs) when available and is invalidated when .git/HEAD
+# changes. Only successful ccstatusline output is cached, so errors are still
+# logged on every failing render.
 
-# Read JSON input from stdin
-input=$(cat)
+CACHE_TTL="${STATUSLINE_CACHE_TTL:-2}"
+CACHE_DIR="${XDG_RUNTIME_DIR:-${TMPDIR:-/tmp}}"
+CACHE_DIR="${CACHE_DIR%/}/claude-statusline-${UID}"
+
+# Read JSON input from stdin (builtin read, trailing newlines dropped like $(cat))
+IFS= read -r -d '' input || true
+while [[ "$input" == *$'\n' ]]; do
+  input="${input%$'\n'}"
+done
+
+# Current time without forking where the shell allows it
+now_seconds() {
+  if [[ -n "${EPOCHSECONDS:-}" ]]; then
+    now="$EPOCHSECONDS"
+  elif (( BASH_VERSINFO[0] > 4 || (BASH_VERSINFO[0] == 4 && BASH_VERSINFO[1] >= 2) )); then
+    printf -v now '%(%s)T' -1
+  else
+    now=$(date +%s)
+  fi
+}
+
+# Locate .git/HEAD for a directory (follows worktree / submodule gitdir files)
+find_git_head() {
+  local dir="$1"
+  local line=""
+  git_head=""
+
+  while [[ -n "$dir" ]]; do
+    if [[ -d "$dir/.git" ]]; then
+      git_head="$dir/.git/HEAD"
+      return 0
+    fi
+    if [[ -f "$dir/.git" ]]; then
+      IFS= read -r line < "$dir/.git" || [[ -n "$line" ]] || return 1
+      [[ "$line" == "gitdir: "* ]] || return 1
+      line="${line#gitdir: }"
+      [[ "$line" == /* ]] || line="$dir/$line"
+      git_head="$line/HEAD"
+      return 0
+    fi
+    [[ "$dir" == "/" ]] && return 1
+    dir="${dir%/*}"
+    [[ -z "$dir" ]] && dir="/"
+  done
+  return 1
+}
+
+# Write the cache entry atomically (printf %q assignments, sourced on the next render)
+write_cache() {
+  [[ "$CACHE_TTL" -gt 0 && -n "$cache_file" ]] 2>/dev/null || return 0
+  if [[ ! -d "$CACHE_DIR" ]]; then
+    mkdir -m 700 "$CACHE_DIR" 2>/dev/null || return 0
+  fi
+  [[ -O "$CACHE_DIR" && ! -L "$CACHE_DIR" ]] || return 0
+
+  local tmp_file="${cache_file}.$$"
+  {
+    printf '%s=%q\n' \
+      cached_key "$cache_key" \
+      cached_time "$now" \
+      cached_cwd "$cwd" \
+      cached_branch "$branch" \
+      cached_output "$ccstatusline_output"
+  } > "$tmp_file" 2>/dev/null && mv -f "$tmp_file" "$cache_file" 2>/dev/null || rm -f "$tmp_file" 2>/dev/null
+  return 0
+}
+
+# Extract cwd and session_id in-shell (plain JSON strings only; escaped values use jq)
+json_cwd=""
+json_cwd_found=0
+session_id=""
+if [[ "$input" =~ \"cwd\"[[:space:]]*:[[:space:]]*\"([^\"\\]*)\" ]]; then
+  json_cwd="${BASH_REMATCH[1]}"
+  json_cwd_found=1
+fi
+if [[ "$input" =~ \"session_id\"[[:space:]]*:[[:space:]]*\"([^\"\\]*)\" ]]; then
+  session_id="${BASH_REMATCH[1]}"
+fi
+
+cache_file=""
+cache_key=""
+git_head=""
+branch=""
+cached_branch=""
+now=0
+if [[ "$CACHE_TTL" -gt 0 && "$json_cwd_found" -eq 1 ]] 2>/dev/null; then
+  now_seconds
+  cache_key="${json_cwd}|${session_id}"
+  # Filename-safe key; the full key is stored in the entry and checked on read
+  cache_name="${cache_key//[^A-Za-z0-9._-]/_}"
+  cache_file="${CACHE_DIR}/${cache_name:0:200}.cache"
+  find_git_head "$json_cwd" || true
+
+  if [[ -O "$CACHE_DIR" && ! -L "$CACHE_DIR" && -O "$cache_file" ]]; then
+    cached_key=""
+    cached_time=0
+    # shellcheck source=/dev/null
+    source "$cache_file"
+    if [[ "$cached_key" == "$cache_key" ]] && [[ -z "$git_head" || ! "$git_head" -nt "$cache_file" ]]; then
+      # Branch stays valid until HEAD changes; the rendered output also expires with the TTL
+      branch="$cached_branch"
+      if [[ -n "$cached_output" ]] && (( now - cached_time < CACHE_TTL )); then
+        if [ -n "$cached_cwd" ]; then
+          echo "$cached_cwd | $cached_output"
+        else
+          echo "$cached_output"
+        fi
+        exit 0
+      fi
+    fi
+  fi
+fi
 
 # Extract cwd from JSON and format it (last 2 path segments)
-cwd=$(echo "$input" | jq -r '.cwd | split("/") | .[-2:] | join("/")')
+if [[ "$json_cwd_found" -eq 1 ]]; then
+  if [[ "$json_cwd" == */* ]]; then
+    cwd_parent="${json_cwd%/*}"
+    cwd="${cwd_parent##*/}/${json_cwd##*/}"
+  else
+    cwd="$json_cwd"
+  fi
+else
+  cwd=$(echo "$input" | jq -r '.cwd | split("/") | .[-2:] | join("/")')
+  [ "$cwd" = "null" ] && cwd=""
+fi
 
 # Get ccstatusline output by passing the same JSON input
 # Capture both stdout and stderr
@@ -27,16 +154,24 @@ if [ $ccstatusline_exit -ne 0 ] || [ -z "$ccstatusline_output" ]; then
 
   # Fallback: display basic info without ccstatusline
   model=$(echo "$input" | jq -r '.model.display_name // "Unknown"')
-  branch=$(git branch --show-current 2>/dev/null || echo "-")
+  if [ -z "$branch" ]; then
+    branch=$(git branch --show-current 2>/dev/null || echo "-")
+  fi
 
-  if [ -n "$cwd" ] && [ "$cwd" != "null" ]; then
+  # Keep cwd and branch for the next render; failed output is never cached
+  ccstatusline_output=""
+  write_cache
+
+  if [ -n "$cwd" ]; then
     echo "$cwd | Model: $model | ⎇ $branch [ccstatusline unavailable]"
   else
     echo "Model: $model | ⎇ $branch [ccstatusline unavailable]"
   fi
 else
+  write_cache
+
   # Normal operation: combine cwd and ccstatusline output
-  if [ -n "$cwd" ] && [ "$cwd" != "null" ]; then
+  if [ -n "$cwd" ]; then
     echo "$cwd | $ccstatusline_output"
   else
     echo "$ccstatusline_output"
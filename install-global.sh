@@ -16,89 +16,245 @@ GREEN='\033[0;32m'
 YELLOW='\033[1;33m'
 NC='\033[0m'
 
-# バックアップディレクトリ初期化（一度だけ実行）
+# オプション
+FORCE=0
+
+# 同期結果の集計
+UPDATED_COUNT=0
+UNCHANGED_COUNT=0
+
+# 同期対象のマニフェスト（bash 3.2 互換のため連想配列ではなく並列配列）
+MANIFEST_SRC=()
+MANIFEST_REL=()
+
+# インストール済みマニフェスト（"ハッシュ<TAB>相対パス" の行）
+INSTALLED_MANIFEST="$CLAUDE_DIR/.install-manifest"
+
+# SHA-256 コマンドを選択（sha256sum → shasum → openssl）
+detect_hash_cmd() {
+  if command -v sha256sum &> /dev/null; then
+    HASH_CMD=(sha256sum)
+  elif command -v shasum &> /dev/null; then
+    HASH_CMD=(shasum -a 256)
+  elif command -v openssl &> /dev/null; then
+    HASH_CMD=(openssl dgst -sha256 -r)
+  else
+    echo -e "${YELLOW}Error: sha256sum / shasum / openssl のいずれかが必要です${NC}" >&2
+    exit 1
+  fi
+}
+
+# ファイルの SHA-256 を出力（存在しない場合は空文字）
+file_hash() {
+  local file="$1"
+  [[ -f "$file" ]] || return 0
+
+  local hash rest
+  read -r hash rest < <("${HASH_CMD[@]}" "$file")
+  # 特殊文字を含むパスでは先頭に "\" が付く
+  echo "${hash#\\}"
+}
+
+# バックアップディレクトリ初期化（バックアップが必要になった時だけ実行）
 init_backup_dir() {
-  if [[ ! -d "$BACKUP_DIR" ]]; then
-    mkdir -p "$BACKUP_DIR"
+  if [[ ! -d "$BACKUP_DIR/objects" ]]; then
+    mkdir -p "$BACKUP_DIR/objects"
   fi
 }
 
-# バックアップ関数
+# バックアップ関数（内容アドレス方式: 同一内容は objects/<sha256> に一度だけ保存）
 backup_file() {
   local file="$1"
+  local hash="${2:-}"
   [[ ! -f "$file" ]] && return 0
 
-  local basename=$(basename "$file")
-  if cp "$file" "$BACKUP_DIR/${basename}.${TIMESTAMP}.bak"; then
-    echo -e "${YELLOW}Backed up:${NC} $file → $BACKUP_DIR/${basename}.${TIMESTAMP}.bak"
-  else
-    echo -e "${YELLOW}Warning: バックアップに失敗: $file${NC}" >&2
-    return 1
+  [[ -z "$hash" ]] && hash=$(file_hash "$file")
+  init_backup_dir
+
+  local object="$BACKUP_DIR/objects/$hash"
+  if [[ ! -f "$object" ]]; then
+    if ! cp "$file" "$object.tmp.$$" || ! mv -f "$object.tmp.$$" "$object"; then
+      rm -f "$object.tmp.$$"
+      echo -e "${YELLOW}Warning: バックアップに失敗: $file${NC}" >&2
+      return 1
+    fi
   fi
+  printf '%s\t%s\t%s\n' "$TIMESTAMP" "$hash" "$file" >> "$BACKUP_DIR/index.tsv"
+  echo -e "${YELLOW}Backed up:${NC} $file → $object"
 }
 
-# 単一ファイルコピー（バックアップ付き）
-copy_single_file() {
-  local src="$1"
-  local dest="$2"
-  local display_name="$3"
+# 旧形式の <name>.<timestamp>.bak を内容アドレス方式へ移行（同一内容は一つにまとめる）
+migrate_legacy_backups() {
+  local legacy
+  for legacy in "$BACKUP_DIR"/*.bak; do
+    [[ ! -f "$legacy" ]] && continue
+
+    local name=$(basename "$legacy" .bak)
+    local stamp="${name##*.}"
+    local original="${name%.*}"
+    local hash=$(file_hash "$legacy")
 
-  backup_file "$dest"
-  cp "$src" "$dest"
-  echo "✓ Copied $display_name"
+    init_backup_dir
+    if [[ -f "$BACKUP_DIR/objects/$hash" ]]; then
+      rm -f "$legacy"
+    else
+      mv -f "$legacy" "$BACKUP_DIR/objects/$hash"
+    fi
+    printf '%s\t%s\t%s\n' "$stamp" "$hash" "$original" >> "$BACKUP_DIR/index.tsv"
+  done
+}
+
+# インストール済みマニフェストから前回インストール時のハッシュを取得
+installed_hash() {
+  local rel="$1"
+  [[ -f "$INSTALLED_MANIFEST" ]] || return 0
+
+  local hash path
+  while IFS=$'\t' read -r hash path; do
+    if [[ "$path" == "$rel" ]]; then
+      echo "$hash"
+      return 0
+    fi
+  done < "$INSTALLED_MANIFEST"
 }
 
-# Markdownファイルをコピー
-copy_md_files() {
+# マニフェストに追加
+add_to_manifest() {
+  MANIFEST_SRC+=("$1")
+  MANIFEST_REL+=("$2")
+}
+
+# 同期対象のマニフェストを作成
+build_manifest() {
   # CLAUDE.md
-  copy_single_file "$GLOBAL_DIR/CLAUDE.md" "$CLAUDE_DIR/CLAUDE.md" "CLAUDE.md"
+  [[ -f "$GLOBAL_DIR/CLAUDE.md" ]] && add_to_manifest "$GLOBAL_DIR/CLAUDE.md" "CLAUDE.md"
 
   # サブディレクトリ内のCLAUDE-*.md
+  local dir file
   for dir in base security team; do
-    mkdir -p "$CLAUDE_DIR/$dir"
     for file in "$GLOBAL_DIR/$dir"/*.md; do
       [[ ! -f "$file" ]] && continue
-      local basename=$(basename "$file")
-      copy_single_file "$file" "$CLAUDE_DIR/$dir/$basename" "$dir/$basename"
+      add_to_manifest "$file" "$dir/$(basename "$file")"
     done
   done
-}
-
-# Hookファイルをコピー
-copy_hook_files() {
-  mkdir -p "$CLAUDE_DIR/hooks"
 
+  # Hookファイル
   for file in "$GLOBAL_DIR/hooks"/*; do
     [[ ! -f "$file" ]] && continue
 
-    local basename=$(basename "$file")
-
     # 空ファイルはスキップ
     if [[ ! -s "$file" ]]; then
       echo -e "${YELLOW}Warning: 空ファイルをスキップ: $file${NC}" >&2
       continue
     fi
+    add_to_manifest "$file" "hooks/$(basename "$file")"
+  done
 
-    if ! copy_single_file "$file" "$CLAUDE_DIR/hooks/$basename" "hooks/$basename" 2>/dev/null; then
-      echo -e "${YELLOW}Warning: コピーに失敗: $file${NC}" >&2
-      continue
+  # templates/ ディレクトリ（オプション）
+  if [[ -d "$GLOBAL_DIR/templates" ]]; then
+    while IFS= read -r file; do
+      add_to_manifest "$file" "${file#$GLOBAL_DIR/}"
+    done < <(find "$GLOBAL_DIR/templates" -type f | sort)
+  fi
+}
+
+# ファイルを一時ファイル経由でアトミックに配置
+install_file() {
+  local src="$1"
+  local dest="$2"
+  local tmp="$dest.tmp.$$"
+
+  mkdir -p "$(dirname "$dest")"
+  if ! cp "$src" "$tmp"; then
+    rm -f "$tmp"
+    return 1
+  fi
+  # シェルスクリプトに実行権限を付与
+  if [[ "$dest" == *.sh ]]; then
+    chmod +x "$tmp" 2>/dev/null || \
+      echo -e "${YELLOW}Warning: 実行権限の付与に失敗: $(basename "$dest")${NC}" >&2
+  fi
+  if ! mv -f "$tmp" "$dest"; then
+    rm -f "$tmp"
+    return 1
+  fi
+}
+
+# 単一ファイル同期（内容が変わった場合のみバックアップしてコピー）
+sync_single_file() {
+  local src="$1"
+  local rel="$2"
+  local src_hash="$3"
+  local dest="$CLAUDE_DIR/$rel"
+  local dest_hash=$(file_hash "$dest")
+
+  if [[ "$dest_hash" == "$src_hash" && $FORCE -eq 0 ]]; then
+    # 内容は同一。実行権限が外れている場合のみ付与
+    if [[ "$dest" == *.sh && ! -x "$dest" ]]; then
+      chmod +x "$dest" 2>/dev/null || \
+        echo -e "${YELLOW}Warning: 実行権限の付与に失敗: $rel${NC}" >&2
     fi
+    UNCHANGED_COUNT=$((UNCHANGED_COUNT + 1))
+    return 0
+  fi
 
-    # シェルスクリプトに実行権限を付与
-    if [[ "$file" == *.sh ]]; then
-      chmod +x "$CLAUDE_DIR/hooks/$basename" 2>/dev/null || \
-        echo -e "${YELLOW}Warning: 実行権限の付与に失敗: $basename${NC}" >&2
+  if [[ -n "$dest_hash" && "$dest_hash" != "$src_hash" ]]; then
+    # 前回インストールした内容から変わっていればローカル変更
+    local previous=$(installed_hash "$rel")
+    if [[ -n "$previous" && "$previous" != "$dest_hash" ]]; then
+      echo -e "${YELLOW}Warning: ローカルの変更を上書きします: $rel${NC}" >&2
     fi
-  done
+    backup_file "$dest" "$dest_hash" || return 1
+  fi
+
+  if ! install_file "$src" "$dest"; then
+    echo -e "${YELLOW}Warning: コピーに失敗: $src${NC}" >&2
+    return 1
+  fi
+  UPDATED_COUNT=$((UPDATED_COUNT + 1))
+  echo "✓ Updated $rel"
+}
+
+# インストール済みマニフェストを更新（内容が変わった場合のみ書き込み）
+write_installed_manifest() {
+  local content="$1"
+  if [[ -f "$INSTALLED_MANIFEST" && "$(cat "$INSTALLED_MANIFEST")" == "$content" ]]; then
+    return 0
+  fi
+
+  local tmp="$INSTALLED_MANIFEST.tmp.$$"
+  if printf '%s\n' "$content" > "$tmp" && mv -f "$tmp" "$INSTALLED_MANIFEST"; then
+    return 0
+  fi
+  rm -f "$tmp"
+  echo -e "${YELLOW}Warning: マニフェストの更新に失敗: $INSTALLED_MANIFEST${NC}" >&2
 }
 
-# ファイルコピー（メイン）
-copy_files() {
-  echo -e "${GREEN}Copying files from $GLOBAL_DIR to $CLAUDE_DIR...${NC}"
+# ファイル同期（メイン）
+sync_files() {
+  echo -e "${GREEN}Syncing files from $GLOBAL_DIR to $CLAUDE_DIR...${NC}"
   echo ""
 
-  copy_md_files
-  copy_hook_files
+  build_manifest
+  mkdir -p "$CLAUDE_DIR"
+
+  local i src rel hash content=""
+  for ((i = 0; i < ${#MANIFEST_SRC[@]}; i++)); do
+    src="${MANIFEST_SRC[$i]}"
+    rel="${MANIFEST_REL[$i]}"
+    hash=$(file_hash "$src")
+
+    if sync_single_file "$src" "$rel" "$hash"; then
+      content+="$hash"$'\t'"$rel"$'\n'
+    else
+      # 失敗したファイルは前回の記録を維持
+      local previous=$(installed_hash "$rel")
+      [[ -n "$previous" ]] && content+="$previous"$'\t'"$rel"$'\n'
+    fi
+  done
+
+  write_installed_manifest "${content%$'\n'}"
+  echo "✓ $UPDATED_COUNT updated, $UNCHANGED_COUNT unchanged"
 }
 
 # statusLine 依存ツールの確認
@@ -142,21 +298,30 @@ setup_settings_json() {
       return 1
     fi
 
-    backup_file "$settings"
-
-    local temp_file
-    temp_file=$(mktemp) || { echo -e "${YELLOW}Error: 一時ファイル作成に失敗${NC}" >&2; return 1; }
-
-    if jq -s '.[0] * .[1]' "$template" "$settings" > "$temp_file" 2>/dev/null && mv "$temp_file" "$settings"; then
-      echo "✓ Merged common settings into settings.json"
-    else
-      rm -f "$temp_file"
+    local merged
+    if ! merged=$(jq -s '.[0] * .[1]' "$template" "$settings" 2>/dev/null); then
       echo -e "${YELLOW}Error: マージに失敗しました${NC}" >&2
       return 1
     fi
+
+    # マージ結果が既存と同じ（キー順は無視）なら書き込まない
+    if [[ "$(jq -S . <<< "$merged")" == "$(jq -S . "$settings")" ]]; then
+      echo "✓ settings.json is up to date"
+    else
+      backup_file "$settings"
+
+      local temp_file="$settings.tmp.$$"
+      if printf '%s\n' "$merged" > "$temp_file" && mv -f "$temp_file" "$settings"; then
+        echo "✓ Merged common settings into settings.json"
+      else
+        rm -f "$temp_file"
+        echo -e "${YELLOW}Error: マージに失敗しました${NC}" >&2
+        return 1
+      fi
+    fi
   else
     # 新規作成
-    cp "$template" "$settings"
+    install_file "$template" "$settings"
     echo "✓ Created settings.json from settings.template.json"
   fi
 
@@ -188,16 +353,26 @@ setup_secrets() {
     fi
   fi
 
-  # templates/ ディレクトリコピー（オプション）
-  if [[ -d "$GLOBAL_DIR/templates" ]]; then
-    mkdir -p "$CLAUDE_DIR/templates"
-    cp -r "$GLOBAL_DIR/templates/"* "$CLAUDE_DIR/templates/" 2>/dev/null || true
-    echo "✓ Copied templates to ~/.claude/templates/"
-  fi
+}
+
+# 使い方
+usage() {
+  echo "Usage: $0 [--force]"
+  echo ""
+  echo "  --force  内容が同一のファイルも再コピーする"
 }
 
 # メイン処理
 main() {
+  while [[ $# -gt 0 ]]; do
+    case "$1" in
+      --force) FORCE=1 ;;
+      -h|--help) usage; exit 0 ;;
+      *) usage >&2; exit 1 ;;
+    esac
+    shift
+  done
+
   echo ""
   echo "==================================="
   echo "  グローバル設定セットアップ"
@@ -210,8 +385,9 @@ main() {
     exit 1
   fi
 
-  init_backup_dir
-  copy_files
+  detect_hash_cmd
+  migrate_legacy_backups
+  sync_files
   check_statusline_deps
   setup_settings_json
   setup_secrets
@@ -222,7 +398,7 @@ main() {
   echo "==================================="
   echo ""
   if [[ -d "$BACKUP_DIR" ]]; then
-    echo -e "${YELLOW}Backups:${NC} $BACKUP_DIR/"
+    echo -e "${YELLOW}Backups:${NC} $BACKUP_DIR/ (objects/<sha256>、履歴は index.tsv)"
     echo ""
   fi
   echo -e "${GREEN}インストールされたファイル:${NC}"
@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+"""
+Rolling aggregates of knowledge sync runs.
+Each run records its extraction and creation statistics per day, so daily,
+weekly and monthly summaries are O(days) lookups instead of re-walking the
+knowledge repository.
+"""
+
+import json
+import os
+import sys
+from datetime import date as date_type
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+STORE_VERSION = 1
+
+EXTRACTION_COUNTERS = ("jsonl_files", "candidates")
+CREATION_COUNTERS = ("total", "accepted", "rejected", "duplicates", "created")
+
+
+def _add_counts(target: dict[str, int], counts: dict[str, int]):
+    """Add a {key: count} mapping into target in place."""
+    for key, count in counts.items():
+        target[key] = target.get(key, 0) + count
+
+
+def _ratio(numerator: int, denominator: int) -> float | None:
+    """Return numerator/denominator rounded, or None when there is nothing to divide."""
+    return round(numerator / denominator, 3) if denominator else None
+
+
+class StatsAggregator:
+    """Per-day aggregate store for knowledge sync statistics."""
+
+    def __init__(self, state_dir: str = "~/.claude/daily_knowledge"):
+        """
+        Initialize aggregator.
+
+        Args:
+            state_dir: Skill state directory (shared with the daily trigger)
+        """
+        self.state_dir = Path(state_dir).expanduser()
+        self.store_file = self.state_dir / "aggregates.json"
+        self._store: dict[str, Any] | None = None
+
+    def _load(self) -> dict[str, Any]:
+        """Load the store (an unreadable or outdated store starts empty)."""
+        if self._store is None:
+            try:
+                store = json.loads(self.store_file.read_text(encoding="utf-8"))
+                if store.get("version") != STORE_VERSION:
+                    raise ValueError(f"Unsupported aggregate store version: {store.get('version')}")
+            except (OSError, ValueError, AttributeError):
+                store = {"version": STORE_VERSION, "days": {}}
+            self._store = store
+        return self._store
+
+    def _save(self):
+        """Write the store atomically."""
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.store_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(
+            json.dumps(self._load(), ensure_ascii=False, sort_keys=True, separators=(",", ":")),
+            encoding="utf-8",
+        )
+        tmp_file.replace(self.store_file)
+
+    def _day(self, date: str) -> dict[str, Any]:
+        """Return the mutable record for a day, creating it if needed."""
+        return self._load()["days"].setdefault(date, {})
+
+    def record_extraction(self, date: str, stats: dict[str, Any]):
+        """
+        Record extraction statistics for a day.
+
+        Extraction is deterministic for a date, so a re-run replaces the
+        previous record instead of adding to it.
+
+        Args:
+            date: Target date (YYYY-MM-DD)
+            stats: Stats from KnowledgeExtractor.extraction_stats()
+        """
+        self._day(date)["extraction"] = {
+            **{key: stats.get(key, 0) for key in EXTRACTION_COUNTERS},
+            "excluded": dict(stats.get("excluded", {})),
+            "by_project": dict(stats.get("by_project", {})),
+        }
+        self._save()
+
+    def record_creation(self, date: str, stats: dict[str, Any], run_id: str):
+        """
+        Record file creation statistics and created file metadata for a day.
+
+        Runs are keyed by run_id (the evaluation file). A re-run of the same
+        run replaces its evaluation counts instead of adding to them, and
+        files it created earlier are not counted again, neither as created
+        nor as duplicates of themselves. Different runs for the same date
+        are added.
+
+        Args:
+            date: Target date (YYYY-MM-DD)
+            stats: Stats returned by KnowledgeFileCreator.create_files(),
+                including the created files ({"path", "category", "project", "title"})
+            run_id: Identifier of the run (e.g. the resolved evaluation file path)
+        """
+        day = self._day(date)
+        runs = self._creation_runs(day)
+        created = [entry["path"] for entry in stats.get("files", [])]
+        previous = runs.get(run_id, {}).get("paths", [])
+        # Files this run created last time are now found as duplicates of themselves
+        recreated = len(set(previous) - set(created))
+        runs[run_id] = {
+            **{key: stats.get(key, 0) for key in ("total", "accepted", "rejected")},
+            "duplicates": max(stats.get("duplicates", 0) - recreated, 0),
+            "paths": sorted(set(previous) | set(created)),
+        }
+
+        known = {entry["path"] for entry in day.get("files", [])}
+        day.setdefault("files", []).extend(entry for entry in stats.get("files", []) if entry["path"] not in known)
+        self._summarize_creation(day)
+        self._save()
+
+    @staticmethod
+    def _creation_runs(day: dict[str, Any]) -> dict[str, dict[str, Any]]:
+        """Return the per-run creation records of a day, converting a record written before runs were keyed."""
+        if "creation_runs" not in day and "creation" in day:
+            creation = day["creation"]
+            day["creation_runs"] = {
+                "legacy": {
+                    **{key: creation.get(key, 0) for key in ("total", "accepted", "rejected", "duplicates")},
+                    "paths": [entry["path"] for entry in day.get("files", [])],
+                }
+            }
+        return day.setdefault("creation_runs", {})
+
+    @staticmethod
+    def _summarize_creation(day: dict[str, Any]):
+        """Rebuild a day's creation totals from its runs (each created file counts once)."""
+        runs = day["creation_runs"]
+        creation = {key: 0 for key in CREATION_COUNTERS}
+        for run in runs.values():
+            _add_counts(creation, {key: run[key] for key in ("total", "accepted", "rejected", "duplicates")})
+
+        paths = {path for run in runs.values() for path in run["paths"]}
+        by_category: dict[str, int] = {}
+        by_project: dict[str, int] = {}
+        for entry in day.get("files", []):
+            if entry["path"] in paths:
+                _add_counts(by_category, {entry["category"]: 1})
+                if entry.get("project"):
+                    _add_counts(by_project, {entry["project"]: 1})
+        creation.update(created=len(paths), by_category=by_category, by_project=by_project)
+        if "backfill" in runs:
+            creation["backfilled"] = True
+        day["creation"] = creation
+
+    def backfill(self, files: list[dict[str, str]]) -> int:
+        """
+        Seed days that have no creation record from existing knowledge files.
+
+        Args:
+            files: File metadata with a "date" key (e.g. from the search index)
+
+        Returns:
+            int: Number of files added
+        """
+        days = self._load()["days"]
+        by_date: dict[str, list[dict[str, str]]] = {}
+        for entry in files:
+            if entry.get("date") and "creation" not in days.get(entry["date"], {}):
+                by_date.setdefault(entry["date"], []).append(entry)
+
+        added = 0
+        for date, entries in by_date.items():
+            day = self._day(date)
+            day["files"] = [
+                {key: entry.get(key, "") for key in ("path", "category", "project", "title")} for entry in entries
+            ]
+            day["creation_runs"] = {
+                "backfill": {
+                    **{key: 0 for key in ("total", "accepted", "rejected", "duplicates")},
+                    "paths": [entry["path"] for entry in day["files"]],
+                }
+            }
+            self._summarize_creation(day)
+            added += len(entries)
+
+        if added:
+            self._save()
+        return added
+
+    def rollup(self, start: str, end: str) -> dict[str, Any]:
+        """
+        Sum the records of every day in [start, end].
+
+        Args:
+            start: First date (YYYY-MM-DD)
+            end: Last date (YYYY-MM-DD, inclusive)
+
+        Returns:
+            dict: Period totals, per-category/per-project counts, exclusion reasons and ratios
+        """
+        days = self._load()["days"]
+        extraction = {**{key: 0 for key in EXTRACTION_COUNTERS}, "excluded": {}, "by_project": {}}
+        creation = {**{key: 0 for key in CREATION_COUNTERS}, "by_category": {}, "by_project": {}}
+        files: list[dict[str, str]] = []
+        days_with_data = 0
+
+        current = date_type.fromisoformat(start)
+        last = date_type.fromisoformat(end)
+        while current <= last:
+            day = days.get(current.isoformat())
+            current += timedelta(days=1)
+            if not day:
+                continue
+            days_with_data += 1
+            if "extraction" in day:
+                _add_counts(extraction, {key: day["extraction"].get(key, 0) for key in EXTRACTION_COUNTERS})
+                _add_counts(extraction["excluded"], day["extraction"].get("excluded", {}))
+                _add_counts(extraction["by_project"], day["extraction"].get("by_project", {}))
+            if "creation" in day:
+                _add_counts(creation, {key: day["creation"].get(key, 0) for key in CREATION_COUNTERS})
+                _add_counts(creation["by_category"], day["creation"].get("by_category", {}))
+                _add_counts(creation["by_project"], day["creation"].get("by_project", {}))
+            files.extend(day.get("files", []))
+
+        return {
+            "start": start,
+            "end": end,
+            "days_with_data": days_with_data,
+            "extraction": extraction,
+            "creation": creation,
+            "ratios": {
+                "accept": _ratio(creation["accepted"], creation["total"]),
+                "reject": _ratio(creation["rejected"], creation["total"]),
+                "duplicate": _ratio(creation["duplicates"], creation["accepted"]),
+            },
+            "files": files,
+        }
+
+    def daily(self, date: str) -> dict[str, Any]:
+        """Roll up one day."""
+        return self.rollup(date, date)
+
+    def weekly(self, date: str) -> dict[str, Any]:
+        """Roll up the ISO week (Monday-Sunday) containing date."""
+        day = date_type.fromisoformat(date)
+        monday = day - timedelta(days=day.weekday())
+        return self.rollup(monday.isoformat(), (monday + timedelta(days=6)).isoformat())
+
+    def monthly(self, date: str) -> dict[str, Any]:
+        """Roll up the calendar month containing date."""
+        day = date_type.fromisoformat(date)
+        first = day.replace(day=1)
+        next_month = (first + timedelta(days=32)).replace(day=1)
+        return self.rollup(first.isoformat(), (next_month - timedelta(days=1)).isoformat())
+
+
+def format_rollup(rollup: dict[str, Any]) -> str:
+    """
+    Format a rollup as Markdown for the daily summary.
+
+    Args:
+        rollup: Result of StatsAggregator.rollup()
+
+    Returns:
+        str: Markdown text
+    """
+
+    def percent(value: float | None) -> str:
+        return "-" if value is None else f"{value * 100:.0f}%"
+
+    def top(counts: dict[str, int], limit: int = 10) -> list[tuple[str, int]]:
+        return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    extraction, creation, ratios = rollup["extraction"], rollup["creation"], rollup["ratios"]
+    period = rollup["start"] if rollup["start"] == rollup["end"] else f"{rollup['start']} 〜 {rollup['end']}"
+    lines = [
+        f"## 📈 集計 - {period}",
+        "",
+        "| 項目 | 値 |",
+        "|------|-----|",
+        f"| 記録のある日数 | {rollup['days_with_data']} |",
+        f"| 知識候補件数 | {extraction['candidates']} |",
+        f"| 評価件数 | {creation['total']} |",
+        f"| 採用 / 拒否 / 重複 | {creation['accepted']} / {creation['rejected']} / {creation['duplicates']} |",
+        f"| 採用率 / 拒否率 / 重複率 | {percent(ratios['accept'])} / {percent(ratios['reject'])} / {percent(ratios['duplicate'])} |",
+        f"| 作成した知識ファイル数 | {creation['created']} |",
+    ]
+
+    if creation["by_category"]:
+        lines += ["", "| カテゴリ | 件数 |", "|---------|------|"]
+        lines += [f"| {name} | {count} |" for name, count in top(creation["by_category"])]
+    if creation["by_project"]:
+        lines += ["", "| プロジェクト | 作成件数 |", "|-------------|---------|"]
+        lines += [f"| {name} | {count} |" for name, count in top(creation["by_project"])]
+    if extraction["excluded"]:
+        lines += ["", "| 除外理由 | 件数 |", "|---------|------|"]
+        lines += [f"| {reason} | {count} |" for reason, count in top(extraction["excluded"])]
+    return "\n".join(lines)
+
+
+def main():
+    """CLI interface."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show rolling knowledge sync statistics")
+    parser.add_argument("period", choices=["daily", "weekly", "monthly", "backfill"])
+    parser.add_argument("date", nargs="?", help="Date in the period (YYYY-MM-DD, default: yesterday)")
+    parser.add_argument("--repo", help="Knowledge repository to backfill from (backfill only)")
+    parser.add_argument("--state-dir", default="~/.claude/daily_knowledge")
+    parser.add_argument("--json", action="store_true", help="Print the rollup as JSON")
+    args = parser.parse_args()
+
+    aggregator = StatsAggregator(args.state_dir)
+
+    if args.period == "backfill":
+        if not args.repo:
+            parser.error("backfill requires --repo")
+        sys.path.insert(0, str(Path(__file__).parent))
+        from search_index import KnowledgeSearchIndex
+
+        index = KnowledgeSearchIndex(args.repo)
+        index.update()
+        added = aggregator.backfill(index.file_metadata())
+        print(f"✅ Backfilled {added} files")
+        return
+
+    date = args.date or (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    try:
+        rollup = getattr(aggregator, args.period)(date)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.json:
+        print(json.dumps(rollup, ensure_ascii=False, indent=2))
+    else:
+        print(format_rollup(rollup))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Compact knowledge candidate record.
+Candidates are slotted, read-only mappings: file, project and role strings
+are interned (shared by every candidate of a session) and timestamps are
+stored as integer milliseconds. Serialization produces the same JSON as the
+previous dict candidates.
+"""
+
+import re
+import sys
+from collections.abc import Iterator, Mapping
+from datetime import datetime, timedelta
+from typing import Any
+
+# Candidate keys in output order
+FIELDS = (
+    "timestamp",
+    "role",
+    "text",
+    "tool_uses",
+    "errors",
+    "source_file",
+    "line_number",
+    "project_path",
+    "score",
+)
+_FIELD_SET = frozenset(FIELDS)
+
+# Claude Code log timestamps: 2026-01-30T10:00:00.123Z (round-trips exactly through an int)
+CANONICAL_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{3}Z")
+EPOCH = datetime(1970, 1, 1)
+
+
+def timestamp_to_ms(timestamp: str) -> int | None:
+    """
+    Convert a canonical log timestamp to epoch milliseconds.
+
+    Args:
+        timestamp: Timestamp string
+
+    Returns:
+        int | None: Milliseconds, or None if the string would not round-trip
+    """
+    if not CANONICAL_TIMESTAMP.fullmatch(timestamp):
+        return None
+    dt = datetime.strptime(timestamp[:19], "%Y-%m-%dT%H:%M:%S")
+    return (dt - EPOCH) // timedelta(milliseconds=1) + int(timestamp[20:23])
+
+
+def ms_to_timestamp(ms: int) -> str:
+    """
+    Convert epoch milliseconds back to the canonical log timestamp.
+
+    Args:
+        ms: Milliseconds since the epoch (UTC)
+
+    Returns:
+        str: Timestamp string (e.g. "2026-01-30T10:00:00.123Z")
+    """
+    dt = EPOCH + timedelta(milliseconds=ms)
+    return f"{dt:%Y-%m-%dT%H:%M:%S}.{ms % 1000:03d}Z"
+
+
+def _intern(value: Any) -> Any:
+    """Intern strings (other values are returned unchanged)."""
+    return sys.intern(value) if type(value) is str else value
+
+
+class CandidateRecord(Mapping):
+    """Knowledge candidate (read-only mapping with the candidate JSON keys)."""
+
+    __slots__ = (
+        "_timestamp_ms",
+        "_timestamp_raw",
+        "role",
+        "text",
+        "tool_uses",
+        "errors",
+        "source_file",
+        "line_number",
+        "project_path",
+        "score",
+        "extra",
+    )
+
+    def __init__(
+        self,
+        timestamp: str | None,
+        role: str,
+        text: str,
+        tool_uses: list[dict[str, Any]],
+        errors: list[dict[str, Any]],
+        source_file: str,
+        line_number: int,
+        project_path: str,
+        score: float,
+        extra: dict[str, Any] | None = None,
+    ):
+        """
+        Initialize record.
+
+        Args:
+            timestamp: Log timestamp (canonical timestamps are stored as int ms)
+            role: Message role
+            text: Message text
+            tool_uses: Summarized tool uses
+            errors: Error excerpts
+            source_file: JSONL file the candidate came from
+            line_number: Line number in source_file
+            project_path: Project working directory
+            score: Pre-ranking score
+            extra: Additional keys (e.g. "fingerprint") kept for round-tripping
+        """
+        ms = timestamp_to_ms(timestamp) if isinstance(timestamp, str) else None
+        self._timestamp_ms = ms
+        self._timestamp_raw = timestamp if ms is None else None
+        self.role = _intern(role)
+        self.text = text
+        self.tool_uses = tool_uses
+        self.errors = errors
+        self.source_file = _intern(source_file)
+        self.line_number = line_number
+        self.project_path = _intern(project_path)
+        self.score = score
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, candidate: Mapping[str, Any]) -> "CandidateRecord":
+        """
+        Build a record from a candidate dict (e.g. loaded from JSON).
+
+        Args:
+            candidate: Candidate mapping
+
+        Returns:
+            CandidateRecord: Record (unknown keys are kept in extra)
+        """
+        if isinstance(candidate, CandidateRecord):
+            return candidate
+        return cls(
+            timestamp=candidate.get("timestamp"),
+            role=candidate.get("role"),
+            text=candidate.get("text"),
+            tool_uses=candidate.get("tool_uses"),
+            errors=candidate.get("errors"),
+            source_file=candidate.get("source_file"),
+            line_number=candidate.get("line_number"),
+            project_path=candidate.get("project_path"),
+            score=candidate.get("score"),
+            extra={key: value for key, value in candidate.items() if key not in _FIELD_SET},
+        )
+
+    @property
+    def timestamp(self) -> str | None:
+        """Original timestamp string."""
+        if self._timestamp_ms is not None:
+            return ms_to_timestamp(self._timestamp_ms)
+        return self._timestamp_raw
+
+    @property
+    def timestamp_ms(self) -> int | None:
+        """Timestamp as epoch milliseconds (None for non-canonical timestamps)."""
+        return self._timestamp_ms
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert to the candidate dict written to candidates JSON.
+
+        Returns:
+            dict: Candidate with the keys in FIELDS order, then extra keys
+        """
+        return dict(self.items())
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _FIELD_SET:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from FIELDS
+        if self.extra:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(FIELDS) + (len(self.extra) if self.extra else 0)
+
+    def __repr__(self) -> str:
+        return f"CandidateRecord({self.to_dict()!r})"
+
+
+def to_json(value: Any) -> Any:
+    """
+    `default=` hook for json.dump that serializes CandidateRecord.
+
+    Args:
+        value: Object json could not serialize
+
+    Returns:
+        dict: Candidate dict
+
+    Raises:
+        TypeError: For anything other than CandidateRecord
+    """
+    if isinstance(value, CandidateRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -3,16 +3,28 @@
 Categorize knowledge items into appropriate directories.
 """
 
+import json
+import os
 import re
-import yaml
+import sys
 from pathlib import Path
 from typing import Any
 
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
 
-def _load_category_keywords():
-    """Load category keywords from config file."""
-    script_dir = Path(__file__).parent
-    config_path = script_dir.parent / "config" / "categories.yaml"
+from document_analysis import DocumentCache, get_default_cache
+
+CONFIG_PATH = Path(__file__).parent.parent / "config" / "categories.yaml"
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser() / "daily-knowledge-sync"
+CACHE_FILE = CACHE_DIR / "categories.json"
+
+_category_config: tuple[dict[str, list[str]], str] | None = None
+
+
+def _compile_category_config(config_path: Path) -> dict[str, Any]:
+    """Parse categories.yaml into the compiled (JSON-serializable) form."""
+    import yaml  # Lazy import: only needed when the compiled cache is stale
 
     with open(config_path) as f:
         config = yaml.safe_load(f)
@@ -22,36 +34,105 @@ def _load_category_keywords():
     for cat_name, cat_config in config["categories"].items():
         keywords[cat_name] = cat_config["keywords"]
 
-    return keywords, config.get("default_category", "domain")
+    return {"keywords": keywords, "default_category": config.get("default_category", "domain")}
+
+
+def _load_category_keywords(
+    config_path: Path = CONFIG_PATH, cache_file: Path = CACHE_FILE
+) -> tuple[dict[str, list[str]], str]:
+    """
+    Load category keywords, using the compiled cache while the config is unchanged.
+
+    Args:
+        config_path: Path to categories.yaml
+        cache_file: Path to the compiled JSON cache
+
+    Returns:
+        tuple[dict[str, list[str]], str]: (keywords by category, default category)
+    """
+    stat = config_path.stat()
+    source = {"path": str(config_path), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+    try:
+        cached = json.loads(cache_file.read_text(encoding="utf-8"))
+        if cached.get("source") == source:
+            return cached["keywords"], cached["default_category"]
+    except (OSError, ValueError, KeyError, AttributeError):
+        pass
+
+    compiled = _compile_category_config(config_path)
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+        tmp_file.write_text(json.dumps({"source": source, **compiled}, ensure_ascii=False), encoding="utf-8")
+        tmp_file.replace(cache_file)
+    except OSError:
+        pass  # Cache is an optimization only
+
+    return compiled["keywords"], compiled["default_category"]
+
+
+def get_category_config() -> tuple[dict[str, list[str]], str]:
+    """
+    Return category keywords and default category (loaded on first use).
 
+    Returns:
+        tuple[dict[str, list[str]], str]: (keywords by category, default category)
+    """
+    global _category_config
+    if _category_config is None:
+        _category_config = _load_category_keywords()
+    return _category_config
 
-# Category keywords for automatic classification (loaded from config)
-CATEGORY_KEYWORDS, DEFAULT_CATEGORY = _load_category_keywords()
+
+def __getattr__(name: str):
+    # CATEGORY_KEYWORDS / DEFAULT_CATEGORY stay importable but are loaded lazily
+    if name == "CATEGORY_KEYWORDS":
+        return get_category_config()[0]
+    if name == "DEFAULT_CATEGORY":
+        return get_category_config()[1]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class KnowledgeCategorizer:
     """Categorize knowledge items into directories."""
 
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, analysis_cache: DocumentCache | None = None):
         """
         Initialize categorizer.
 
         Args:
             repo_path: Path to knowledge repository
+            analysis_cache: Document analysis cache (defaults to the process-wide shared cache)
         """
         self.repo_path = Path(repo_path).expanduser()
-        self._ensure_category_dirs()
+        self.analysis_cache = analysis_cache if analysis_cache is not None else get_default_cache()
+        # Category directories are provisioned lazily on first write
+        self._provisioned: set[str] = set()
+
+    def ensure_category_dir(self, category: str) -> Path:
+        """
+        Create a category directory (with README) if it doesn't exist.
+
+        Args:
+            category: Category name
 
-    def _ensure_category_dirs(self):
-        """Create category directories if they don't exist."""
-        for category in CATEGORY_KEYWORDS.keys():
-            category_dir = self.repo_path / category
-            category_dir.mkdir(parents=True, exist_ok=True)
+        Returns:
+            Path: Category directory
+        """
+        category_dir = self.repo_path / category
+        if category in self._provisioned:
+            return category_dir
 
-            # Create README if doesn't exist
-            readme = category_dir / "README.md"
-            if not readme.exists():
-                readme.write_text(f"# {category.title()}\n\n", encoding="utf-8")
+        category_dir.mkdir(parents=True, exist_ok=True)
+
+        # Create README if doesn't exist
+        readme = category_dir / "README.md"
+        if not readme.exists():
+            readme.write_text(f"# {category.title()}\n\n", encoding="utf-8")
+
+        self._provisioned.add(category)
+        return category_dir
 
     def categorize(self, text: str, tags: list[str] | None = None) -> str:
         """
@@ -64,22 +145,19 @@ class KnowledgeCategorizer:
         Returns:
             str: Category name
         """
-        text_lower = text.lower()
+        category_keywords, default_category = get_category_config()
+        analysis = self.analysis_cache.get(text)
         scores = {}
 
         # Score each category based on keyword matches
-        for category, keywords in CATEGORY_KEYWORDS.items():
-            score = 0
-            for keyword in keywords:
-                if keyword in text_lower:
-                    score += text_lower.count(keyword)
-            scores[category] = score
+        for category, keywords in category_keywords.items():
+            scores[category] = sum(analysis.count(keyword) for keyword in keywords)
 
         # Check tags if provided
         if tags:
             for tag in tags:
                 tag_lower = tag.lower()
-                for category, keywords in CATEGORY_KEYWORDS.items():
+                for category, keywords in category_keywords.items():
                     if tag_lower in keywords or category in tag_lower:
                         scores[category] += 5  # Tag matches get higher weight
 
@@ -87,7 +165,7 @@ class KnowledgeCategorizer:
         if max(scores.values()) > 0:
             return max(scores, key=scores.get)
         else:
-            return DEFAULT_CATEGORY
+            return default_category
 
     def generate_filename(
         self, title: str, date: str, provided_filename: str | None = None
@@ -144,7 +222,7 @@ class KnowledgeCategorizer:
         Returns:
             Path: Path to created file
         """
-        category_dir = self.repo_path / category
+        category_dir = self.ensure_category_dir(category)
         file_path = category_dir / filename
 
         # Build frontmatter
@@ -4,30 +4,34 @@ Check similarity between knowledge items to detect duplicates.
 Uses TF-IDF and cosine similarity for text comparison.
 """
 
-import json
+import importlib.util
+import sys
 from pathlib import Path
 from typing import Any
 
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
 
-    SKLEARN_AVAILABLE = True
-except ImportError:
-    SKLEARN_AVAILABLE = False
+from document_analysis import DocumentAnalysis, DocumentCache, get_default_cache, tfidf_cosine
+
+# find_spec only checks that scikit-learn is installed; its stop word list is
+# imported lazily by document_analysis on the first TF-IDF comparison
+SKLEARN_AVAILABLE = importlib.util.find_spec("sklearn") is not None
 
 
 class SimilarityChecker:
     """Check similarity between knowledge items."""
 
-    def __init__(self, threshold: float = 0.7):
+    def __init__(self, threshold: float = 0.7, analysis_cache: DocumentCache | None = None):
         """
         Initialize similarity checker.
 
         Args:
             threshold: Similarity threshold (0.0-1.0). Items above this are considered duplicates.
+            analysis_cache: Document analysis cache (defaults to the process-wide shared cache)
         """
         self.threshold = threshold
+        self.analysis_cache = analysis_cache if analysis_cache is not None else get_default_cache()
 
         if not SKLEARN_AVAILABLE:
             print(
@@ -53,21 +57,56 @@ class SimilarityChecker:
         else:
             return self._simple_similarity(text1, text2)
 
+    def analysis_similarity(self, analysis1: DocumentAnalysis, analysis2: DocumentAnalysis) -> float:
+        """
+        Calculate similarity between two analyzed texts.
+
+        Same score as calculate_similarity() on their texts, for callers that
+        already hold the analyses (nothing is looked up in the cache).
+
+        Args:
+            analysis1: First document
+            analysis2: Second document
+
+        Returns:
+            float: Similarity score (0.0-1.0)
+        """
+        if not analysis1.text or not analysis2.text:
+            return 0.0
+
+        if SKLEARN_AVAILABLE:
+            similarity = tfidf_cosine(analysis1, analysis2)
+            if similarity is not None:
+                return similarity
+        return self._word_overlap(analysis1.words, analysis2.words)
+
+    def analyze(self, text: str) -> DocumentAnalysis:
+        """
+        Return the shared analysis of a text.
+
+        Args:
+            text: Document text
+
+        Returns:
+            DocumentAnalysis: Memoized analysis
+        """
+        return self.analysis_cache.get(text)
+
     def _tfidf_similarity(self, text1: str, text2: str) -> float:
-        """Calculate TF-IDF based cosine similarity."""
-        vectorizer = TfidfVectorizer(lowercase=True, stop_words="english")
-        try:
-            tfidf_matrix = vectorizer.fit_transform([text1, text2])
-            similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])[0][0]
-            return float(similarity)
-        except Exception:
+        """Calculate TF-IDF based cosine similarity (pairwise fit, cached term counts)."""
+        similarity = tfidf_cosine(self.analyze(text1), self.analyze(text2))
+        if similarity is None:
+            # Empty vocabulary (only stop words / single characters)
             return self._simple_similarity(text1, text2)
+        return similarity
 
     def _simple_similarity(self, text1: str, text2: str) -> float:
         """Fallback simple word-based similarity."""
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
+        return self._word_overlap(self.analyze(text1).words, self.analyze(text2).words)
 
+    @staticmethod
+    def _word_overlap(words1: frozenset[str], words2: frozenset[str]) -> float:
+        """Jaccard similarity of two word sets."""
         if not words1 or not words2:
             return 0.0
 
@@ -161,7 +200,11 @@ def main():
         print("  python check_similarity.py <new_text> --file <knowledge_file.md>")
         sys.exit(1)
 
-    checker = SimilarityChecker(threshold=0.7)
+    # Use the warm similarity service when it is running (answers in milliseconds)
+    from similarity_service import ServiceError, connect
+
+    service = connect()
+    checker = None if service else SimilarityChecker(threshold=0.7)
 
     if "--file" in sys.argv:
         new_text = sys.argv[1]
@@ -169,7 +212,15 @@ def main():
         knowledge_file = Path(sys.argv[file_idx + 1])
 
         print(f"Checking against: {knowledge_file}")
-        duplicates = checker.check_knowledge_file(new_text, knowledge_file)
+        duplicates = None
+        if service:
+            try:
+                duplicates = service.check_knowledge_file(new_text, knowledge_file, threshold=0.7)
+            except (OSError, ValueError, ServiceError) as e:
+                print(f"Warning: Similarity service failed, checking in-process: {e}")
+        if duplicates is None:
+            checker = checker or SimilarityChecker(threshold=0.7)
+            duplicates = checker.check_knowledge_file(new_text, knowledge_file)
 
         if duplicates:
             print(f"\n⚠️  Found {len(duplicates)} potential duplicates:")
@@ -182,7 +233,15 @@ def main():
         text1 = sys.argv[1]
         text2 = sys.argv[2]
 
-        similarity = checker.calculate_similarity(text1, text2)
+        similarity = None
+        if service:
+            try:
+                similarity = service.find_duplicates(text1, [text2], threshold=0.0)[0][1]
+            except (OSError, ValueError, ServiceError) as e:
+                print(f"Warning: Similarity service failed, checking in-process: {e}")
+        if similarity is None:
+            checker = checker or SimilarityChecker(threshold=0.7)
+            similarity = checker.calculate_similarity(text1, text2)
         print(f"Similarity: {similarity:.2%}")
 
         if similarity >= 0.7:
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Compact knowledge candidate payloads.
+Caps field sizes, summarizes tool_use inputs and stores error excerpts
+instead of full copies of the message text.
+"""
+
+import hashlib
+import json
+import re
+from typing import Any
+
+# Default per-field caps (override with CandidateCompactor(limits={...}))
+DEFAULT_LIMITS = {
+    "text_chars": 20000,  # candidate text
+    "max_errors": 3,  # error excerpts per candidate
+    "error_context_chars": 200,  # context kept around each error match
+    "max_tool_uses": 20,  # tool_use summaries per candidate
+    "max_tool_paths": 5,  # paths kept per tool_use summary
+    "tool_command_chars": 200,  # Bash command preview
+}
+
+# tool_use input keys that hold file or directory paths
+TOOL_PATH_KEYS = ("file_path", "notebook_path", "path", "directory", "cwd")
+
+TRUNCATION_MARKER = "\n…[truncated {count} chars]"
+
+
+class CandidateCompactor:
+    """Shrink candidate fields before they are stored or serialized."""
+
+    def __init__(self, limits: dict[str, int] | None = None):
+        """
+        Initialize compactor.
+
+        Args:
+            limits: Per-field caps overriding DEFAULT_LIMITS
+
+        Raises:
+            ValueError: If an unknown limit name is given
+        """
+        unknown = set(limits or {}) - set(DEFAULT_LIMITS)
+        if unknown:
+            raise ValueError(f"Unknown compaction limits: {sorted(unknown)}")
+        self.limits = {**DEFAULT_LIMITS, **(limits or {})}
+
+    def cap_text(self, text: str) -> str:
+        """
+        Truncate text to the configured size.
+
+        Args:
+            text: Candidate text
+
+        Returns:
+            str: Text, with a truncation marker if it was cut
+        """
+        limit = self.limits["text_chars"]
+        if len(text) <= limit:
+            return text
+        return text[:limit] + TRUNCATION_MARKER.format(count=len(text) - limit)
+
+    def error_excerpts(self, text: str, patterns: list[re.Pattern]) -> list[dict[str, Any]]:
+        """
+        Find error pattern matches and keep only an excerpt around each.
+
+        offset/length locate the match in the stored candidate text
+        (cap_text(text)). A match beyond text_chars keeps its excerpt (the
+        only copy of that part of the message) but has no offset/length.
+
+        Args:
+            text: Full candidate text (before cap_text)
+            patterns: Compiled error patterns
+
+        Returns:
+            list[dict]: Excerpts with pattern, surrounding text and, when inside the stored text, offset and length
+        """
+        context = self.limits["error_context_chars"]
+        text_limit = self.limits["text_chars"]
+        excerpts = []
+        for pattern in patterns:
+            if len(excerpts) >= self.limits["max_errors"]:
+                break
+            match = pattern.search(text)
+            if not match:
+                continue
+            start = max(match.start() - context, 0)
+            excerpt = {"pattern": pattern.pattern}
+            if match.end() <= text_limit:
+                excerpt["offset"] = match.start()
+                excerpt["length"] = match.end() - match.start()
+            excerpt["excerpt"] = text[start:match.end() + context]
+            excerpts.append(excerpt)
+        return excerpts
+
+    def summarize_tool_use(self, item: dict[str, Any]) -> dict[str, Any]:
+        """
+        Summarize a tool_use content item without its raw input.
+
+        Args:
+            item: tool_use content item ({"type": "tool_use", "name": ..., "input": ...})
+
+        Returns:
+            dict: Summary with name, paths, input size and hash
+        """
+        tool_input = item.get("input")
+        serialized = json.dumps(tool_input, ensure_ascii=False, sort_keys=True, default=str)
+        encoded = serialized.encode("utf-8")
+
+        summary = {
+            "name": item.get("name"),
+            "input_size": len(encoded),
+            "input_hash": "sha256:" + hashlib.sha256(encoded).hexdigest()[:16],
+        }
+
+        if isinstance(tool_input, dict):
+            summary["input_keys"] = sorted(tool_input)
+            paths = [
+                tool_input[key]
+                for key in TOOL_PATH_KEYS
+                if isinstance(tool_input.get(key), str)
+            ]
+            if paths:
+                summary["paths"] = paths[: self.limits["max_tool_paths"]]
+
+            command = tool_input.get("command")
+            if isinstance(command, str):
+                limit = self.limits["tool_command_chars"]
+                summary["command"] = command if len(command) <= limit else command[:limit] + "…"
+
+        return summary
+
+    def summarize_tool_uses(self, items: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Summarize tool_use items up to the configured count.
+
+        Args:
+            items: tool_use content items
+
+        Returns:
+            list[dict]: Tool use summaries
+        """
+        return [self.summarize_tool_use(item) for item in items[: self.limits["max_tool_uses"]]]
+
+
+def parse_limits(specs: list[str]) -> dict[str, int]:
+    """
+    Parse KEY=VALUE limit overrides from the command line.
+
+    Args:
+        specs: Strings such as "text_chars=8000"
+
+    Returns:
+        dict[str, int]: Parsed limits
+
+    Raises:
+        ValueError: If a spec is malformed
+    """
+    limits = {}
+    for spec in specs:
+        key, sep, value = spec.partition("=")
+        if not sep or not value.isdigit():
+            raise ValueError(f"Invalid limit: {spec} (expected KEY=INT)")
+        limits[key] = int(value)
+    return limits
@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
 """Create knowledge files from Claude Code evaluation results."""
 
-import json
 import re
+import sqlite3
 import subprocess
 import sys
 from datetime import datetime
@@ -12,8 +12,13 @@ from typing import Any
 SCRIPT_DIR = Path(__file__).parent
 sys.path.insert(0, str(SCRIPT_DIR))
 
+import json_backend
+from aggregate_stats import StatsAggregator
 from categorize_knowledge import KnowledgeCategorizer
 from check_similarity import SimilarityChecker
+from search_index import EXCLUDED_FILES, KnowledgeSearchIndex
+from similarity_service import ServiceError, SimilarityClient, connect
+from throttle import IOThrottle, configure_background
 
 # Pattern for sanitizing filenames
 INVALID_FILENAME_CHARS = re.compile(r'[/\\:*?"<>|]')
@@ -22,16 +27,39 @@ INVALID_FILENAME_CHARS = re.compile(r'[/\\:*?"<>|]')
 class KnowledgeFileCreator:
     """Create knowledge files from evaluation results."""
 
-    def __init__(self, repo_path: str):
+    def __init__(
+        self,
+        repo_path: str,
+        throttle: IOThrottle | None = None,
+        similarity_service: SimilarityClient | None = None,
+    ):
         """
         Initialize file creator.
 
         Args:
             repo_path: Path to knowledge repository
+            throttle: Optional read throttle (background mode)
+            similarity_service: Optional client of a warm similarity service for this repository
         """
         self.repo_path = Path(repo_path).expanduser()
+        self.throttle = throttle
+        self.similarity_service = similarity_service
         self.categorizer = KnowledgeCategorizer(str(self.repo_path))
         self.similarity_checker = SimilarityChecker(threshold=0.7)
+        self.search_index = self._open_search_index()
+
+    def _open_search_index(self) -> KnowledgeSearchIndex | None:
+        """
+        Open the repository's search index.
+
+        Returns:
+            KnowledgeSearchIndex | None: Index, or None if SQLite (FTS5 trigram) is unavailable
+        """
+        try:
+            return KnowledgeSearchIndex(str(self.repo_path))
+        except (OSError, sqlite3.Error) as e:
+            print(f"Warning: Search index unavailable, scanning files instead: {e}")
+            return None
 
     def create_files(
         self,
@@ -52,11 +80,11 @@ class KnowledgeFileCreator:
         """
         # Load candidates
         with open(candidates_file) as f:
-            candidates = json.load(f)
+            candidates = json_backend.load(f)
 
         # Load evaluation results
         with open(evaluation_file) as f:
-            evaluations = json.load(f)
+            evaluations = json_backend.load(f)
 
         # Create mapping of index to candidate
         candidate_map = {i: candidate for i, candidate in enumerate(candidates)}
@@ -69,11 +97,19 @@ class KnowledgeFileCreator:
             "duplicates": 0,
             "created": 0,
             "by_category": {},
+            "by_project": {},
+            "files": [],
         }
 
         created_files = []
 
+        # Pick up files added or edited outside this script before checking duplicates
+        if self.search_index:
+            self.search_index.update()
+
         for evaluation in evaluations:
+            if self.throttle:
+                self.throttle.pause_between_files()
             if evaluation["decision"] == "reject":
                 stats["rejected"] += 1
                 continue
@@ -97,19 +133,33 @@ class KnowledgeFileCreator:
                 continue
 
             # Create knowledge file
+            project_path = candidate.get("project_path", "")
             file_path = self._create_knowledge_file(
                 category=category,
                 title=title,
                 text=text,
                 timestamp=candidate["timestamp"],
-                project_path=candidate.get("project_path", ""),
+                project_path=project_path,
                 provided_filename=filename,
             )
 
             if file_path:
+                if self.search_index:
+                    # Later candidates in this run are checked against this file too
+                    self.search_index.update([file_path])
                 created_files.append(file_path)
                 stats["created"] += 1
                 stats["by_category"][category] = stats["by_category"].get(category, 0) + 1
+                if project_path:
+                    stats["by_project"][project_path] = stats["by_project"].get(project_path, 0) + 1
+                stats["files"].append(
+                    {
+                        "path": str(file_path.relative_to(self.repo_path)),
+                        "category": category,
+                        "project": project_path,
+                        "title": title,
+                    }
+                )
                 print(f"✅ Created: {file_path.relative_to(self.repo_path)}")
 
         # Commit to git if files were created
@@ -129,13 +179,36 @@ class KnowledgeFileCreator:
         Returns:
             bool: True if duplicate found
         """
+        if self.similarity_service:
+            try:
+                match = self.similarity_service.is_duplicate(text, category, self.similarity_checker.threshold)
+                return match is not None
+            except (OSError, ValueError, ServiceError) as e:
+                print(f"Warning: Similarity service failed, checking in-process: {e}")
+                self.similarity_service = None
+
+        if self.search_index:
+            # Indexed contents, most similar-looking files first (stops at the first duplicate)
+            for _, existing_text in self.search_index.category_documents(category, text):
+                if self.throttle:
+                    self.throttle.consume(len(existing_text.encode("utf-8")))
+                similarity = self.similarity_checker.calculate_similarity(text, existing_text)
+                if similarity >= self.similarity_checker.threshold:
+                    return True
+            return False
+
         category_dir = self.repo_path / category
         if not category_dir.exists():
             return False
 
         for existing_file in category_dir.glob("*.md"):
+            if existing_file.name in EXCLUDED_FILES:
+                continue
             try:
-                existing_text = existing_file.read_text(encoding="utf-8")
+                raw = existing_file.read_bytes()
+                if self.throttle:
+                    self.throttle.consume(len(raw))
+                existing_text = raw.decode("utf-8")
                 similarity = self.similarity_checker.calculate_similarity(
                     text, existing_text
                 )
@@ -170,8 +243,7 @@ class KnowledgeFileCreator:
         Returns:
             Path | None: Created file path or None on error
         """
-        category_dir = self.repo_path / category
-        category_dir.mkdir(parents=True, exist_ok=True)
+        category_dir = self.categorizer.ensure_category_dir(category)
 
         # Generate filename using categorizer (YYYY-MM-DD_kebab-case.md format)
         dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
@@ -248,18 +320,24 @@ class KnowledgeFileCreator:
 
 def main():
     """CLI interface."""
-    if len(sys.argv) < 4:
-        print("Usage: python create_knowledge_files.py <candidates.json> <evaluations.json> <repo_path> [date]")
-        sys.exit(1)
-
-    candidates_file = Path(sys.argv[1])
-    evaluation_file = Path(sys.argv[2])
-    repo_path = sys.argv[3]
-
-    if len(sys.argv) >= 5:
-        date = sys.argv[4]
-    else:
-        date = datetime.now().strftime("%Y-%m-%d")
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Create knowledge files from evaluation results")
+    parser.add_argument("candidates", help="Candidates JSON file")
+    parser.add_argument("evaluations", help="Evaluation results JSON file")
+    parser.add_argument("repo_path", help="Knowledge repository path")
+    parser.add_argument("date", nargs="?", help="Date (YYYY-MM-DD, default: today)")
+    parser.add_argument(
+        "--background", action="store_true",
+        help="Lower CPU/IO priority and throttle reads so interactive sessions stay responsive",
+    )
+    parser.add_argument("--max-mbps", type=float, help="Cap knowledge file read throughput (MB/s)")
+    args = parser.parse_args()
+
+    candidates_file = Path(args.candidates)
+    evaluation_file = Path(args.evaluations)
+    repo_path = args.repo_path
+    date = args.date or datetime.now().strftime("%Y-%m-%d")
 
     if not candidates_file.exists():
         print(f"Error: Candidates file not found: {candidates_file}")
@@ -274,7 +352,16 @@ def main():
     print(f"  Evaluations: {evaluation_file}")
     print(f"  Repository: {repo_path}")
 
-    creator = KnowledgeFileCreator(repo_path)
+    try:
+        throttle = configure_background(args.background, args.max_mbps)
+    except ValueError as e:
+        parser.error(str(e))
+
+    similarity_service = connect(repo_path)
+    if similarity_service:
+        print(f"  Similarity service: {similarity_service.socket_path}")
+
+    creator = KnowledgeFileCreator(repo_path, throttle=throttle, similarity_service=similarity_service)
     stats = creator.create_files(candidates_file, evaluation_file, date)
 
     print("\n=== Statistics ===")
@@ -287,6 +374,8 @@ def main():
     for category, count in stats["by_category"].items():
         print(f"  {category}: {count}")
 
+    StatsAggregator().record_creation(date, stats, run_id=str(evaluation_file.resolve()))
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,235 @@
+"""
+Shared per-document text analysis.
+Normalized text, tokens, term counts and content hash are computed once per
+text and memoized, so the categorizer and the similarity checker never
+re-scan the same document.
+"""
+
+import hashlib
+import importlib.util
+import math
+import re
+from collections import Counter, OrderedDict
+
+# Same tokenization as scikit-learn's TfidfVectorizer default
+TOKEN_PATTERN = re.compile(r"(?u)\b\w\w+\b")
+
+# Default byte budget for the shared cache (repository documents are re-used across checks)
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Rough per-entry overhead used in size estimates (object headers, dict slots)
+_ENTRY_OVERHEAD = 64
+
+_stop_words: frozenset[str] | None = None
+
+
+def _english_stop_words() -> frozenset[str]:
+    """Return scikit-learn's English stop words, or an empty set without sklearn."""
+    global _stop_words
+    if _stop_words is None:
+        if importlib.util.find_spec("sklearn") is not None:
+            from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+            _stop_words = frozenset(ENGLISH_STOP_WORDS)
+        else:
+            _stop_words = frozenset()
+    return _stop_words
+
+
+class DocumentAnalysis:
+    """Lazily computed, memoized views of a single text."""
+
+    __slots__ = ("text", "_lower", "_words", "_terms", "_norm_sq", "_hash", "_counts")
+
+    def __init__(self, text: str):
+        """
+        Initialize analysis.
+
+        Args:
+            text: Document text
+        """
+        self.text = text
+        self._lower = None
+        self._words = None
+        self._terms = None
+        self._norm_sq = None
+        self._hash = None
+        self._counts = {}
+
+    @property
+    def lower(self) -> str:
+        """Lowercased text."""
+        if self._lower is None:
+            self._lower = self.text.lower()
+        return self._lower
+
+    @property
+    def words(self) -> frozenset[str]:
+        """Whitespace-separated lowercase words (for simple set similarity)."""
+        if self._words is None:
+            self._words = frozenset(self.lower.split())
+        return self._words
+
+    @property
+    def terms(self) -> Counter:
+        """TF-IDF term counts (sklearn tokenization, English stop words removed)."""
+        if self._terms is None:
+            stop_words = _english_stop_words()
+            self._terms = Counter(
+                token for token in TOKEN_PATTERN.findall(self.lower) if token not in stop_words
+            )
+        return self._terms
+
+    @property
+    def norm_sq(self) -> int:
+        """Sum of squared term counts."""
+        if self._norm_sq is None:
+            self._norm_sq = sum(count * count for count in self.terms.values())
+        return self._norm_sq
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the text (e.g. "sha256:ab12...")."""
+        if self._hash is None:
+            self._hash = "sha256:" + hashlib.sha256(self.text.encode("utf-8")).hexdigest()
+        return self._hash
+
+    def count(self, keyword: str) -> int:
+        """
+        Count occurrences of a lowercase keyword in the lowercased text.
+
+        Args:
+            keyword: Lowercase keyword
+
+        Returns:
+            int: Number of non-overlapping occurrences
+        """
+        cached = self._counts.get(keyword)
+        if cached is None:
+            cached = self._counts[keyword] = self.lower.count(keyword)
+        return cached
+
+    def estimated_size(self) -> int:
+        """Approximate memory footprint in bytes (for the cache budget)."""
+        size = _ENTRY_OVERHEAD + len(self.text) * (2 if self._lower is not None else 1)
+        if self._terms is not None:
+            size += sum(len(term) + _ENTRY_OVERHEAD for term in self._terms)
+        if self._words is not None:
+            size += sum(len(word) + _ENTRY_OVERHEAD for word in self._words)
+        return size
+
+
+def tfidf_cosine(a: DocumentAnalysis, b: DocumentAnalysis) -> float | None:
+    """
+    Cosine similarity of two documents under a TF-IDF model fitted on the pair.
+
+    Matches TfidfVectorizer(lowercase=True, stop_words="english") fitted on
+    [a, b] (smooth idf, l2 norm): shared terms get idf 1, others ln(3/2) + 1.
+
+    Args:
+        a: First document
+        b: Second document
+
+    Returns:
+        float | None: Similarity (0.0-1.0), or None if neither document has
+            any terms (TfidfVectorizer would reject the empty vocabulary)
+    """
+    if not a.terms and not b.terms:
+        return None
+
+    small, large = (a, b) if len(a.terms) <= len(b.terms) else (b, a)
+    dot = 0
+    shared_small_sq = 0
+    shared_large_sq = 0
+    for term, count in small.terms.items():
+        other = large.terms.get(term)
+        if other:
+            dot += count * other
+            shared_small_sq += count * count
+            shared_large_sq += other * other
+
+    if not dot:
+        return 0.0
+
+    unique_idf_sq = (math.log(1.5) + 1) ** 2
+    norm_small = shared_small_sq + unique_idf_sq * (small.norm_sq - shared_small_sq)
+    norm_large = shared_large_sq + unique_idf_sq * (large.norm_sq - shared_large_sq)
+    return min(dot / math.sqrt(norm_small * norm_large), 1.0)
+
+
+class DocumentCache:
+    """LRU cache of DocumentAnalysis objects bounded by estimated bytes."""
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES):
+        """
+        Initialize cache.
+
+        Args:
+            max_bytes: Approximate memory budget for cached analyses
+        """
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, tuple[DocumentAnalysis, int]] = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> DocumentAnalysis:
+        """
+        Return the analysis for text, creating it on first use.
+
+        Args:
+            text: Document text
+
+        Returns:
+            DocumentAnalysis: Shared analysis object
+        """
+        entry = self._entries.get(text)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(text)
+            analysis, size = entry
+            # Lazily computed views may have grown the entry since it was stored
+            new_size = analysis.estimated_size()
+            if new_size != size:
+                self._bytes += new_size - size
+                self._entries[text] = (analysis, new_size)
+                self._evict()
+            return analysis
+
+        self.misses += 1
+        analysis = DocumentAnalysis(text)
+        size = analysis.estimated_size()
+        self._entries[text] = (analysis, size)
+        self._bytes += size
+        self._evict()
+        return analysis
+
+    def _evict(self):
+        """Drop least recently used entries until within budget (keeps the newest)."""
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+    @property
+    def size_bytes(self) -> int:
+        """Estimated bytes currently held."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+_default_cache: DocumentCache | None = None
+
+
+def get_default_cache() -> DocumentCache:
+    """
+    Return the process-wide cache shared by the categorizer and similarity checker.
+
+    Returns:
+        DocumentCache: Shared cache
+    """
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = DocumentCache()
+    return _default_cache
@@ -3,12 +3,26 @@
 Extract potential knowledge items from Claude Code JSONL conversation logs.
 """
 
+import hashlib
+import heapq
 import json
 import re
+import socket
+import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Any
 
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from aggregate_stats import StatsAggregator
+from candidate_record import CandidateRecord, to_json
+from compact_candidates import CandidateCompactor, parse_limits
+from json_backend import decode_log_entry
+from log_files import LogTimeIndex, find_log_files, open_log
+from throttle import IOThrottle, configure_background
+
 # Pre-compiled regex patterns for performance
 SYSTEM_MESSAGE_PATTERN = re.compile(r"<system-reminder>|<function_results>")
 COMPLETION_PATTERN = re.compile(
@@ -45,17 +59,177 @@ SELF_LOG_PATTERNS = [
     re.compile(r"日次知識まとめ", re.MULTILINE),
 ]
 
+# Pre-ranking score weights (cheap local score computed before agent evaluation)
+SCORE_VALUE_DENSITY_WEIGHT = 2.0  # per VALUE_PATTERN hit per 1000 chars
+SCORE_VALUE_DENSITY_CAP = 10.0
+SCORE_ERROR_BONUS = 3.0
+SCORE_TOOL_USE_WEIGHT = 0.5
+SCORE_TOOL_USE_CAP = 5
+SCORE_NOVELTY_WEIGHT = 4.0
+# (upper bound of text length, score); longer texts get SCORE_LENGTH_OVERFLOW
+SCORE_LENGTH_BANDS = [(500, 1.0), (2000, 3.0), (8000, 2.0)]
+SCORE_LENGTH_OVERFLOW = 0.5
+WORD_PATTERN = re.compile(r"\w+")
+
+# Shard partial output format (self-describing, consumed by merge_candidates.py)
+PARTIAL_KIND = "knowledge-candidates-partial"
+PARTIAL_VERSION = 1
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """
+    Parse a shard spec of the form "i/n".
+
+    Args:
+        spec: Shard spec (0-based index, e.g. "0/3")
+
+    Returns:
+        tuple[int, int]: (shard_index, shard_count)
+
+    Raises:
+        ValueError: If the spec is malformed or out of range
+    """
+    try:
+        index_str, count_str = spec.split("/")
+        index, count = int(index_str), int(count_str)
+    except ValueError:
+        raise ValueError(f"Invalid shard spec: {spec} (expected i/n)") from None
+
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Invalid shard spec: {spec} (need 0 <= i < n)")
+    return index, count
+
+
+def shard_for_project(project_key: str, shard_count: int) -> int:
+    """
+    Assign a project directory to a shard.
+
+    Uses a stable hash so every machine computes the same partition.
+
+    Args:
+        project_key: Project directory name under the projects dir
+        shard_count: Total number of shards
+
+    Returns:
+        int: Shard index (0-based)
+    """
+    digest = hashlib.sha1(project_key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shard_count
+
+
+def candidate_fingerprint(candidate: dict[str, Any]) -> str:
+    """
+    Compute a content fingerprint for exact-duplicate detection.
+
+    Whitespace and case are normalized so the same message logged on
+    different machines yields the same fingerprint.
+
+    Args:
+        candidate: Knowledge candidate
+
+    Returns:
+        str: Fingerprint (e.g. "sha256:ab12...")
+    """
+    normalized = WHITESPACE_PATTERN.sub(" ", candidate.get("text", "")).strip().lower()
+    return "sha256:" + hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class CandidateRanker:
+    """Keep the top-N scored candidates per day and project with bounded memory."""
+
+    def __init__(self, top_n: int):
+        """
+        Initialize ranker.
+
+        Args:
+            top_n: Number of candidates to keep per (day, project)
+        """
+        self.top_n = top_n
+        self._heaps: dict[tuple[str, str], list] = {}
+        self._seq = 0
+
+    def add(self, candidate: dict[str, Any]):
+        """
+        Offer a scored candidate; the lowest score is evicted when a group is full.
+
+        Args:
+            candidate: Candidate with a "score" field
+        """
+        key = ((candidate.get("timestamp") or "")[:10], candidate.get("project_path", ""))
+        heap = self._heaps.setdefault(key, [])
+        # -seq: on equal scores the earlier candidate wins
+        item = (candidate["score"], -self._seq, candidate)
+        self._seq += 1
+
+        if len(heap) < self.top_n:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+
+    def ranked(self) -> list[dict[str, Any]]:
+        """
+        Return kept candidates ordered by score (highest first).
+
+        Returns:
+            list[dict]: Ranked candidates
+        """
+        items = [item for heap in self._heaps.values() for item in heap]
+        items.sort(key=lambda x: (x[0], x[1]), reverse=True)
+        return [candidate for _, _, candidate in items]
+
 
 class KnowledgeExtractor:
     """Extract knowledge candidates from JSONL conversation logs."""
 
-    def __init__(self, projects_dir: str = "~/.claude/projects"):
+    def __init__(
+        self,
+        projects_dir: str = "~/.claude/projects",
+        shard: tuple[int, int] | None = None,
+        compactor: CandidateCompactor | None = None,
+        time_index: LogTimeIndex | None = None,
+        throttle: IOThrottle | None = None,
+    ):
+        """
+        Initialize extractor.
+
+        Args:
+            projects_dir: Claude Code projects directory
+            shard: Optional (shard_index, shard_count) to process only a
+                deterministic slice of the project directories
+            compactor: Candidate payload compactor (default caps if omitted)
+            time_index: Optional per-file timestamp range index used to skip
+                unchanged logs that cannot contain the target date
+            throttle: Optional read throttle (background mode)
+        """
         self.projects_dir = Path(projects_dir).expanduser()
+        self.shard = shard
+        self.compactor = compactor or CandidateCompactor()
+        self.time_index = time_index
+        self.throttle = throttle
+        # 除外理由ごとの件数（集計ストア用）
+        self.exclusion_counts: dict[str, int] = {}
+        self.files_scanned = 0
+
+    def _project_key(self, jsonl_file: Path) -> str:
+        """Return the project directory name a JSONL file belongs to."""
+        relative = jsonl_file.relative_to(self.projects_dir)
+        return relative.parts[0] if len(relative.parts) > 1 else ""
+
+    def _in_shard(self, jsonl_file: Path) -> bool:
+        """Check whether a JSONL file belongs to this extractor's shard."""
+        if self.shard is None:
+            return True
+        shard_index, shard_count = self.shard
+        return shard_for_project(self._project_key(jsonl_file), shard_count) == shard_index
 
     def find_jsonl_files(self, target_date: str) -> list[Path]:
         """
         Find JSONL files matching the target date.
 
+        Rotated (session.jsonl.1) and compressed (.gz/.bz2/.xz/.zst) logs are
+        included.
+
         Args:
             target_date: Date in YYYY-MM-DD format
 
@@ -67,12 +241,13 @@ class KnowledgeExtractor:
             return jsonl_files
 
         # Search for JSONL files in project directories
-        for jsonl_file in self.projects_dir.rglob("*.jsonl"):
-            jsonl_files.append(jsonl_file)
+        for jsonl_file in find_log_files(self.projects_dir):
+            if self._in_shard(jsonl_file):
+                jsonl_files.append(jsonl_file)
 
         return jsonl_files
 
-    def extract_from_file(self, jsonl_file: Path, target_date: str) -> list[dict[str, Any]]:
+    def extract_from_file(self, jsonl_file: Path, target_date: str) -> list[CandidateRecord]:
         """
         Extract knowledge candidates from a single JSONL file.
 
@@ -81,33 +256,47 @@ class KnowledgeExtractor:
             target_date: Date in YYYY-MM-DD format
 
         Returns:
-            list[dict]: List of knowledge candidates
+            list[CandidateRecord]: List of knowledge candidates
         """
         candidates = []
         target_dt = datetime.strptime(target_date, "%Y-%m-%d")
         next_day = target_dt + timedelta(days=1)
 
+        # Unchanged logs known to cover other dates are not opened (or decompressed) again
+        if self.time_index and not self.time_index.may_contain(jsonl_file, target_dt, next_day):
+            return candidates
+
         # Get file-level project_path for fallback
         file_project_path = self._get_file_project_path(jsonl_file)
 
+        # Vocabulary seen so far in this session (for novelty scoring)
+        session_vocab: set[str] = set()
+
+        # Timestamp range of the whole file (for the time index)
+        first_dt = last_dt = None
+
         try:
-            with open(jsonl_file) as f:
+            with open_log(jsonl_file, self.throttle.consume if self.throttle else None) as f:
                 for line_num, line in enumerate(f, 1):
                     try:
-                        entry = json.loads(line)
+                        entry = decode_log_entry(line)
 
                         # Check if entry is within target date
                         timestamp = entry.get("timestamp")
                         if not timestamp:
                             continue
 
-                        entry_dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
-                        if not (target_dt <= entry_dt.replace(tzinfo=None) < next_day):
+                        entry_dt = datetime.fromisoformat(timestamp.replace("Z", "+00:00")).replace(tzinfo=None)
+                        if first_dt is None or entry_dt < first_dt:
+                            first_dt = entry_dt
+                        if last_dt is None or entry_dt > last_dt:
+                            last_dt = entry_dt
+                        if not (target_dt <= entry_dt < next_day):
                             continue
 
                         # Extract relevant content
                         candidate = self._extract_candidate(
-                            entry, jsonl_file, line_num, file_project_path
+                            entry, jsonl_file, line_num, file_project_path, session_vocab
                         )
                         if candidate:
                             candidates.append(candidate)
@@ -118,6 +307,9 @@ class KnowledgeExtractor:
                         print(f"Warning: Error processing line {line_num} in {jsonl_file}: {e}")
                         continue
 
+            if self.time_index:
+                self.time_index.record(jsonl_file, first_dt, last_dt)
+
         except FileNotFoundError:
             print(f"Warning: File not found: {jsonl_file}")
         except Exception as e:
@@ -167,6 +359,54 @@ class KnowledgeExtractor:
 
         return False, None
 
+    def _score_candidate(
+        self,
+        text: str,
+        errors: list[dict[str, Any]],
+        tool_uses: list[dict[str, Any]],
+        novelty: float,
+    ) -> float:
+        """
+        Compute a cheap value score used to pre-rank candidates.
+
+        Args:
+            text: Candidate text
+            errors: Error excerpts found in the text
+            tool_uses: Tool use summaries in the message
+            novelty: Share of words not seen earlier in the session (0.0-1.0)
+
+        Returns:
+            float: Score (higher is more likely to be valuable)
+        """
+        hits = len(VALUE_PATTERN.findall(text))
+        density = hits * 1000 / max(len(text), 1)
+        score = min(density * SCORE_VALUE_DENSITY_WEIGHT, SCORE_VALUE_DENSITY_CAP)
+
+        if errors:
+            score += SCORE_ERROR_BONUS
+        score += min(len(tool_uses), SCORE_TOOL_USE_CAP) * SCORE_TOOL_USE_WEIGHT
+
+        for upper, band_score in SCORE_LENGTH_BANDS:
+            if len(text) < upper:
+                score += band_score
+                break
+        else:
+            score += SCORE_LENGTH_OVERFLOW
+
+        score += novelty * SCORE_NOVELTY_WEIGHT
+        return round(score, 3)
+
+    def _session_novelty(self, text: str, session_vocab: set[str] | None) -> float:
+        """Return the share of new words in text and add them to the session vocabulary."""
+        if session_vocab is None:
+            return 1.0
+        words = set(WORD_PATTERN.findall(text.lower()))
+        if not words:
+            return 0.0
+        new_words = words - session_vocab
+        session_vocab.update(new_words)
+        return len(new_words) / len(words)
+
     def _get_file_project_path(self, jsonl_file: Path) -> str:
         """
         Get the project path from the first entry with cwd field.
@@ -178,10 +418,10 @@ class KnowledgeExtractor:
             str: Project path or empty string if not found
         """
         try:
-            with open(jsonl_file) as f:
+            with open_log(jsonl_file, self.throttle.consume if self.throttle else None) as f:
                 for line in f:
                     try:
-                        entry = json.loads(line)
+                        entry = decode_log_entry(line)
                         cwd = entry.get("cwd")
                         if cwd:
                             return cwd
@@ -193,8 +433,8 @@ class KnowledgeExtractor:
 
     def _extract_candidate(
         self, entry: dict[str, Any], source_file: Path, line_num: int,
-        fallback_project_path: str = ""
-    ) -> dict[str, Any] | None:
+        fallback_project_path: str = "", session_vocab: set[str] | None = None
+    ) -> CandidateRecord | None:
         """
         Extract a knowledge candidate from a JSONL entry.
 
@@ -202,9 +442,11 @@ class KnowledgeExtractor:
             entry: JSONL entry as dict
             source_file: Source file path
             line_num: Line number in source file
+            fallback_project_path: Project path used when the entry has no cwd
+            session_vocab: Words seen earlier in the session (updated in place)
 
         Returns:
-            dict | None: Knowledge candidate or None if not relevant
+            CandidateRecord | None: Knowledge candidate or None if not relevant
         """
         # Claude Code JSONL structure: message is nested inside entry
         message = entry.get("message")
@@ -217,10 +459,9 @@ class KnowledgeExtractor:
         if not role or not content:
             return None
 
-        # Extract text content
+        # Extract text content (tool_use inputs are summarized, never stored raw)
         text_content = ""
-        tool_uses = []
-        errors = []
+        tool_use_items = []
 
         if isinstance(content, str):
             text_content = content
@@ -230,90 +471,205 @@ class KnowledgeExtractor:
                     if item.get("type") == "text":
                         text_content += item.get("text", "") + "\n"
                     elif item.get("type") == "tool_use":
-                        tool_uses.append(
-                            {
-                                "name": item.get("name"),
-                                "input": item.get("input"),
-                            }
-                        )
+                        tool_use_items.append(item)
                 elif isinstance(item, str):
                     text_content += item + "\n"
 
-        # Look for actual error patterns (stack traces, exceptions)
-        # Only include if it looks like a real error with context
-        for pattern in ERROR_PATTERNS:
-            if pattern.search(text_content):
-                errors.append(text_content)
-                break
-
         # Skip if no meaningful content
         text_content = text_content.strip()
-        should_exclude, _ = self._should_exclude(text_content, role)
+        should_exclude, reason = self._should_exclude(text_content, role)
         if should_exclude:
+            self.exclusion_counts[reason] = self.exclusion_counts.get(reason, 0) + 1
             return None
+
+        # Look for actual error patterns (stack traces, exceptions)
+        # Only excerpts around the matches are kept, not another copy of the text
+        errors = self.compactor.error_excerpts(text_content, ERROR_PATTERNS)
+        tool_uses = self.compactor.summarize_tool_uses(tool_use_items)
         if not text_content and not tool_uses and not errors:
             return None
 
-        return {
-            "timestamp": entry.get("timestamp"),
-            "role": role,
-            "text": text_content,
-            "tool_uses": tool_uses,
-            "errors": errors,
-            "source_file": str(source_file),
-            "line_number": line_num,
-            "project_path": entry.get("cwd") or fallback_project_path,
-        }
-
-    def extract_for_date(self, target_date: str) -> list[dict[str, Any]]:
+        novelty = self._session_novelty(text_content, session_vocab)
+
+        return CandidateRecord(
+            timestamp=entry.get("timestamp"),
+            role=role,
+            text=self.compactor.cap_text(text_content),
+            tool_uses=tool_uses,
+            errors=errors,
+            source_file=str(source_file),
+            line_number=line_num,
+            project_path=entry.get("cwd") or fallback_project_path,
+            score=self._score_candidate(text_content, errors, tool_uses, novelty),
+        )
+
+    def extract_for_date(
+        self, target_date: str, top_n: int | None = None
+    ) -> list[CandidateRecord]:
         """
         Extract all knowledge candidates for a specific date.
 
         Args:
             target_date: Date in YYYY-MM-DD format
+            top_n: Keep only the N highest-scored candidates per day and project
 
         Returns:
-            list[dict]: All knowledge candidates for the date
+            list[CandidateRecord]: Knowledge candidates for the date (ranked by score if top_n is set)
         """
         all_candidates = []
+        ranker = CandidateRanker(top_n) if top_n else None
 
         jsonl_files = self.find_jsonl_files(target_date)
         print(f"Found {len(jsonl_files)} JSONL files")
+        self.files_scanned = len(jsonl_files)
+        self.exclusion_counts = {}
 
         for jsonl_file in jsonl_files:
+            if self.throttle:
+                self.throttle.pause_between_files()
             candidates = self.extract_from_file(jsonl_file, target_date)
             if candidates:
                 print(f"  {jsonl_file.name}: {len(candidates)} candidates")
-                all_candidates.extend(candidates)
+                if ranker:
+                    for candidate in candidates:
+                        ranker.add(candidate)
+                else:
+                    all_candidates.extend(candidates)
 
+        if self.time_index:
+            self.time_index.save()
+
+        if ranker:
+            return ranker.ranked()
         return all_candidates
 
+    def extraction_stats(self, candidates: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        Summarize the last extract_for_date() run for the aggregate store.
+
+        Args:
+            candidates: Candidates returned by extract_for_date()
+
+        Returns:
+            dict: jsonl_files, candidates, excluded (by reason) and by_project counts
+        """
+        by_project: dict[str, int] = {}
+        for candidate in candidates:
+            project = candidate.get("project_path") or "unknown"
+            by_project[project] = by_project.get(project, 0) + 1
+        return {
+            "jsonl_files": self.files_scanned,
+            "candidates": len(candidates),
+            "excluded": dict(self.exclusion_counts),
+            "by_project": by_project,
+        }
+
+    def build_partial(
+        self, candidates: list[dict[str, Any]], target_date: str
+    ) -> dict[str, Any]:
+        """
+        Wrap shard candidates in a self-describing partial output.
+
+        Args:
+            candidates: Candidates extracted by this shard
+            target_date: Date in YYYY-MM-DD format
+
+        Returns:
+            dict: Partial output consumed by merge_candidates.py
+        """
+        shard_index, shard_count = self.shard or (0, 1)
+        projects = sorted({self._project_key(Path(c["source_file"])) for c in candidates})
+        return {
+            "kind": PARTIAL_KIND,
+            "version": PARTIAL_VERSION,
+            "date": target_date,
+            "shard": {"index": shard_index, "count": shard_count},
+            "host": socket.gethostname(),
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "projects": projects,
+            "candidate_count": len(candidates),
+            "stats": self.extraction_stats(candidates),
+            "candidates": [
+                {**candidate, "fingerprint": candidate_fingerprint(candidate)}
+                for candidate in candidates
+            ],
+        }
+
 
 def main():
     """CLI interface."""
-    import sys
-
-    if len(sys.argv) < 2:
-        # Default to yesterday
-        yesterday = (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
-        target_date = yesterday
-    else:
-        target_date = sys.argv[1]
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Extract knowledge candidates from JSONL logs")
+    parser.add_argument("date", nargs="?", help="Target date (YYYY-MM-DD, default: yesterday)")
+    parser.add_argument("--projects-dir", default="~/.claude/projects")
+    parser.add_argument("--shard", help="Process only shard i/n of the project directories (0-based)")
+    parser.add_argument("--output", help="Output file path")
+    parser.add_argument(
+        "--top", type=int, help="Keep only the N highest-scored candidates per day and project"
+    )
+    parser.add_argument(
+        "--limit", action="append", default=[], metavar="KEY=INT",
+        help="Override a candidate size cap (e.g. text_chars=8000)",
+    )
+    parser.add_argument(
+        "--no-stats", action="store_true", help="Do not record this run in the aggregate store"
+    )
+    parser.add_argument(
+        "--background", action="store_true",
+        help="Lower CPU/IO priority and throttle reads so interactive sessions stay responsive",
+    )
+    parser.add_argument("--max-mbps", type=float, help="Cap log read throughput (MB/s)")
+    args = parser.parse_args()
+
+    # Default to yesterday
+    target_date = args.date or (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    shard = None
+    if args.shard:
+        try:
+            shard = parse_shard(args.shard)
+        except ValueError as e:
+            parser.error(str(e))
 
     print(f"Extracting knowledge for: {target_date}")
+    if shard:
+        print(f"Shard: {shard[0]}/{shard[1]}")
 
-    extractor = KnowledgeExtractor()
-    candidates = extractor.extract_for_date(target_date)
+    try:
+        compactor = CandidateCompactor(parse_limits(args.limit))
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        throttle = configure_background(args.background, args.max_mbps)
+    except ValueError as e:
+        parser.error(str(e))
+
+    extractor = KnowledgeExtractor(
+        args.projects_dir, shard=shard, compactor=compactor, time_index=LogTimeIndex(), throttle=throttle
+    )
+    candidates = extractor.extract_for_date(target_date, top_n=args.top)
 
     print(f"\n✅ Total candidates extracted: {len(candidates)}")
 
-    # Output as JSON
-    output_file = Path(f"/tmp/knowledge_candidates_{target_date}.json")
+    # Output as JSON (shards emit a self-describing partial for merge_candidates.py)
+    if shard:
+        default_output = f"/tmp/knowledge_candidates_{target_date}.shard-{shard[0]}-of-{shard[1]}.json"
+        payload = extractor.build_partial(candidates, target_date)
+    else:
+        default_output = f"/tmp/knowledge_candidates_{target_date}.json"
+        payload = candidates
+
+    output_file = Path(args.output or default_output)
     with open(output_file, "w") as f:
-        json.dump(candidates, f, indent=2, ensure_ascii=False)
+        json.dump(payload, f, indent=2, ensure_ascii=False, default=to_json)
 
     print(f"📝 Saved to: {output_file}")
 
+    # シャードは別ホストの部分結果なので、マージ後の実行のみ集計する
+    if not shard and not args.no_stats:
+        StatsAggregator().record_extraction(target_date, extractor.extraction_stats(candidates))
+
 
 if __name__ == "__main__":
     main()
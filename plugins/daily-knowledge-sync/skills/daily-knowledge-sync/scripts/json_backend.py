@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Pluggable JSON decoding backend.
+Uses msgspec or orjson when installed and the standard library otherwise.
+Every backend accepts exactly what the standard library accepts (input a fast
+decoder rejects, such as NaN or an escaped lone surrogate, is decoded again with
+json) and raises json.JSONDecodeError on invalid input, so callers keep their
+existing skip-on-error handling.
+"""
+
+import importlib.util
+import json
+import os
+from typing import IO, Any
+
+# Preferred backend first; override with DAILY_KNOWLEDGE_JSON_BACKEND=json|orjson|msgspec
+BACKEND_ORDER = ("msgspec", "orjson", "json")
+BACKEND_ENV = "DAILY_KNOWLEDGE_JSON_BACKEND"
+
+
+def _as_text(data: str | bytes) -> str:
+    """Return data as str for JSONDecodeError messages."""
+    return data if isinstance(data, str) else data.decode("utf-8", "replace")
+
+
+def _stdlib_loads(data: str | bytes) -> Any:
+    """
+    Decode with the standard library (used when a fast decoder rejects data).
+
+    Raises:
+        json.JSONDecodeError: If the standard library rejects data too
+    """
+    try:
+        return json.loads(data)
+    except UnicodeDecodeError as e:  # Invalid UTF-8 in bytes input
+        raise json.JSONDecodeError(str(e), _as_text(data), 0) from e
+
+
+def _pick_log_fields(entry: Any) -> Any:
+    """Reduce a fully decoded log entry to the fields the extractor reads."""
+    if not isinstance(entry, dict):
+        return entry
+    picked = {key: entry[key] for key in ("timestamp", "cwd") if key in entry}
+    message = entry.get("message")
+    if isinstance(message, dict):
+        picked["message"] = {key: message[key] for key in ("role", "content") if key in message}
+    elif "message" in entry:
+        picked["message"] = message
+    return picked
+
+
+class JsonBackend:
+    """Standard library backend (always available)."""
+
+    name = "json"
+
+    def loads(self, data: str | bytes) -> Any:
+        """
+        Decode a JSON document.
+
+        Args:
+            data: JSON text
+
+        Returns:
+            Any: Decoded value
+
+        Raises:
+            json.JSONDecodeError: If data is not valid JSON
+        """
+        return json.loads(data)
+
+    def load(self, fp: IO) -> Any:
+        """
+        Decode a JSON document from a file object.
+
+        Args:
+            fp: Open file (text or binary)
+
+        Returns:
+            Any: Decoded value
+
+        Raises:
+            json.JSONDecodeError: If the content is not valid JSON
+        """
+        return self.loads(fp.read())
+
+    def decode_log_entry(self, line: str | bytes) -> Any:
+        """
+        Decode a conversation log line, keeping only the extractor's fields.
+
+        The result is a dict with timestamp, cwd and message (role, content)
+        when present. Lines that are valid JSON but not a log entry object are
+        returned fully decoded.
+
+        Args:
+            line: One JSONL line
+
+        Returns:
+            Any: Decoded entry
+
+        Raises:
+            json.JSONDecodeError: If the line is not valid JSON
+        """
+        return _pick_log_fields(self.loads(line))
+
+
+class OrjsonBackend(JsonBackend):
+    """orjson backend (orjson.JSONDecodeError subclasses json.JSONDecodeError)."""
+
+    name = "orjson"
+
+    def __init__(self):
+        """Initialize backend."""
+        import orjson  # Lazy import: only the selected backend is loaded
+
+        self._loads = orjson.loads
+        self._error = orjson.JSONDecodeError
+
+    def loads(self, data: str | bytes) -> Any:
+        try:
+            return self._loads(data)
+        except self._error:
+            return _stdlib_loads(data)
+
+
+class MsgspecBackend(JsonBackend):
+    """msgspec backend with typed partial decoding of log entries."""
+
+    name = "msgspec"
+
+    def __init__(self):
+        """Initialize decoders."""
+        import msgspec  # Lazy import: only the selected backend is loaded
+
+        # UNSET defaults tell an absent field from an explicit null, so the
+        # result has exactly the keys the standard library backend keeps
+        unset = msgspec.UnsetType
+
+        class LogMessage(msgspec.Struct):
+            role: str | None | unset = msgspec.UNSET
+            content: Any = msgspec.UNSET
+
+        class LogEntry(msgspec.Struct):
+            timestamp: str | None | unset = msgspec.UNSET
+            cwd: str | None | unset = msgspec.UNSET
+            message: LogMessage | None | unset = msgspec.UNSET
+
+        self._msgspec = msgspec
+        self._message_type = LogMessage
+        self._decoder = msgspec.json.Decoder()
+        # Unknown fields (tool results, usage, ...) are skipped without building objects
+        self._entry_decoder = msgspec.json.Decoder(LogEntry)
+
+    def loads(self, data: str | bytes) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError:
+            return _stdlib_loads(data)
+
+    def decode_log_entry(self, line: str | bytes) -> Any:
+        try:
+            entry = self._entry_decoder.decode(line)
+        except self._msgspec.ValidationError:
+            # Valid JSON with an unexpected shape: decode everything instead
+            return super().decode_log_entry(line)
+        except self._msgspec.DecodeError:
+            # Invalid for msgspec but possibly valid for json (NaN, lone surrogates)
+            return _pick_log_fields(_stdlib_loads(line))
+
+        unset = self._msgspec.UNSET
+        picked = {key: getattr(entry, key) for key in ("timestamp", "cwd") if getattr(entry, key) is not unset}
+        if isinstance(entry.message, self._message_type):
+            picked["message"] = {
+                key: getattr(entry.message, key)
+                for key in ("role", "content")
+                if getattr(entry.message, key) is not unset
+            }
+        elif entry.message is not unset:
+            picked["message"] = entry.message
+        return picked
+
+
+_BACKENDS = {"json": JsonBackend, "orjson": OrjsonBackend, "msgspec": MsgspecBackend}
+_default_backend: JsonBackend | None = None
+
+
+def available_backends() -> list[str]:
+    """
+    Return the names of the installed backends, preferred first.
+
+    Returns:
+        list[str]: Backend names
+    """
+    return [name for name in BACKEND_ORDER if name == "json" or importlib.util.find_spec(name) is not None]
+
+
+def get_backend(name: str | None = None) -> JsonBackend:
+    """
+    Return a backend by name, or the preferred installed backend.
+
+    Args:
+        name: Backend name (default: $DAILY_KNOWLEDGE_JSON_BACKEND or the fastest installed)
+
+    Returns:
+        JsonBackend: Backend instance
+
+    Raises:
+        ValueError: If the named backend is unknown or not installed
+    """
+    name = name or os.environ.get(BACKEND_ENV) or available_backends()[0]
+    if name not in available_backends():
+        raise ValueError(f"JSON backend not available: {name} (installed: {', '.join(available_backends())})")
+    return _BACKENDS[name]()
+
+
+def default_backend() -> JsonBackend:
+    """Return the process-wide backend (selected on first use)."""
+    global _default_backend
+    if _default_backend is None:
+        _default_backend = get_backend()
+    return _default_backend
+
+
+def loads(data: str | bytes) -> Any:
+    """Decode JSON with the default backend (raises json.JSONDecodeError)."""
+    return default_backend().loads(data)
+
+
+def load(fp: IO) -> Any:
+    """Decode a JSON file object with the default backend (raises json.JSONDecodeError)."""
+    return default_backend().load(fp)
+
+
+def decode_log_entry(line: str | bytes) -> Any:
+    """Decode a log line's extractor fields with the default backend (raises json.JSONDecodeError)."""
+    return default_backend().decode_log_entry(line)
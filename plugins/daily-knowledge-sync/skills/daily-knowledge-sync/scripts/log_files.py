@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Conversation log discovery and streaming readers.
+Plain, rotated (session.jsonl.1) and compressed (.gz/.bz2/.xz/.zst) JSONL logs
+are read line by line with constant memory through the same text interface.
+"""
+
+import bz2
+import gzip
+import io
+import json
+import lzma
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import IO, Callable
+
+try:
+    import zstandard
+except ImportError:  # .zst logs are skipped without the module
+    zstandard = None
+
+# session.jsonl, session.jsonl.1, session.jsonl.gz, session.jsonl.2.zst, ...
+LOG_FILE_PATTERN = re.compile(r"\.jsonl(?:\.\d+)?(?:\.(gz|bz2|xz|zst))?$")
+
+COMPRESSION_SUFFIXES = {".gz", ".bz2", ".xz", ".zst"}
+
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", "~/.cache")).expanduser() / "daily-knowledge-sync"
+TIME_INDEX_FILE = CACHE_DIR / "log_time_index.json"
+
+
+def is_log_file(path: Path) -> bool:
+    """
+    Check whether a path is a readable conversation log.
+
+    Args:
+        path: Candidate file path
+
+    Returns:
+        bool: True for plain, rotated and supported compressed JSONL logs
+    """
+    match = LOG_FILE_PATTERN.search(path.name)
+    if not match:
+        return False
+    return match.group(1) != "zst" or zstandard is not None
+
+
+class _MeteredReader(io.RawIOBase):
+    """Binary reader that reports every chunk read from the underlying file."""
+
+    def __init__(self, raw: IO[bytes], on_read: Callable[[int], None]):
+        """
+        Initialize reader.
+
+        Args:
+            raw: File opened in binary mode (closed with this reader)
+            on_read: Called with the number of bytes of each read
+        """
+        super().__init__()
+        self._raw = raw
+        self._on_read = on_read
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        n = self._raw.readinto(buffer)
+        if n:
+            self._on_read(n)
+        return n
+
+    def close(self):
+        try:
+            self._raw.close()
+        finally:
+            super().close()
+
+
+class _LogStream(io.TextIOWrapper):
+    """Text stream that also closes the file under a decompressor."""
+
+    def __init__(self, buffer: IO[bytes], raw: IO[bytes]):
+        super().__init__(buffer, encoding="utf-8")
+        self._raw = raw
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._raw.close()
+
+
+def open_log(path: Path, on_read: Callable[[int], None] | None = None) -> IO[str]:
+    """
+    Open a conversation log for streaming text reads.
+
+    Args:
+        path: Plain or compressed JSONL log
+        on_read: Called with the number of bytes read from disk (compressed
+            size for compressed logs), e.g. IOThrottle.consume
+
+    Returns:
+        IO[str]: Text stream (decompressed on the fly)
+
+    Raises:
+        OSError: If the file cannot be opened
+        RuntimeError: If a .zst log is opened without the zstandard module
+    """
+    suffix = path.suffix
+    if suffix == ".zst" and zstandard is None:
+        raise RuntimeError(f"zstandard is not installed: {path}")
+
+    raw = open(path, "rb")
+    try:
+        source = _MeteredReader(raw, on_read) if on_read else raw
+        if suffix == ".gz":
+            stream = gzip.GzipFile(fileobj=source, mode="rb")
+        elif suffix == ".bz2":
+            stream = bz2.BZ2File(source)
+        elif suffix == ".xz":
+            stream = lzma.LZMAFile(source)
+        elif suffix == ".zst":
+            # Multi-frame (e.g. seekable-format) files are read across frames
+            reader = zstandard.ZstdDecompressor().stream_reader(source, read_across_frames=True, closefd=True)
+            stream = io.BufferedReader(reader)
+        elif on_read:
+            stream = io.BufferedReader(source)
+        else:
+            stream = raw
+        return _LogStream(stream, source)
+    except Exception:
+        raw.close()
+        raise
+
+
+def find_log_files(root: Path) -> list[Path]:
+    """
+    Find every conversation log under a directory.
+
+    A compressed log whose uncompressed copy is still present is skipped, so
+    a log compressed without removing the original is not read twice.
+
+    Args:
+        root: Directory to search
+
+    Returns:
+        list[Path]: Log files
+    """
+    found = [path for path in root.rglob("*.jsonl*") if is_log_file(path) and path.is_file()]
+    names = {str(path) for path in found}
+    return [
+        path
+        for path in found
+        if path.suffix not in COMPRESSION_SUFFIXES or str(path.with_suffix("")) not in names
+    ]
+
+
+class LogTimeIndex:
+    """
+    Sidecar index of the timestamp range covered by each log file.
+
+    Ranges are keyed by file size and mtime, so an unchanged (typically
+    rotated or compressed) log whose range misses the target date is skipped
+    without being opened or decompressed again.
+    """
+
+    def __init__(self, cache_file: Path = TIME_INDEX_FILE):
+        """
+        Initialize index.
+
+        Args:
+            cache_file: JSON file holding the ranges
+        """
+        self.cache_file = cache_file
+        try:
+            self._entries: dict[str, dict] = json.loads(cache_file.read_text(encoding="utf-8"))
+            if not isinstance(self._entries, dict):
+                raise ValueError("Invalid log time index")
+        except (OSError, ValueError):
+            self._entries = {}
+        self._pending: dict[str, tuple[int, int]] = {}
+        self._dirty = False
+
+    def may_contain(self, path: Path, start: datetime, end: datetime) -> bool:
+        """
+        Check whether a log may hold entries in [start, end).
+
+        Args:
+            path: Log file
+            start: Range start (naive, inclusive)
+            end: Range end (naive, exclusive)
+
+        Returns:
+            bool: False only if the unchanged file is known to miss the range
+        """
+        try:
+            stat = path.stat()
+        except OSError:
+            return True
+        key = (stat.st_size, stat.st_mtime_ns)
+        self._pending[str(path)] = key
+
+        entry = self._entries.get(str(path))
+        if not entry or (entry.get("size"), entry.get("mtime_ns")) != key:
+            return True
+        if entry.get("first") is None:
+            return False  # No timestamped entries at all
+        first = datetime.fromisoformat(entry["first"])
+        last = datetime.fromisoformat(entry["last"])
+        return first < end and last >= start
+
+    def record(self, path: Path, first: datetime | None, last: datetime | None):
+        """
+        Record the range of a fully read log (call after may_contain()).
+
+        Args:
+            path: Log file
+            first: Earliest entry timestamp (None if there were none)
+            last: Latest entry timestamp
+        """
+        key = self._pending.pop(str(path), None)
+        if key is None:
+            return
+        self._entries[str(path)] = {
+            "size": key[0],
+            "mtime_ns": key[1],
+            "first": first.isoformat() if first else None,
+            "last": last.isoformat() if last else None,
+        }
+        self._dirty = True
+
+    def save(self):
+        """Write the index atomically, dropping logs that no longer exist."""
+        stale = [name for name in self._entries if not os.path.exists(name)]
+        for name in stale:
+            del self._entries[name]
+        if not (self._dirty or stale):
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(f".{os.getpid()}.tmp")
+            tmp_file.write_text(json.dumps(self._entries, separators=(",", ":")), encoding="utf-8")
+            tmp_file.replace(self.cache_file)
+            self._dirty = False
+        except OSError:
+            pass  # Index is an optimization only
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Merge sharded knowledge candidate partials into a single candidates file.
+Removes exact and near duplicates across shards before file creation.
+Near duplicates are only compared within MinHash LSH buckets, so the merge
+stays roughly linear in the number of candidates.
+"""
+
+import json
+import sys
+import zlib
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import json_backend
+from aggregate_stats import StatsAggregator
+from check_similarity import SimilarityChecker
+from extract_knowledge import PARTIAL_KIND, PARTIAL_VERSION, WHITESPACE_PATTERN, candidate_fingerprint
+
+# MinHash LSH: LSH_BANDS bands of LSH_ROWS one-permutation MinHash bins over byte shingles.
+# Texts whose shingle sets have Jaccard similarity J share a bucket with probability
+# 1 - (1 - J**LSH_ROWS)**LSH_BANDS (J=0.7: 99%, J=0.5: 64%, J=0.3: 12%).
+LSH_BANDS = 16
+LSH_ROWS = 4
+# Shingle width in UTF-8 bytes (about 8 ASCII or 2-3 Japanese characters)
+SHINGLE_BYTES = 8
+
+
+def lsh_keys(text: str) -> list[tuple[int, ...]]:
+    """
+    Compute the LSH bucket keys of a text.
+
+    Uses one-permutation MinHash: each shingle is hashed once (CRC-32) and
+    the hash picks its bin, so the cost is linear in the text length.
+    Bands containing an empty bin are skipped.
+
+    Args:
+        text: Candidate text
+
+    Returns:
+        list[tuple]: (band, minimum per bin...) keys
+    """
+    data = WHITESPACE_PATTERN.sub(" ", text).strip().lower().encode("utf-8")
+    bins_count = LSH_BANDS * LSH_ROWS
+    bins: list[int | None] = [None] * bins_count
+    view = memoryview(data)
+    for start in range(max(len(data) - SHINGLE_BYTES + 1, 1)):
+        value = zlib.crc32(view[start : start + SHINGLE_BYTES])
+        index = value % bins_count
+        rank = value // bins_count
+        current = bins[index]
+        if current is None or rank < current:
+            bins[index] = rank
+
+    keys = []
+    for band in range(LSH_BANDS):
+        rows = bins[band * LSH_ROWS : (band + 1) * LSH_ROWS]
+        if None not in rows:
+            keys.append((band, *rows))
+    return keys
+
+
+class CandidateMerger:
+    """Merge partial candidate outputs produced by `extract_knowledge.py --shard`."""
+
+    def __init__(self, near_threshold: float = 0.9):
+        """
+        Initialize merger.
+
+        Args:
+            near_threshold: Similarity threshold (0.0-1.0) for near duplicates across shards
+        """
+        self.similarity_checker = SimilarityChecker(threshold=near_threshold)
+
+    def load_partial(self, partial_file: Path) -> dict[str, Any]:
+        """
+        Load and validate a partial output file.
+
+        Args:
+            partial_file: Path to partial JSON file
+
+        Returns:
+            dict: Partial output
+
+        Raises:
+            ValueError: If the file is not a supported partial output
+        """
+        with open(partial_file) as f:
+            partial = json_backend.load(f)
+
+        if not isinstance(partial, dict) or partial.get("kind") != PARTIAL_KIND:
+            raise ValueError(f"Not a candidates partial: {partial_file}")
+        if partial.get("version") != PARTIAL_VERSION:
+            raise ValueError(
+                f"Unsupported partial version {partial.get('version')}: {partial_file}"
+            )
+        return partial
+
+    def merge(self, partials: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+        """
+        Merge partial outputs and remove duplicates across shards.
+
+        Args:
+            partials: Loaded partial outputs (all for the same date and shard count)
+
+        Returns:
+            tuple[list[dict], dict]: (merged candidates, merge statistics)
+
+        Raises:
+            ValueError: If partials disagree on date or shard count
+        """
+        dates = {p["date"] for p in partials}
+        counts = {p["shard"]["count"] for p in partials}
+        if len(dates) > 1:
+            raise ValueError(f"Partials cover different dates: {sorted(dates)}")
+        if len(counts) > 1:
+            raise ValueError(f"Partials use different shard counts: {sorted(counts)}")
+
+        shard_count = counts.pop() if counts else 0
+        seen_shards = sorted({p["shard"]["index"] for p in partials})
+        stats = {
+            "partials": len(partials),
+            "missing_shards": sorted(set(range(shard_count)) - set(seen_shards)),
+            "input": 0,
+            "exact_duplicates": 0,
+            "near_duplicates": 0,
+            "near_comparisons": 0,
+            "merged": 0,
+        }
+
+        # Deterministic order regardless of which machine produced which shard
+        tagged = []
+        for partial in partials:
+            for candidate in partial["candidates"]:
+                tagged.append((partial["shard"]["index"], candidate))
+        tagged.sort(
+            key=lambda x: (x[1].get("timestamp") or "", x[1].get("source_file", ""), x[1].get("line_number", 0))
+        )
+        stats["input"] = len(tagged)
+
+        merged = []
+        merged_shards = []
+        fingerprints = {}
+        buckets: dict[tuple[int, ...], list[int]] = {}
+        for shard_index, candidate in tagged:
+            fingerprint = candidate.get("fingerprint") or candidate_fingerprint(candidate)
+
+            # Exact duplicates (same normalized text on another shard)
+            owner = fingerprints.get(fingerprint)
+            if owner is not None and owner != shard_index:
+                stats["exact_duplicates"] += 1
+                continue
+
+            # Near duplicates: only compare against items kept from other shards in a shared bucket
+            keys = lsh_keys(candidate["text"])
+            if self._has_near_duplicate(candidate["text"], shard_index, keys, buckets, merged, merged_shards, stats):
+                stats["near_duplicates"] += 1
+                continue
+
+            fingerprints.setdefault(fingerprint, shard_index)
+            for key in keys:
+                buckets.setdefault(key, []).append(len(merged))
+            merged.append({**candidate, "fingerprint": fingerprint})
+            merged_shards.append(shard_index)
+
+        # Keep the ranked order produced by the extractor's pre-ranking stage
+        merged.sort(key=lambda c: c.get("score", 0), reverse=True)
+        stats["merged"] = len(merged)
+        return merged, stats
+
+    def extraction_stats(
+        self, partials: list[dict[str, Any]], merged: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        """
+        Combine the per-shard extraction stats for the aggregate store.
+
+        Args:
+            partials: Loaded partial outputs
+            merged: Merged candidates
+
+        Returns:
+            dict: Extraction stats in the KnowledgeExtractor.extraction_stats() shape
+        """
+        excluded: dict[str, int] = {}
+        by_project: dict[str, int] = {}
+        for partial in partials:
+            for reason, count in partial.get("stats", {}).get("excluded", {}).items():
+                excluded[reason] = excluded.get(reason, 0) + count
+        for candidate in merged:
+            project = candidate.get("project_path") or "unknown"
+            by_project[project] = by_project.get(project, 0) + 1
+        return {
+            "jsonl_files": sum(p.get("stats", {}).get("jsonl_files", 0) for p in partials),
+            "candidates": len(merged),
+            "excluded": excluded,
+            "by_project": by_project,
+        }
+
+    def _has_near_duplicate(
+        self,
+        text: str,
+        shard_index: int,
+        keys: list[tuple[int, ...]],
+        buckets: dict[tuple[int, ...], list[int]],
+        merged: list[dict[str, Any]],
+        merged_shards: list[int],
+        stats: dict[str, Any],
+    ) -> bool:
+        """Check text against merged candidates from other shards that share an LSH bucket."""
+        checked = set()
+        for key in keys:
+            for kept_index in buckets.get(key, ()):
+                if kept_index in checked or merged_shards[kept_index] == shard_index:
+                    continue
+                checked.add(kept_index)
+                stats["near_comparisons"] += 1
+                similarity = self.similarity_checker.calculate_similarity(text, merged[kept_index]["text"])
+                if similarity >= self.similarity_checker.threshold:
+                    return True
+        return False
+
+
+def main():
+    """CLI interface."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge sharded knowledge candidate partials")
+    parser.add_argument("partials", nargs="+", help="Partial files from extract_knowledge.py --shard")
+    parser.add_argument("--output", help="Output file (default: /tmp/knowledge_candidates_<date>.json)")
+    parser.add_argument("--threshold", type=float, default=0.9, help="Near-duplicate threshold")
+    parser.add_argument(
+        "--no-stats", action="store_true", help="Do not record this run in the aggregate store"
+    )
+    args = parser.parse_args()
+
+    merger = CandidateMerger(near_threshold=args.threshold)
+    try:
+        partials = [merger.load_partial(Path(p)) for p in args.partials]
+        candidates, stats = merger.merge(partials)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    date = partials[0]["date"]
+    if stats["missing_shards"]:
+        print(f"Warning: Missing shards: {stats['missing_shards']}")
+
+    output_file = Path(args.output or f"/tmp/knowledge_candidates_{date}.json")
+    with open(output_file, "w") as f:
+        json.dump(candidates, f, indent=2, ensure_ascii=False)
+
+    print(f"Merged {stats['partials']} partials for: {date}")
+    print(f"  Input: {stats['input']}")
+    print(f"  Exact duplicates: {stats['exact_duplicates']}")
+    print(f"  Near duplicates: {stats['near_duplicates']} ({stats['near_comparisons']} comparisons)")
+    print(f"\n✅ Total candidates merged: {stats['merged']}")
+    print(f"📝 Saved to: {output_file}")
+
+    if not args.no_stats:
+        StatsAggregator().record_extraction(date, merger.extraction_stats(partials, candidates))
+
+
+if __name__ == "__main__":
+    main()
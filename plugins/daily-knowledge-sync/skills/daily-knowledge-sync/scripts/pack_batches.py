@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Pack knowledge candidates into token-budgeted evaluation batches.
+Token footprints are estimated locally (no tokenizer or network), and
+candidates are bin-packed first-fit-decreasing so many small candidates
+share a batch while a huge one never overflows another batch's budget.
+"""
+
+import json
+import math
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+import json_backend
+
+# Default input budget per evaluation batch (prompt candidates + expected output)
+DEFAULT_BUDGET_TOKENS = 50_000
+# Reserved per candidate for the evaluation output line ({"index": 12, "decision": "reject", ...})
+OUTPUT_TOKENS_PER_CANDIDATE = 30
+# ASCII text averages about 4 characters per token
+ASCII_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the token count of a text without a tokenizer.
+
+    ASCII is counted at ~4 characters per token; CJK and other non-ASCII
+    characters at ~1 token each.
+
+    Args:
+        text: Text to estimate
+
+    Returns:
+        int: Estimated tokens
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / ASCII_CHARS_PER_TOKEN) + (len(text) - ascii_chars)
+
+
+def candidate_tokens(candidate: dict[str, Any]) -> int:
+    """
+    Estimate the tokens a candidate costs in an evaluation batch.
+
+    Args:
+        candidate: Candidate as embedded in the batch (with "index")
+
+    Returns:
+        int: Estimated prompt tokens plus the reserved output tokens
+    """
+    return estimate_tokens(json.dumps(candidate, ensure_ascii=False)) + OUTPUT_TOKENS_PER_CANDIDATE
+
+
+class CandidatePacker:
+    """Pack candidates into evaluation batches under a token budget."""
+
+    def __init__(self, budget_tokens: int = DEFAULT_BUDGET_TOKENS):
+        """
+        Initialize packer.
+
+        Args:
+            budget_tokens: Maximum estimated tokens per batch
+
+        Raises:
+            ValueError: If budget_tokens is not positive
+        """
+        if budget_tokens <= 0:
+            raise ValueError(f"Token budget must be positive: {budget_tokens}")
+        self.budget_tokens = budget_tokens
+
+    def pack(self, candidates: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        """
+        Bin-pack candidates first-fit-decreasing.
+
+        Each packed candidate keeps its position in the candidates file as
+        "index", so evaluations written per batch use the same indices
+        create_knowledge_files.py reads. A candidate larger than the budget
+        gets a batch of its own, flagged "oversized".
+
+        Args:
+            candidates: Candidates in candidates-file order
+
+        Returns:
+            list[dict]: Batches with batch id, tokens, oversized flag and candidates (index order)
+        """
+        sized = []
+        for index, candidate in enumerate(candidates):
+            item = {"index": index, **candidate}
+            sized.append((candidate_tokens(item), index, item))
+        sized.sort(key=lambda entry: (-entry[0], entry[1]))
+
+        bins: list[dict[str, Any]] = []
+        for tokens, _, item in sized:
+            if tokens > self.budget_tokens:
+                bins.append({"tokens": tokens, "oversized": True, "items": [item]})
+                continue
+            for batch in bins:
+                if not batch["oversized"] and batch["tokens"] + tokens <= self.budget_tokens:
+                    batch["tokens"] += tokens
+                    batch["items"].append(item)
+                    break
+            else:
+                bins.append({"tokens": tokens, "oversized": False, "items": [item]})
+
+        # Deterministic order: batches by their first candidate, candidates by index
+        for batch in bins:
+            batch["items"].sort(key=lambda item: item["index"])
+        bins.sort(key=lambda batch: batch["items"][0]["index"])
+
+        return [
+            {
+                "batch": batch_id,
+                "tokens": batch["tokens"],
+                "oversized": batch["oversized"],
+                "candidates": batch["items"],
+            }
+            for batch_id, batch in enumerate(bins)
+        ]
+
+
+def main():
+    """CLI interface."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pack knowledge candidates into evaluation batches")
+    parser.add_argument("date", nargs="?", help="Target date (YYYY-MM-DD, default: yesterday)")
+    parser.add_argument("--candidates", help="Candidates file (default: /tmp/knowledge_candidates_<date>.json)")
+    parser.add_argument("--output", help="Output file (default: /tmp/knowledge_batches_<date>.json)")
+    parser.add_argument(
+        "--budget", type=int, default=DEFAULT_BUDGET_TOKENS, help="Estimated token budget per batch"
+    )
+    args = parser.parse_args()
+
+    target_date = args.date or (datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+    candidates_file = Path(args.candidates or f"/tmp/knowledge_candidates_{target_date}.json")
+
+    try:
+        packer = CandidatePacker(args.budget)
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        with open(candidates_file) as f:
+            candidates = json_backend.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: Cannot read candidates: {e}")
+        sys.exit(1)
+
+    batches = packer.pack(candidates)
+    output_file = Path(args.output or f"/tmp/knowledge_batches_{target_date}.json")
+    with open(output_file, "w") as f:
+        json.dump(
+            {
+                "date": target_date,
+                "budget_tokens": args.budget,
+                "candidate_count": len(candidates),
+                "batches": batches,
+            },
+            f,
+            ensure_ascii=False,
+        )
+
+    oversized = sum(1 for batch in batches if batch["oversized"])
+    total_tokens = sum(batch["tokens"] for batch in batches)
+    print(f"Packed {len(candidates)} candidates into {len(batches)} batches (budget {args.budget} tokens)")
+    print(f"  Estimated tokens: {total_tokens}")
+    if oversized:
+        print(f"  Oversized candidates (own batch): {oversized}")
+    print(f"📝 Saved to: {output_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,555 @@
+#!/usr/bin/env python3
+"""
+Full-text search index over the knowledge repository.
+SQLite FTS5 with the trigram tokenizer (Japanese works without a word
+segmenter). Files are re-indexed only when their content hash changes.
+Each file's content is stored once, in the files table; the FTS table is
+an external-content index over it.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+INDEX_DIR_NAME = ".index"
+INDEX_FILE_NAME = "knowledge.sqlite3"
+SCHEMA_VERSION = 2
+
+# Files that live in category directories but are not knowledge items
+EXCLUDED_FILES = {"README.md"}
+
+# bm25 column weights: title, category, tags, project, date, body
+BM25_WEIGHTS = (10.0, 2.0, 5.0, 2.0, 1.0, 1.0)
+
+# Trigram tokenizer needs at least 3 characters per term
+MIN_MATCH_CHARS = 3
+
+# Terms taken from a document when it is used as a retrieval query
+MAX_QUERY_TERMS = 16
+MAX_QUERY_TERM_CHARS = 24
+
+SNIPPET_CONTEXT_CHARS = 40
+
+FRONTMATTER_PATTERN = re.compile(r"\A---\n(.*?)\n---\n", re.DOTALL)
+TITLE_PATTERN = re.compile(r"^# (.+)$", re.MULTILINE)
+PROJECT_PATTERN = re.compile(r"^\*\*プロジェクト\*\*: `?([^`\n]*)`?$", re.MULTILINE)
+DATETIME_PATTERN = re.compile(r"^\*\*日時\*\*: (\S+)$", re.MULTILINE)
+FILENAME_DATE_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2})_")
+BODY_SEPARATOR = "\n---\n"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    category TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    title TEXT NOT NULL,
+    doc_category TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    project TEXT NOT NULL,
+    date TEXT NOT NULL,
+    body_start INTEGER NOT NULL,
+    body_length INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_category ON files (category);
+CREATE VIEW IF NOT EXISTS doc_fields AS
+    SELECT id, title, doc_category AS category, tags, project, date,
+        substr(content, body_start + 1, body_length) AS body
+    FROM files;
+CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(
+    title, category, tags, project, date, body,
+    content = 'doc_fields', content_rowid = 'id',
+    tokenize = 'trigram'
+);
+"""
+
+
+def parse_knowledge_file(content: str, relative_path: str) -> dict[str, str]:
+    """
+    Extract searchable fields from a knowledge markdown file.
+
+    Handles both the frontmatter format written by KnowledgeCategorizer and
+    the header format written by KnowledgeFileCreator
+    (**プロジェクト** / **日時** lines followed by a --- separator).
+
+    Args:
+        content: File content
+        relative_path: Path relative to the repository (e.g. "errors/2026-01-31_x.md")
+
+    Returns:
+        dict: title, category, tags, project, date and body
+    """
+    directory, _, filename = relative_path.rpartition("/")
+    fields = {"title": "", "category": directory, "tags": "", "project": "", "date": "", "body": content}
+
+    frontmatter = FRONTMATTER_PATTERN.match(content)
+    if frontmatter:
+        for line in frontmatter.group(1).splitlines():
+            key, sep, value = line.partition(":")
+            if not sep:
+                continue
+            key, value = key.strip(), value.strip()
+            if key == "tags":
+                fields["tags"] = " ".join(tag.strip() for tag in value.strip("[]").split(",") if tag.strip())
+            elif key in ("title", "category", "project", "date") and value:
+                fields[key] = value
+        fields["body"] = content[frontmatter.end():]
+    else:
+        project = PROJECT_PATTERN.search(content)
+        if project:
+            fields["project"] = project.group(1)
+        timestamp = DATETIME_PATTERN.search(content)
+        if timestamp:
+            fields["date"] = timestamp.group(1)[:10]
+        separator = content.find(BODY_SEPARATOR)
+        if separator != -1 and (project or timestamp):
+            fields["body"] = content[separator + len(BODY_SEPARATOR):]
+
+    title = TITLE_PATTERN.search(content)
+    if title and not fields["title"]:
+        fields["title"] = title.group(1).strip()
+
+    if not fields["date"]:
+        filename_date = FILENAME_DATE_PATTERN.match(filename)
+        if filename_date:
+            fields["date"] = filename_date.group(1)
+
+    fields["body"] = fields["body"].strip()
+    return fields
+
+
+def build_match_query(terms: list[str]) -> str:
+    """
+    Build an FTS5 MATCH expression that requires every term (quoted phrases).
+
+    Args:
+        terms: Query terms (each at least MIN_MATCH_CHARS characters)
+
+    Returns:
+        str: MATCH expression
+    """
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+class KnowledgeSearchIndex:
+    """Incrementally maintained FTS5 index of knowledge markdown files."""
+
+    def __init__(self, repo_path: str, index_path: Path | None = None):
+        """
+        Initialize search index (the database is created on first use).
+
+        Args:
+            repo_path: Path to knowledge repository
+            index_path: Index database path (default: <repo>/.index/knowledge.sqlite3)
+
+        Raises:
+            sqlite3.Error: If the database cannot be opened or SQLite lacks FTS5 trigram support
+        """
+        self.repo_path = Path(repo_path).expanduser()
+        self.index_path = index_path or self.repo_path / INDEX_DIR_NAME / INDEX_FILE_NAME
+        self.conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create or migrate the schema."""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        # The index is a local cache; keep it out of the knowledge repository's commits
+        gitignore = self.index_path.parent / ".gitignore"
+        if self.index_path.parent.name == INDEX_DIR_NAME and not gitignore.exists():
+            gitignore.write_text("*\n", encoding="utf-8")
+
+        conn = sqlite3.connect(self.index_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+
+        version = None
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'schema_version'").fetchone()
+            version = row["value"] if row else None
+        except sqlite3.OperationalError:
+            pass
+        if version is not None and version != str(SCHEMA_VERSION):
+            conn.executescript(
+                "DROP TABLE IF EXISTS docs; DROP VIEW IF EXISTS doc_fields;"
+                " DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS meta;"
+            )
+
+        conn.executescript(SCHEMA)
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES ('schema_version', ?)", (str(SCHEMA_VERSION),)
+        )
+        conn.commit()
+        return conn
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
+
+    def _iter_knowledge_files(self) -> Iterator[tuple[str, os.stat_result]]:
+        """Yield (relative path, stat) for every knowledge file in category directories."""
+        if not self.repo_path.is_dir():
+            return
+        with os.scandir(self.repo_path) as top:
+            directories = sorted(
+                entry.name
+                for entry in top
+                if entry.is_dir(follow_symlinks=False) and not entry.name.startswith(".")
+            )
+        for directory in directories:
+            with os.scandir(self.repo_path / directory) as entries:
+                for entry in entries:
+                    if (
+                        entry.name.endswith(".md")
+                        and entry.name not in EXCLUDED_FILES
+                        and entry.is_file(follow_symlinks=False)
+                    ):
+                        yield f"{directory}/{entry.name}", entry.stat()
+
+    def update(self, paths: list[Path] | None = None) -> dict[str, int]:
+        """
+        Bring the index up to date with the files on disk.
+
+        Files whose size and mtime are unchanged are skipped without being
+        read; files that are read but hash the same only get their stat
+        refreshed.
+
+        Args:
+            paths: Specific files to (re)index (missing ones are removed). If
+                omitted, the whole repository is scanned and deleted files are removed.
+
+        Returns:
+            dict: Counts of scanned, added, updated, unchanged and removed files
+        """
+        stats = {"scanned": 0, "added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        known = {
+            row["path"]: row
+            for row in self.conn.execute("SELECT id, path, content_hash, size, mtime_ns FROM files")
+        }
+
+        if paths is None:
+            targets = self._iter_knowledge_files()
+        else:
+            targets = []
+            for path in paths:
+                path = Path(path)
+                relative = (path.relative_to(self.repo_path) if path.is_absolute() else path).as_posix()
+                try:
+                    targets.append((relative, (self.repo_path / relative).stat()))
+                except FileNotFoundError:
+                    targets.append((relative, None))
+
+        seen = set()
+        with self.conn:
+            for relative, stat in targets:
+                if stat is None:
+                    row = known.get(relative)
+                    if row is not None:
+                        self._remove_file(row["id"])
+                        stats["removed"] += 1
+                    continue
+
+                stats["scanned"] += 1
+                seen.add(relative)
+                row = known.get(relative)
+                if row is not None and row["size"] == stat.st_size and row["mtime_ns"] == stat.st_mtime_ns:
+                    stats["unchanged"] += 1
+                    continue
+
+                raw = (self.repo_path / relative).read_bytes()
+                content_hash = "sha256:" + hashlib.sha256(raw).hexdigest()
+                if row is not None and row["content_hash"] == content_hash:
+                    self.conn.execute(
+                        "UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                        (stat.st_size, stat.st_mtime_ns, row["id"]),
+                    )
+                    stats["unchanged"] += 1
+                    continue
+
+                self._index_file(relative, raw.decode("utf-8", errors="replace"), content_hash, stat, row)
+                stats["updated" if row is not None else "added"] += 1
+
+            if paths is None:
+                for relative, row in known.items():
+                    if relative not in seen:
+                        self._remove_file(row["id"])
+                        stats["removed"] += 1
+
+        return stats
+
+    def _unindex(self, file_id: int):
+        """Remove one file's terms from the FTS index (before its files row changes)."""
+        self.conn.execute(
+            "INSERT INTO docs (docs, rowid, title, category, tags, project, date, body)"
+            " SELECT 'delete', id, title, category, tags, project, date, body FROM doc_fields WHERE id = ?",
+            (file_id,),
+        )
+
+    def _remove_file(self, file_id: int):
+        """Delete one file from the index (caller holds the transaction)."""
+        self._unindex(file_id)
+        self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _index_file(
+        self,
+        relative: str,
+        content: str,
+        content_hash: str,
+        stat: os.stat_result,
+        existing: sqlite3.Row | None,
+    ):
+        """Insert or replace one file in the index (caller holds the transaction)."""
+        fields = parse_knowledge_file(content, relative)
+        # files.category is the directory (what duplicate checks scan); docs.category may come from frontmatter
+        directory = relative.rpartition("/")[0]
+        # The body is stored as a span of content (it is the stripped tail of the file)
+        body_end = len(content.rstrip())
+        values = (
+            directory,
+            content_hash,
+            stat.st_size,
+            stat.st_mtime_ns,
+            content,
+            fields["title"],
+            fields["category"],
+            fields["tags"],
+            fields["project"],
+            fields["date"],
+            body_end - len(fields["body"]),
+            len(fields["body"]),
+        )
+        if existing is not None:
+            self._unindex(existing["id"])
+            self.conn.execute(
+                "UPDATE files SET category = ?, content_hash = ?, size = ?, mtime_ns = ?, content = ?,"
+                " title = ?, doc_category = ?, tags = ?, project = ?, date = ?, body_start = ?, body_length = ?"
+                " WHERE id = ?",
+                (*values, existing["id"]),
+            )
+            file_id = existing["id"]
+        else:
+            cursor = self.conn.execute(
+                "INSERT INTO files (category, content_hash, size, mtime_ns, content,"
+                " title, doc_category, tags, project, date, body_start, body_length, path)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (*values, relative),
+            )
+            file_id = cursor.lastrowid
+
+        self.conn.execute(
+            "INSERT INTO docs (rowid, title, category, tags, project, date, body)"
+            " SELECT id, title, category, tags, project, date, body FROM doc_fields WHERE id = ?",
+            (file_id,),
+        )
+
+    def rebuild(self) -> dict[str, int]:
+        """
+        Drop all indexed data and index the repository from scratch.
+
+        Returns:
+            dict: Update statistics
+        """
+        with self.conn:
+            self.conn.execute("INSERT INTO docs (docs) VALUES ('delete-all')")
+            self.conn.execute("DELETE FROM files")
+        return self.update()
+
+    def search(self, query: str, limit: int = 10, category: str | None = None) -> list[dict[str, Any]]:
+        """
+        Search the index, best matches first.
+
+        Terms are ANDed. Queries whose terms are all at least 3 characters use
+        the FTS index and bm25 ranking; shorter terms fall back to a substring
+        scan ordered by date.
+
+        Args:
+            query: Whitespace-separated search terms
+            limit: Maximum number of hits
+            category: Restrict to one category
+
+        Returns:
+            list[dict]: Hits with path, title, category, date, project, score and snippet
+        """
+        terms = query.split()
+        if not terms:
+            return []
+
+        category_filter = " AND files.category = ?" if category else ""
+        category_params = [category] if category else []
+
+        if all(len(term) >= MIN_MATCH_CHARS for term in terms):
+            sql = (
+                "SELECT files.path, docs.title, docs.category, docs.date, docs.project, docs.body,"
+                f" bm25(docs, {', '.join(map(str, BM25_WEIGHTS))}) AS score"
+                " FROM docs JOIN files ON files.id = docs.rowid"
+                f" WHERE docs MATCH ?{category_filter}"
+                " ORDER BY score LIMIT ?"
+            )
+            params = [build_match_query(terms), *category_params, limit]
+        else:
+            # trigram cannot match terms shorter than 3 characters
+            haystack = "lower(docs.title || ' ' || docs.tags || ' ' || docs.project || ' ' || docs.body)"
+            conditions = " AND ".join(f"instr({haystack}, ?) > 0" for _ in terms)
+            sql = (
+                "SELECT files.path, docs.title, docs.category, docs.date, docs.project, docs.body, 0.0 AS score"
+                " FROM docs JOIN files ON files.id = docs.rowid"
+                f" WHERE {conditions}{category_filter}"
+                " ORDER BY docs.date DESC, files.path LIMIT ?"
+            )
+            params = [*(term.lower() for term in terms), *category_params, limit]
+
+        return [
+            {
+                "path": row["path"],
+                "title": row["title"],
+                "category": row["category"],
+                "date": row["date"],
+                "project": row["project"],
+                "score": -row["score"],
+                "snippet": self._snippet(row["body"], terms),
+            }
+            for row in self.conn.execute(sql, params)
+        ]
+
+    def _snippet(self, body: str, terms: list[str]) -> str:
+        """Return a one-line excerpt around the first matching term."""
+        lowered = body.lower()
+        positions = [pos for pos in (lowered.find(term.lower()) for term in terms) if pos != -1]
+        start = max(min(positions) - SNIPPET_CONTEXT_CHARS, 0) if positions else 0
+        excerpt = body[start:start + SNIPPET_CONTEXT_CHARS * 3]
+        excerpt = " ".join(excerpt.split())
+        return ("…" if start > 0 else "") + excerpt + ("…" if start + SNIPPET_CONTEXT_CHARS * 3 < len(body) else "")
+
+    def category_documents(self, category: str, query_text: str = "") -> Iterator[tuple[str, str]]:
+        """
+        Yield (path, content) of every file in a category, likely matches first.
+
+        Files retrieved by a full-text query built from query_text come first
+        (bm25 order), followed by the remaining files of the category, so a
+        caller scanning for near-duplicates can stop early without missing any.
+
+        Args:
+            category: Category name
+            query_text: Text used to rank the documents (e.g. a candidate)
+
+        Yields:
+            tuple[str, str]: Relative path and full file content
+        """
+        seen = set()
+        terms = self._query_terms(query_text)
+        if terms:
+            rows = self.conn.execute(
+                "SELECT files.id, files.path, files.content FROM docs JOIN files ON files.id = docs.rowid"
+                f" WHERE docs MATCH ? AND files.category = ? ORDER BY bm25(docs, {', '.join(map(str, BM25_WEIGHTS))})",
+                (" OR ".join('"' + term.replace('"', '""') + '"' for term in terms), category),
+            )
+            for row in rows:
+                seen.add(row["id"])
+                yield row["path"], row["content"]
+
+        for row in self.conn.execute(
+            "SELECT id, path, content FROM files WHERE category = ? ORDER BY path", (category,)
+        ):
+            if row["id"] not in seen:
+                yield row["path"], row["content"]
+
+    def file_metadata(self) -> list[dict[str, str]]:
+        """
+        Return the parsed metadata of every indexed file.
+
+        Returns:
+            list[dict]: path, category, date, project and title of each file
+        """
+        return [
+            dict(row)
+            for row in self.conn.execute(
+                "SELECT files.path, files.category, docs.date, docs.project, docs.title"
+                " FROM docs JOIN files ON files.id = docs.rowid ORDER BY files.path"
+            )
+        ]
+
+    def _query_terms(self, text: str) -> list[str]:
+        """Pick the most frequent words of a text as retrieval terms."""
+        counts: dict[str, int] = {}
+        for word in re.findall(r"\w+", text.lower()):
+            if len(word) >= MIN_MATCH_CHARS:
+                word = word[:MAX_QUERY_TERM_CHARS]
+                counts[word] = counts.get(word, 0) + 1
+        return sorted(counts, key=lambda word: (-counts[word], -len(word), word))[:MAX_QUERY_TERMS]
+
+
+def main():
+    """CLI interface."""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Search the knowledge repository")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    update_parser = subparsers.add_parser("update", help="Index new and changed files")
+    update_parser.add_argument("repo_path", help="Path to knowledge repository")
+    update_parser.add_argument("--rebuild", action="store_true", help="Re-index every file from scratch")
+
+    search_parser = subparsers.add_parser("search", help="Search indexed knowledge")
+    search_parser.add_argument("repo_path", help="Path to knowledge repository")
+    search_parser.add_argument("query", nargs="+", help="Search terms (all must match)")
+    search_parser.add_argument("--limit", type=int, default=10, help="Maximum number of hits (default: 10)")
+    search_parser.add_argument("--category", help="Restrict to one category")
+    search_parser.add_argument("--json", action="store_true", help="Print hits as JSON")
+    search_parser.add_argument("--no-update", action="store_true", help="Search without refreshing the index first")
+
+    args = parser.parse_args()
+
+    try:
+        index = KnowledgeSearchIndex(args.repo_path)
+    except sqlite3.Error as e:
+        print(f"Error: Cannot open search index: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    start = time.perf_counter()
+    if args.command == "update":
+        stats = index.rebuild() if args.rebuild else index.update()
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(
+            f"Indexed {stats['scanned']} files in {elapsed_ms:.1f}ms: "
+            f"{stats['added']} added, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+        )
+        return
+
+    if not args.no_update:
+        index.update()
+    hits = index.search(" ".join(args.query), limit=args.limit, category=args.category)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(hits, ensure_ascii=False, indent=2))
+        return
+
+    if not hits:
+        print(f"No results ({elapsed_ms:.1f}ms)")
+        return
+
+    for rank, hit in enumerate(hits, 1):
+        meta = " ".join(part for part in (hit["date"], hit["project"]) if part)
+        print(f"{rank}. {hit['title'] or hit['path']}  [{hit['category']}] {meta}")
+        print(f"   {hit['path']}")
+        if hit["snippet"]:
+            print(f"   {hit['snippet']}")
+    print(f"\n{len(hits)} results ({elapsed_ms:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
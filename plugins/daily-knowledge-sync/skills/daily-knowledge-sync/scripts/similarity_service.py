@@ -0,0 +1,516 @@
+#!/usr/bin/env python3
+"""
+Warm similarity service for repeated duplicate checks.
+A long-lived local process keeps the knowledge repository's documents
+analyzed in memory and answers check_similarity requests over a Unix domain
+socket (one JSON object per line), so each check costs a socket round trip
+instead of interpreter startup plus a full re-read of the repository.
+Clients fall back to in-process checking when the service is not running.
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from search_index import EXCLUDED_FILES
+
+# Set to "0" to never use the service (always check in-process)
+SERVICE_ENV_VAR = "DAILY_KNOWLEDGE_SIMILARITY_SERVICE"
+DEFAULT_THRESHOLD = 0.7
+# Seconds between mtime sweeps of every file (added/removed files are seen on every request)
+POLL_INTERVAL_SECONDS = 2.0
+# The service exits after this many seconds without requests
+IDLE_TIMEOUT_SECONDS = 30 * 60
+# Client socket timeout (seconds)
+CLIENT_TIMEOUT_SECONDS = 10.0
+
+
+def default_socket_path() -> Path:
+    """Return the per-user socket path (${XDG_RUNTIME_DIR:-/tmp}/daily-knowledge-sync-<uid>/similarity.sock)."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or "/tmp"
+    return Path(runtime_dir) / f"daily-knowledge-sync-{os.getuid()}" / "similarity.sock"
+
+
+def check_socket_owner(socket_path: Path):
+    """
+    Make sure a socket path was created by this user.
+
+    The default path is predictable, so another user could create a socket
+    (or anything else) there first; such a path is never connected to,
+    listened on or removed.
+
+    Args:
+        socket_path: Existing socket path
+
+    Raises:
+        FileNotFoundError: If nothing exists at the path
+        PermissionError: If the path is not a socket owned by this user
+    """
+    st = os.lstat(socket_path)
+    if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError(f"Not a socket owned by this user: {socket_path}")
+
+
+def _prepare_socket_dir(directory: Path):
+    """
+    Create the per-user socket directory (mode 0700) or check an existing one.
+
+    Args:
+        directory: Directory of the default socket
+
+    Raises:
+        RuntimeError: If the directory is a symlink, owned by another user or accessible to others
+    """
+    try:
+        directory.mkdir(mode=0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(directory)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f"Refusing to use socket directory (must be a 0700 directory owned by this user): {directory}")
+
+
+class ServiceError(RuntimeError):
+    """The service answered a request with an error."""
+
+
+class SimilarityClient:
+    """Client for a running similarity service (one connection, many requests)."""
+
+    def __init__(self, socket_path: Path | None = None, timeout: float = CLIENT_TIMEOUT_SECONDS):
+        """
+        Connect to the service.
+
+        Args:
+            socket_path: Service socket (default: default_socket_path())
+            timeout: Socket timeout in seconds
+
+        Raises:
+            OSError: If the service is not running or the socket is not this user's
+        """
+        self.socket_path = Path(socket_path or default_socket_path())
+        check_socket_owner(self.socket_path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+        try:
+            self._sock.connect(str(self.socket_path))
+        except OSError:
+            self._sock.close()
+            raise
+        self._reader = self._sock.makefile("r", encoding="utf-8")
+
+    def request(self, op: str, **params: Any) -> Any:
+        """
+        Send one request and wait for its result.
+
+        Args:
+            op: Operation name
+            **params: Operation parameters
+
+        Returns:
+            Any: Operation result
+
+        Raises:
+            OSError: If the connection failed or was closed
+            ServiceError: If the service reported an error
+        """
+        self._sock.sendall(json.dumps({"op": op, **params}, ensure_ascii=False).encode("utf-8") + b"\n")
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Similarity service closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise ServiceError(response.get("error", "unknown error"))
+        return response["result"]
+
+    def ping(self) -> dict[str, Any]:
+        """Return the service status (repo path, documents loaded, pid)."""
+        return self.request("ping")
+
+    def find_duplicates(
+        self, new_item: str, existing_items: list[str], threshold: float | None = None
+    ) -> list[tuple[int, float]]:
+        """SimilarityChecker.find_duplicates on the service."""
+        result = self.request(
+            "find_duplicates", new_item=new_item, existing_items=existing_items, threshold=threshold
+        )
+        return [(index, score) for index, score in result]
+
+    def check_knowledge_file(
+        self, new_text: str, knowledge_file: Path, threshold: float | None = None
+    ) -> list[dict[str, Any]]:
+        """SimilarityChecker.check_knowledge_file on the service."""
+        return self.request(
+            "check_knowledge_file",
+            new_text=new_text,
+            knowledge_file=str(Path(knowledge_file).resolve()),
+            threshold=threshold,
+        )
+
+    def is_duplicate(self, text: str, category: str, threshold: float | None = None) -> dict[str, Any] | None:
+        """
+        Check text against the service's in-memory copy of a category.
+
+        Args:
+            text: Text to check
+            category: Category directory
+            threshold: Similarity threshold (default: the service's)
+
+        Returns:
+            dict | None: First match ({"path", "similarity"}) or None
+        """
+        return self.request("is_duplicate", text=text, category=category, threshold=threshold)
+
+    def close(self):
+        """Close the connection."""
+        self._reader.close()
+        self._sock.close()
+
+
+def connect(repo_path: str | None = None, socket_path: Path | None = None) -> SimilarityClient | None:
+    """
+    Connect to a running service, if any.
+
+    Args:
+        repo_path: Required repository (None: any); a service for another repository is ignored
+        socket_path: Service socket (default: default_socket_path())
+
+    Returns:
+        SimilarityClient | None: Connected client, or None to check in-process
+    """
+    if os.environ.get(SERVICE_ENV_VAR) == "0":
+        return None
+    try:
+        client = SimilarityClient(socket_path)
+    except OSError:
+        return None
+    try:
+        status = client.ping()
+    except (OSError, ValueError, ServiceError):
+        client.close()
+        return None
+    if repo_path is not None and status.get("repo") != str(Path(repo_path).expanduser().resolve()):
+        client.close()
+        return None
+    return client
+
+
+class SimilarityService:
+    """In-memory knowledge corpus with the SimilarityChecker operations."""
+
+    def __init__(
+        self,
+        repo_path: str,
+        threshold: float = DEFAULT_THRESHOLD,
+        poll_interval: float = POLL_INTERVAL_SECONDS,
+        categories: list[str] | None = None,
+    ):
+        """
+        Initialize service state.
+
+        Args:
+            repo_path: Path to knowledge repository
+            threshold: Default similarity threshold
+            poll_interval: Seconds between mtime sweeps of every loaded file
+            categories: Categories loaded on warm start (defaults to categories.yaml)
+        """
+        from check_similarity import SimilarityChecker
+        from document_analysis import DocumentAnalysis, DocumentCache
+
+        self.repo_path = Path(repo_path).expanduser().resolve()
+        # The corpus holds its own analyses and is compared without the cache
+        # (a corpus larger than the cache budget would otherwise evict itself on
+        # every query); the private cache only serves ad-hoc requests
+        self.checker = SimilarityChecker(threshold=threshold, analysis_cache=DocumentCache())
+        self._analyze = DocumentAnalysis
+        self.poll_interval = poll_interval
+        if categories is None:
+            from categorize_knowledge import get_category_config
+
+            categories = list(get_category_config()[0])
+        self.categories = categories
+        # category -> (directory mtime_ns, {path: (mtime_ns, size, DocumentAnalysis)})
+        self._corpus: dict[str, tuple[int, dict[Path, tuple[int, int, Any]]]] = {}
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def document_count(self) -> int:
+        """Number of documents held in memory."""
+        return sum(len(files) for _, files in self._corpus.values())
+
+    def load(self):
+        """Load the configured category directories (warm start; others load on first request)."""
+        for category in self.categories:
+            if (self.repo_path / category).is_dir():
+                self._category_files(category)
+
+    def _read(self, path: Path, stat: os.stat_result) -> tuple[int, int, Any] | None:
+        """Read and analyze one file (None if unreadable)."""
+        try:
+            text = path.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError) as e:
+            print(f"Warning: Error reading {path}: {e}", file=sys.stderr)
+            return None
+        analysis = self._analyze(text)
+        analysis.terms  # Vectorize now so queries only compare
+        return stat.st_mtime_ns, stat.st_size, analysis
+
+    def _category_files(self, category: str) -> dict[Path, tuple[int, int, Any]]:
+        """
+        Return the up-to-date documents of a category.
+
+        A changed directory mtime (file added, removed or renamed) triggers a
+        rescan of the directory; in-place edits are picked up by the periodic
+        mtime sweep. Unchanged files are never re-read.
+
+        Args:
+            category: Category directory name
+
+        Returns:
+            dict: path -> (mtime_ns, size, DocumentAnalysis)
+        """
+        category_dir = self.repo_path / category
+        try:
+            dir_mtime = category_dir.stat().st_mtime_ns
+        except OSError:
+            self._corpus.pop(category, None)
+            return {}
+
+        cached_mtime, files = self._corpus.get(category, (None, {}))
+        if cached_mtime == dir_mtime:
+            return files
+
+        current = {}
+        for path in category_dir.glob("*.md"):
+            if path.name in EXCLUDED_FILES:
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entry = files.get(path)
+            if entry is None or entry[:2] != (stat.st_mtime_ns, stat.st_size):
+                entry = self._read(path, stat)
+            if entry is not None:
+                current[path] = entry
+        self._corpus[category] = (dir_mtime, current)
+        return current
+
+    def _sweep(self):
+        """Re-read loaded files whose mtime or size changed since they were loaded."""
+        for _, files in list(self._corpus.values()):
+            for path, entry in list(files.items()):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    files.pop(path)
+                    continue
+                if entry[:2] != (stat.st_mtime_ns, stat.st_size):
+                    updated = self._read(path, stat)
+                    if updated is None:
+                        files.pop(path)
+                    else:
+                        files[path] = updated
+
+    def refresh(self, force: bool = False):
+        """Run the mtime sweep if the poll interval elapsed (or if forced)."""
+        now = time.monotonic()
+        if force or now - self._last_sweep >= self.poll_interval:
+            self._sweep()
+            self._last_sweep = now
+
+    def is_duplicate(self, text: str, category: str, threshold: float | None = None) -> dict[str, Any] | None:
+        """
+        Check text against the documents of a category.
+
+        Args:
+            text: Text to check
+            category: Category directory
+            threshold: Similarity threshold (default: the service's)
+
+        Returns:
+            dict | None: First document at or above the threshold ({"path", "similarity"}) or None
+        """
+        threshold = self.checker.threshold if threshold is None else threshold
+        self.refresh()
+        query = self._analyze(text)
+        for path, (_, _, analysis) in self._category_files(category).items():
+            similarity = self.checker.analysis_similarity(query, analysis)
+            if similarity >= threshold:
+                return {"path": str(path.relative_to(self.repo_path)), "similarity": similarity}
+        return None
+
+    def handle(self, request: dict[str, Any]) -> Any:
+        """
+        Run one request.
+
+        Args:
+            request: Decoded request ({"op": ..., params})
+
+        Returns:
+            Any: JSON-serializable result
+
+        Raises:
+            ValueError: For unknown operations or invalid parameters
+        """
+        op = request.get("op")
+        threshold = request.get("threshold")
+        with self._lock:
+            if op == "ping":
+                return {"repo": str(self.repo_path), "documents": self.document_count, "pid": os.getpid()}
+            if op == "is_duplicate":
+                return self.is_duplicate(request["text"], request["category"], threshold)
+            if op in ("find_duplicates", "check_knowledge_file"):
+                saved = self.checker.threshold
+                if threshold is not None:
+                    self.checker.threshold = threshold
+                try:
+                    if op == "find_duplicates":
+                        return self.checker.find_duplicates(request["new_item"], request["existing_items"])
+                    return self.checker.check_knowledge_file(request["new_text"], Path(request["knowledge_file"]))
+                finally:
+                    self.checker.threshold = saved
+        raise ValueError(f"Unknown operation: {op}")
+
+
+def serve(
+    service: SimilarityService,
+    socket_path: Path | None = None,
+    idle_timeout: float = IDLE_TIMEOUT_SECONDS,
+    ready: threading.Event | None = None,
+):
+    """
+    Serve requests until shut down or idle for idle_timeout seconds.
+
+    Args:
+        service: Loaded service
+        socket_path: Socket to listen on (default: default_socket_path())
+        idle_timeout: Exit after this many seconds without requests
+        ready: Set once the socket is listening (for tests)
+
+    Raises:
+        RuntimeError: If another service is already listening on the socket, or
+            the socket path (or default socket directory) belongs to someone else
+    """
+    import socketserver
+
+    if socket_path is None:
+        socket_path = default_socket_path()
+        _prepare_socket_dir(socket_path.parent)
+    socket_path = Path(socket_path)
+    if os.path.lexists(socket_path):
+        try:
+            check_socket_owner(socket_path)
+        except PermissionError as e:
+            raise RuntimeError(f"Refusing to replace {socket_path}: {e}") from e
+        try:
+            SimilarityClient(socket_path, timeout=1.0).close()
+        except OSError:
+            socket_path.unlink()  # Stale socket from a crashed service
+        else:
+            raise RuntimeError(f"Similarity service already running: {socket_path}")
+
+    state = {"last_request": time.monotonic(), "stop": False}
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                state["last_request"] = time.monotonic()
+                try:
+                    request = json.loads(line)
+                    if request.get("op") == "shutdown":
+                        state["stop"] = True
+                        response = {"ok": True, "result": None}
+                    else:
+                        response = {"ok": True, "result": service.handle(request)}
+                except Exception as e:  # Report to the client, keep serving
+                    response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                self.wfile.flush()
+                if state["stop"]:
+                    return
+
+    class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+    old_umask = os.umask(0o177)  # Socket readable/writable by this user only
+    try:
+        server = Server(str(socket_path), Handler)
+    finally:
+        os.umask(old_umask)
+
+    server.timeout = 0.5
+    if ready is not None:
+        ready.set()
+    try:
+        while not state["stop"] and time.monotonic() - state["last_request"] < idle_timeout:
+            server.handle_request()
+    finally:
+        server.server_close()
+        try:
+            socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def main():
+    """CLI interface."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Warm similarity service for duplicate checks")
+    parser.add_argument("command", choices=["serve", "status", "stop"], help="Operation")
+    parser.add_argument(
+        "repo_path",
+        nargs="?",
+        default=os.environ.get("KNOWLEDGE_REPO_PATH", "~/knowledge-base"),
+        help="Knowledge repository path (serve only, default: $KNOWLEDGE_REPO_PATH or ~/knowledge-base)",
+    )
+    parser.add_argument("--socket", type=Path, help="Socket path (default: a 0700 per-user directory in $XDG_RUNTIME_DIR or /tmp)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Default similarity threshold")
+    parser.add_argument(
+        "--idle-timeout", type=float, default=IDLE_TIMEOUT_SECONDS, help="Exit after N seconds without requests"
+    )
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        repo_path = Path(args.repo_path).expanduser()
+        if not repo_path.is_dir():
+            print(f"Error: Repository not found: {repo_path}")
+            sys.exit(1)
+        start = time.perf_counter()
+        service = SimilarityService(str(repo_path), threshold=args.threshold)
+        service.load()
+        print(f"Loaded {service.document_count} documents in {(time.perf_counter() - start) * 1000:.0f} ms")
+        print(f"Listening on {args.socket or default_socket_path()} (idle timeout {args.idle_timeout:g}s)")
+        try:
+            serve(service, args.socket, args.idle_timeout)
+        except RuntimeError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        return
+
+    client = connect(socket_path=args.socket)
+    if client is None:
+        print("Similarity service is not running")
+        sys.exit(1)
+    if args.command == "status":
+        status = client.ping()
+        print(f"✅ Running (pid {status['pid']}): {status['repo']}, {status['documents']} documents")
+    else:
+        client.request("shutdown")
+        print("✅ Stopped")
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Sync the knowledge repository as a blobless, sparse partial clone.
+Only commits and trees are fetched up front; file contents are downloaded
+on demand for the category directories (and .index/) that the skill reads
+and writes, so setup and the daily fetch stay small as history grows.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.insert(0, str(SCRIPT_DIR))
+
+from search_index import INDEX_DIR_NAME
+
+DEFAULT_BRANCH = "main"
+# Partial clone filter: commits and trees only, blobs fetched lazily
+PARTIAL_CLONE_FILTER = "blob:none"
+# Push attempts when the remote moved in the meantime (each retry rebases first)
+PUSH_ATTEMPTS = 3
+
+
+class KnowledgeRepoSync:
+    """Clone, update and push the knowledge repository with minimal transfer."""
+
+    def __init__(
+        self,
+        repo_path: str,
+        url: str | None = None,
+        branch: str = DEFAULT_BRANCH,
+        categories: list[str] | None = None,
+    ):
+        """
+        Initialize sync.
+
+        Args:
+            repo_path: Local path of the knowledge repository
+            url: Remote URL (needed only to clone)
+            branch: Branch to sync
+            categories: Category directories to check out (default: categories.yaml)
+        """
+        self.repo_path = Path(repo_path).expanduser()
+        self.url = url
+        self.branch = branch
+        if categories is None:
+            from categorize_knowledge import get_category_config
+
+            categories = list(get_category_config()[0])
+        self.categories = categories
+
+    @property
+    def sparse_paths(self) -> list[str]:
+        """Directories in the sparse checkout (top-level files are always included)."""
+        return [*self.categories, INDEX_DIR_NAME]
+
+    @property
+    def remote_ref(self) -> str:
+        """Remote-tracking ref of the synced branch."""
+        return f"refs/remotes/origin/{self.branch}"
+
+    def _git(self, *args: str, cwd: Path | None = None, check: bool = True) -> subprocess.CompletedProcess:
+        """
+        Run a git command in the repository.
+
+        Args:
+            *args: git arguments
+            cwd: Working directory (default: repo_path)
+            check: Raise on a non-zero exit status
+
+        Returns:
+            subprocess.CompletedProcess: Result with captured text output
+
+        Raises:
+            subprocess.CalledProcessError: If check is set and git fails
+        """
+        return subprocess.run(
+            ["git", *args],
+            cwd=cwd or self.repo_path,
+            capture_output=True,
+            text=True,
+            check=check,
+        )
+
+    def is_cloned(self) -> bool:
+        """Return True if repo_path is a git working tree."""
+        return (self.repo_path / ".git").exists()
+
+    def setup(self) -> str:
+        """
+        Clone the repository, or convert an existing clone, to a sparse partial clone.
+
+        Returns:
+            str: "cloned" or "configured"
+
+        Raises:
+            ValueError: If the repository is missing and no URL was given
+            subprocess.CalledProcessError: If git fails
+        """
+        if not self.is_cloned():
+            if not self.url:
+                raise ValueError(f"Repository not found and no URL given: {self.repo_path}")
+            self.repo_path.parent.mkdir(parents=True, exist_ok=True)
+            self._git(
+                "clone",
+                f"--filter={PARTIAL_CLONE_FILTER}",
+                "--sparse",
+                "--no-tags",
+                "--branch",
+                self.branch,
+                self.url,
+                str(self.repo_path),
+                cwd=self.repo_path.parent,
+            )
+            self._git("sparse-checkout", "set", "--cone", *self.sparse_paths)
+            return "cloned"
+
+        # Existing (possibly full) clone: later fetches skip blobs, checkout shrinks to the cone
+        self._git("config", "remote.origin.promisor", "true")
+        self._git("config", "remote.origin.partialclonefilter", PARTIAL_CLONE_FILTER)
+        self._git("config", "remote.origin.tagOpt", "--no-tags")
+        self._git("sparse-checkout", "set", "--cone", *self.sparse_paths)
+        return "configured"
+
+    def pull(self) -> str:
+        """
+        Fetch the branch and rebase local commits onto it.
+
+        Only the sparse paths are touched in the working tree; uncommitted
+        changes are stashed around the rebase.
+
+        Returns:
+            str: "up-to-date", "fast-forward" or "rebased"
+
+        Raises:
+            subprocess.CalledProcessError: If fetching or rebasing fails (the rebase is aborted)
+        """
+        self._git(
+            "fetch",
+            "--no-tags",
+            f"--filter={PARTIAL_CLONE_FILTER}",
+            "origin",
+            f"+refs/heads/{self.branch}:{self.remote_ref}",
+        )
+
+        behind, ahead = self._divergence()
+        if behind == 0:
+            return "up-to-date"
+
+        try:
+            self._git("rebase", "--autostash", self.remote_ref)
+        except subprocess.CalledProcessError:
+            self._git("rebase", "--abort", check=False)
+            raise
+        return "fast-forward" if ahead == 0 else "rebased"
+
+    def _divergence(self) -> tuple[int, int]:
+        """
+        Count commits between HEAD and the remote-tracking branch.
+
+        Returns:
+            tuple[int, int]: (commits only on the remote, commits only on HEAD)
+        """
+        result = self._git("rev-list", "--left-right", "--count", f"{self.remote_ref}...HEAD")
+        behind, ahead = result.stdout.split()
+        return int(behind), int(ahead)
+
+    def push(self) -> int:
+        """
+        Push local commits, rebasing onto the remote and retrying if it moved.
+
+        Returns:
+            int: Number of commits pushed (0 if there was nothing to push)
+
+        Raises:
+            subprocess.CalledProcessError: If pushing still fails after PUSH_ATTEMPTS
+        """
+        for attempt in range(1, PUSH_ATTEMPTS + 1):
+            _, ahead = self._divergence()
+            if ahead == 0:
+                return 0
+            result = self._git("push", "--no-tags", "origin", f"HEAD:refs/heads/{self.branch}", check=False)
+            if result.returncode == 0:
+                return ahead
+            if attempt == PUSH_ATTEMPTS:
+                raise subprocess.CalledProcessError(
+                    result.returncode, result.args, result.stdout, result.stderr
+                )
+            # Rejected (typically non-fast-forward): rebase onto the new remote head and retry
+            self.pull()
+        return 0
+
+
+def main():
+    """CLI interface."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Sync the knowledge repository (sparse partial clone)")
+    parser.add_argument("command", choices=["setup", "pull", "push", "sync"], help="Operation")
+    parser.add_argument(
+        "repo_path",
+        nargs="?",
+        default=os.environ.get("KNOWLEDGE_REPO_PATH", "~/knowledge-base"),
+        help="Knowledge repository path (default: $KNOWLEDGE_REPO_PATH or ~/knowledge-base)",
+    )
+    parser.add_argument(
+        "--url",
+        default=os.environ.get("KNOWLEDGE_REPO_URL"),
+        help="Remote URL for setup (default: $KNOWLEDGE_REPO_URL)",
+    )
+    parser.add_argument("--branch", default=DEFAULT_BRANCH, help="Branch to sync")
+    args = parser.parse_args()
+
+    sync = KnowledgeRepoSync(args.repo_path, url=args.url, branch=args.branch)
+    if args.command != "setup" and not sync.is_cloned():
+        print(f"Error: Not a git repository: {sync.repo_path} (run setup first)")
+        sys.exit(1)
+
+    try:
+        if args.command == "setup":
+            result = sync.setup()
+            print(f"✅ Repository {result}: {sync.repo_path}")
+            print(f"  Sparse paths: {', '.join(sync.sparse_paths)}")
+        if args.command in ("pull", "sync"):
+            print(f"✅ Pull: {sync.pull()}")
+        if args.command in ("push", "sync"):
+            pushed = sync.push()
+            print(f"✅ Pushed {pushed} commits" if pushed else "✅ Nothing to push")
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except subprocess.CalledProcessError as e:
+        print(f"Error: git {' '.join(e.cmd[1:2])} failed: {(e.stderr or '').strip()}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
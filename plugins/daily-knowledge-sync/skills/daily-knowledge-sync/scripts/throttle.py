@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Background execution support.
+Lowers the process's CPU/IO scheduling priority and throttles log reads with
+a token bucket whose rate backs off while the system is busy, so a sync
+running at the start of the day does not stall interactive sessions.
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+from typing import Callable
+
+# Default read cap in --background mode (MB/s read from disk)
+DEFAULT_BACKGROUND_MBPS = 20.0
+# Niceness added in background mode
+NICE_INCREMENT = 10
+# Seconds of full-rate reading allowed as a burst
+BURST_SECONDS = 0.25
+# Pause between files at normal load (seconds, scaled by the slowdown)
+FILE_PAUSE_SECONDS = 0.01
+# Load is re-sampled at most this often (seconds)
+ADAPT_INTERVAL_SECONDS = 5.0
+# 1-minute load per CPU above which the pace slows down proportionally
+LOAD_TARGET_PER_CPU = 0.7
+MAX_SLOWDOWN = 8.0
+
+BYTES_PER_MB = 1024 * 1024
+
+
+def _load_average() -> float:
+    """Return the 1-minute load average (0.0 where unavailable)."""
+    try:
+        return os.getloadavg()[0]
+    except (AttributeError, OSError):
+        return 0.0
+
+
+class IOThrottle:
+    """Token-bucket read throttle that adapts to system load."""
+
+    def __init__(
+        self,
+        max_bytes_per_sec: float | None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        load_average: Callable[[], float] = _load_average,
+        cpu_count: int | None = None,
+        burst_seconds: float = BURST_SECONDS,
+    ):
+        """
+        Initialize throttle.
+
+        Args:
+            max_bytes_per_sec: Read cap at normal load (None: no cap, only pauses between files)
+            clock: Monotonic clock (injectable for tests)
+            sleep: Sleep function (injectable for tests)
+            load_average: Returns the 1-minute load average
+            cpu_count: Number of CPUs (default: os.cpu_count())
+            burst_seconds: Seconds of full-rate reading allowed without sleeping
+
+        Raises:
+            ValueError: If max_bytes_per_sec is not positive
+        """
+        if max_bytes_per_sec is not None and max_bytes_per_sec <= 0:
+            raise ValueError(f"Throughput cap must be positive: {max_bytes_per_sec}")
+        self.max_bytes_per_sec = max_bytes_per_sec
+        self._clock = clock
+        self._sleep = sleep
+        self._load_average = load_average
+        self._cpu_count = cpu_count or os.cpu_count() or 1
+        self._burst_seconds = burst_seconds
+
+        self.slowdown = 1.0
+        self.slept = 0.0
+        self._last = clock()
+        self._last_adapt: float | None = None
+        self._allowance = (max_bytes_per_sec or 0) * burst_seconds
+
+    @property
+    def bytes_per_sec(self) -> float | None:
+        """Current effective read cap (lower while the system is busy)."""
+        if self.max_bytes_per_sec is None:
+            return None
+        return self.max_bytes_per_sec / self.slowdown
+
+    def _adapt(self, now: float):
+        """Re-sample the load average and update the slowdown factor."""
+        if self._last_adapt is not None and now - self._last_adapt < ADAPT_INTERVAL_SECONDS:
+            return
+        self._last_adapt = now
+        load_per_cpu = self._load_average() / self._cpu_count
+        self.slowdown = min(max(load_per_cpu / LOAD_TARGET_PER_CPU, 1.0), MAX_SLOWDOWN)
+
+    def _pause(self, seconds: float):
+        """Sleep and account for it."""
+        if seconds > 0:
+            self._sleep(seconds)
+            self.slept += seconds
+
+    def consume(self, nbytes: int):
+        """
+        Account for nbytes read, sleeping as needed to stay under the cap.
+
+        Args:
+            nbytes: Bytes just read
+        """
+        if self.max_bytes_per_sec is None:
+            return
+        now = self._clock()
+        self._adapt(now)
+        rate = self.bytes_per_sec
+        self._allowance = min(self._allowance + (now - self._last) * rate, rate * self._burst_seconds)
+        self._last = now
+        self._allowance -= nbytes
+        if self._allowance < 0:
+            # The next refill covers the time slept, bringing the bucket back to zero
+            self._pause(-self._allowance / rate)
+
+    def pause_between_files(self):
+        """Yield the CPU and disk between files (longer while the system is busy)."""
+        self._adapt(self._clock())
+        self._pause(FILE_PAUSE_SECONDS * self.slowdown)
+
+
+def lower_priority() -> list[str]:
+    """
+    Lower this process's CPU and IO scheduling priority.
+
+    Uses nice everywhere, plus `taskpolicy -b` on macOS or the idle IO class
+    via `ionice` on Linux when available. Failures are ignored.
+
+    Returns:
+        list[str]: Descriptions of the adjustments that were applied
+    """
+    applied = []
+    try:
+        os.nice(NICE_INCREMENT)
+        applied.append(f"nice +{NICE_INCREMENT}")
+    except (AttributeError, OSError):
+        pass
+
+    pid = str(os.getpid())
+    if sys.platform == "darwin":
+        commands = [["taskpolicy", "-b", "-p", pid]]
+    else:
+        # Idle class needs no privileges on most kernels; best-effort lowest as a fallback
+        commands = [["ionice", "-c", "3", "-p", pid], ["ionice", "-c", "2", "-n", "7", "-p", pid]]
+    for command in commands:
+        if not shutil.which(command[0]):
+            break
+        try:
+            result = subprocess.run(command, capture_output=True, timeout=5)
+        except (OSError, subprocess.SubprocessError):
+            break
+        if result.returncode == 0:
+            applied.append(" ".join(command[:-2]))
+            break
+    return applied
+
+
+def configure_background(background: bool, max_mbps: float | None) -> IOThrottle | None:
+    """
+    Apply the CLI --background / --max-mbps options.
+
+    Args:
+        background: Lower scheduling priority and throttle (default cap if max_mbps is None)
+        max_mbps: Read cap in MB/s (also usable without background)
+
+    Returns:
+        IOThrottle | None: Throttle to pass to the extractor/creator, or None
+
+    Raises:
+        ValueError: If max_mbps is not positive
+    """
+    if background:
+        applied = lower_priority()
+        print(f"Background mode: {', '.join(applied) or 'priority unchanged'}")
+        max_mbps = max_mbps or DEFAULT_BACKGROUND_MBPS
+    if max_mbps is None:
+        return None
+    print(f"Read throughput cap: {max_mbps:g} MB/s (slower under load)")
+    return IOThrottle(max_mbps * BYTES_PER_MB)
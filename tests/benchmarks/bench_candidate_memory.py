@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for knowledge candidates: plain dicts vs CandidateRecord.
+
+Builds the same synthetic candidates both ways, the way the extractor does
+(a fresh source_file/project_path/timestamp string per candidate), and
+reports the per-candidate overhead measured with tracemalloc. Message text,
+tool uses and errors are shared between both runs and excluded, so the
+numbers show the container cost only.
+Results are appended to tests/benchmarks/results/candidate-memory.tsv.
+
+Usage:
+    python tests/benchmarks/bench_candidate_memory.py [--candidates N] [--files N]
+"""
+
+import argparse
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRIPTS_DIR = REPO_ROOT / "plugins" / "daily-knowledge-sync" / "skills" / "daily-knowledge-sync" / "scripts"
+RESULTS_FILE = Path(__file__).parent / "results" / "candidate-memory.tsv"
+
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from candidate_record import CandidateRecord
+
+
+def candidate_fields(count: int, files: int) -> list[tuple]:
+    """
+    Generate the inputs _extract_candidate sees for each candidate.
+
+    Args:
+        count: Number of candidates
+        files: Number of distinct session files (candidates are spread evenly)
+
+    Returns:
+        list[tuple]: (timestamp parts, role, text, file parts, line, cwd parts) per candidate
+    """
+    text = "エラーの原因を解決する手順を実装しました。" * 20
+    return [
+        (
+            (f"2026-01-30T{i // 3600 % 24:02d}:{i // 60 % 60:02d}", f":{i % 60:02d}.{i % 1000:03d}Z"),
+            "assistant" if i % 2 else "user",
+            text,
+            ("/home/user/.claude/projects/-Users-user-Work-git-github.com-org-repo", f"/session-{i % files:04d}.jsonl"),
+            i,
+            ("/Users/user/Work/git/github.com/org/", f"repo{i % files % 7}"),
+        )
+        for i in range(count)
+    ]
+
+
+def build_dicts(fields: list[tuple], tool_uses: list, errors: list) -> list[dict]:
+    """Build candidates as the previous dict representation."""
+    return [
+        {
+            "timestamp": "".join(ts),
+            "role": role,
+            "text": text,
+            "tool_uses": tool_uses,
+            "errors": errors,
+            "source_file": "".join(source),
+            "line_number": line,
+            "project_path": "".join(cwd),
+            "score": 1.0,
+        }
+        for ts, role, text, source, line, cwd in fields
+    ]
+
+
+def build_records(fields: list[tuple], tool_uses: list, errors: list) -> list[CandidateRecord]:
+    """Build candidates as CandidateRecord."""
+    return [
+        CandidateRecord(
+            timestamp="".join(ts),
+            role=role,
+            text=text,
+            tool_uses=tool_uses,
+            errors=errors,
+            source_file="".join(source),
+            line_number=line,
+            project_path="".join(cwd),
+            score=1.0,
+        )
+        for ts, role, text, source, line, cwd in fields
+    ]
+
+
+def measure(builder, fields: list[tuple]) -> float:
+    """
+    Return retained bytes per candidate after building all candidates.
+
+    Args:
+        builder: build_dicts or build_records
+        fields: Candidate inputs
+    """
+    tool_uses, errors = [], []
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    candidates = builder(fields, tool_uses, errors)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    assert len(candidates) == len(fields)
+    return (after - before) / len(fields)
+
+
+def git_revision() -> str:
+    """Return the short git revision of the working tree."""
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    return result.stdout.strip() or "unknown"
+
+
+def main():
+    """CLI interface."""
+    parser = argparse.ArgumentParser(description="Benchmark per-candidate memory overhead")
+    parser.add_argument("--candidates", type=int, default=20000)
+    parser.add_argument("--files", type=int, default=50)
+    args = parser.parse_args()
+
+    fields = candidate_fields(args.candidates, args.files)
+    dict_bytes = measure(build_dicts, fields)
+    record_bytes = measure(build_records, fields)
+
+    print(f"{args.candidates} candidates from {args.files} session files")
+    print(f"{'representation':<16} {'bytes/candidate':>16}")
+    print(f"{'dict':<16} {dict_bytes:16.0f}")
+    print(f"{'CandidateRecord':<16} {record_bytes:16.0f}")
+    print(f"Saved: {dict_bytes - record_bytes:.0f} bytes/candidate ({1 - record_bytes / dict_bytes:.0%})")
+
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not RESULTS_FILE.exists()
+    with open(RESULTS_FILE, "a") as f:
+        if new_file:
+            f.write("timestamp\trevision\tcandidates\tdict_bytes\trecord_bytes\n")
+        f.write(f"{timestamp}\t{git_revision()}\t{args.candidates}\t{dict_bytes:.0f}\t{record_bytes:.0f}\n")
+
+    print(f"\n📝 Appended to: {RESULTS_FILE.relative_to(REPO_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+JSON backend benchmark for conversation log and candidate parsing.
+
+Generates a synthetic Claude Code session log (text turns, tool uses with
+large inputs, large tool results and a few corrupt lines), then times each
+installed backend on full decoding and on the extractor's partial decoding.
+Results are appended to tests/benchmarks/results/json-backends.tsv.
+
+Usage:
+    python tests/benchmarks/bench_json_backends.py [--lines N] [--runs N]
+"""
+
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRIPTS_DIR = REPO_ROOT / "plugins" / "daily-knowledge-sync" / "skills" / "daily-knowledge-sync" / "scripts"
+RESULTS_FILE = Path(__file__).parent / "results" / "json-backends.tsv"
+
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+from json_backend import available_backends, get_backend
+
+WORDS = "error fix 解決 原因 implement pytest docker cache design 手順 build deploy".split()
+
+
+def synthetic_log(lines: int, seed: int = 0) -> list[str]:
+    """
+    Generate JSONL lines shaped like Claude Code session logs.
+
+    Args:
+        lines: Number of lines
+        seed: Random seed (the same seed gives the same log)
+
+    Returns:
+        list[str]: JSONL lines (about 1% are corrupt)
+    """
+    rng = random.Random(seed)
+    result = []
+    for i in range(lines):
+        timestamp = f"2026-01-30T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}.000Z"
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 400)))
+        kind = rng.random()
+        if kind < 0.4:
+            content = [{"type": "text", "text": text}]
+        elif kind < 0.7:
+            content = [
+                {"type": "text", "text": text[:200]},
+                {
+                    "type": "tool_use",
+                    "id": f"toolu_{i}",
+                    "name": "Write",
+                    "input": {"file_path": f"/work/repo/src/file{i}.py", "content": "x = 1\n" * rng.randint(50, 2000)},
+                },
+            ]
+        else:
+            content = [{"type": "tool_result", "tool_use_id": f"toolu_{i}", "content": text * rng.randint(1, 20)}]
+        entry = {
+            "parentUuid": f"uuid-{i - 1}",
+            "isSidechain": False,
+            "userType": "external",
+            "cwd": "/work/repo",
+            "sessionId": "00000000-0000-0000-0000-000000000000",
+            "version": "2.0.0",
+            "gitBranch": "main",
+            "type": "assistant" if kind < 0.7 else "user",
+            "message": {
+                "id": f"msg_{i}",
+                "role": "assistant" if kind < 0.7 else "user",
+                "model": "model",
+                "content": content,
+                "usage": {"input_tokens": rng.randint(1, 10000), "output_tokens": rng.randint(1, 4000)},
+            },
+            "toolUseResult": {"stdout": text * rng.randint(0, 10), "stderr": "", "interrupted": False},
+            "uuid": f"uuid-{i}",
+            "timestamp": timestamp,
+        }
+        line = json.dumps(entry, ensure_ascii=False)
+        if rng.random() < 0.01:
+            line = line[: len(line) // 2]  # Truncated write
+        result.append(line)
+    return result
+
+
+def time_decode(decode, lines: list[str], runs: int) -> float:
+    """
+    Return the median seconds to decode every line (corrupt lines are skipped).
+
+    Args:
+        decode: Decoding function
+        lines: JSONL lines
+        runs: Number of timed passes
+    """
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        for line in lines:
+            try:
+                decode(line)
+            except json.JSONDecodeError:
+                pass
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def git_revision() -> str:
+    """Return the short git revision of the working tree."""
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    return result.stdout.strip() or "unknown"
+
+
+def main():
+    """CLI interface."""
+    parser = argparse.ArgumentParser(description="Benchmark JSON decoding backends")
+    parser.add_argument("--lines", type=int, default=5000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    lines = synthetic_log(args.lines)
+    megabytes = sum(len(line.encode()) for line in lines) / 1024 / 1024
+    candidates = json.dumps([{"text": line[:2000], "score": 1.0} for line in lines], ensure_ascii=False)
+    print(f"Synthetic log: {len(lines)} lines, {megabytes:.1f} MB")
+
+    # Every backend must agree with the stdlib on what the extractor sees
+    reference = get_backend("json")
+    expected = []
+    for line in lines:
+        try:
+            expected.append(reference.decode_log_entry(line))
+        except json.JSONDecodeError:
+            expected.append(None)
+
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    revision = git_revision()
+    rows = []
+    baseline = None
+
+    print(f"{'backend':<10} {'full MB/s':>10} {'partial MB/s':>13} {'candidates ms':>14} {'vs json':>8}")
+    for name in available_backends()[::-1]:
+        backend = get_backend(name)
+        for line, want in zip(lines, expected):
+            try:
+                got = backend.decode_log_entry(line)
+            except json.JSONDecodeError:
+                got = None
+            if got != want:
+                print(f"❌ {name}: partial decode differs from stdlib")
+                sys.exit(1)
+
+        full_s = time_decode(backend.loads, lines, args.runs)
+        partial_s = time_decode(backend.decode_log_entry, lines, args.runs)
+        candidates_s = time_decode(backend.loads, [candidates], args.runs)
+        baseline = baseline or partial_s
+        print(
+            f"{name:<10} {megabytes / full_s:10.1f} {megabytes / partial_s:13.1f}"
+            f" {candidates_s * 1000:14.1f} {baseline / partial_s:7.1f}x"
+        )
+        rows.append(
+            f"{timestamp}\t{revision}\t{name}\t{len(lines)}\t{full_s * 1000:.1f}\t{partial_s * 1000:.1f}\t{candidates_s * 1000:.1f}"
+        )
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not RESULTS_FILE.exists()
+    with open(RESULTS_FILE, "a") as f:
+        if new_file:
+            f.write("timestamp\trevision\tbackend\tlines\tfull_ms\tpartial_ms\tcandidates_ms\n")
+        f.write("\n".join(rows) + "\n")
+
+    print(f"\n📝 Appended to: {RESULTS_FILE.relative_to(REPO_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for duplicate checks: per-process CLI vs warm service.
+
+Generates a synthetic knowledge repository, then times
+  - cli:      a fresh `check_similarity.py` process per check (service disabled)
+  - scan:     an in-process check that re-reads the category (cold corpus)
+  - service:  an is_duplicate request to a warm similarity service
+Results are appended to tests/benchmarks/results/similarity-service.tsv.
+
+Usage:
+    python tests/benchmarks/bench_similarity_service.py [--files N] [--queries N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRIPTS_DIR = REPO_ROOT / "plugins" / "daily-knowledge-sync" / "skills" / "daily-knowledge-sync" / "scripts"
+RESULTS_FILE = Path(__file__).parent / "results" / "similarity-service.tsv"
+
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+import similarity_service
+from check_similarity import SimilarityChecker
+from document_analysis import DocumentCache
+
+WORDS = "error fix import module docker cache build deploy pytest config 原因 解決 手順 設定".split()
+# Queries share a few words with the corpus but are never duplicates (every check is a full scan)
+QUERY_WORDS = "kubernetes ingress certificate rotation terraform state lock error fix".split()
+
+
+def build_repo(root: Path, files: int, seed: int = 0):
+    """Write synthetic knowledge files into one category."""
+    rng = random.Random(seed)
+    category = root / "errors"
+    category.mkdir(parents=True)
+    for i in range(files):
+        body = " ".join(rng.choice(WORDS) for _ in range(rng.randint(80, 400)))
+        (category / f"2026-01-{i % 28 + 1:02d}_note-{i}.md").write_text(f"# Note {i}\n\n{body}\n", encoding="utf-8")
+
+
+def scan_category(root: Path, text: str) -> bool:
+    """In-process check the way create_knowledge_files.py scans without an index."""
+    checker = SimilarityChecker(analysis_cache=DocumentCache())
+    for path in (root / "errors").glob("*.md"):
+        if checker.calculate_similarity(text, path.read_text(encoding="utf-8")) >= checker.threshold:
+            return True
+    return False
+
+
+def git_revision() -> str:
+    """Return the short git revision of the working tree."""
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    return result.stdout.strip() or "unknown"
+
+
+def main():
+    """CLI interface."""
+    parser = argparse.ArgumentParser(description="Benchmark duplicate-check latency with and without the service")
+    parser.add_argument("--files", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    queries = [" ".join(rng.choice(QUERY_WORDS) for _ in range(150)) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "kb"
+        build_repo(root, args.files)
+        socket_path = Path(tmp) / "bench.sock"
+
+        sample = next((root / "errors").glob("*.md"))
+        env = {**os.environ, similarity_service.SERVICE_ENV_VAR: "0"}
+        cli = []
+        for query in queries[:5]:
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, str(SCRIPTS_DIR / "check_similarity.py"), query, "--file", str(sample)],
+                env=env,
+                capture_output=True,
+                check=True,
+            )
+            cli.append(time.perf_counter() - start)
+
+        scan = []
+        for query in queries:
+            start = time.perf_counter()
+            scan_category(root, query)
+            scan.append(time.perf_counter() - start)
+
+        service = similarity_service.SimilarityService(str(root))
+        start = time.perf_counter()
+        service.load()
+        load_s = time.perf_counter() - start
+        ready = threading.Event()
+        thread = threading.Thread(
+            target=similarity_service.serve, args=(service, socket_path), kwargs={"ready": ready}, daemon=True
+        )
+        thread.start()
+        ready.wait(5)
+
+        client = similarity_service.connect(str(root), socket_path)
+        warm = []
+        for query in queries:
+            start = time.perf_counter()
+            client.is_duplicate(query, "errors")
+            warm.append(time.perf_counter() - start)
+        client.request("shutdown")
+        client.close()
+        thread.join(5)
+
+    results = {
+        "cli": statistics.median(cli) * 1000,
+        "scan": statistics.median(scan) * 1000,
+        "service": statistics.median(warm) * 1000,
+    }
+    print(f"{args.files} knowledge files, {args.queries} queries (service warm-up {load_s * 1000:.0f} ms)")
+    print(f"{'mode':<10} {'median ms':>10}")
+    for mode, ms in results.items():
+        print(f"{mode:<10} {ms:10.2f}")
+
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not RESULTS_FILE.exists()
+    with open(RESULTS_FILE, "a") as f:
+        if new_file:
+            f.write("timestamp\trevision\tfiles\tcli_ms\tscan_ms\tservice_ms\n")
+        row = [timestamp, git_revision(), str(args.files)] + [f"{results[mode]:.2f}" for mode in results]
+        f.write("\t".join(row) + "\n")
+
+    print(f"\n📝 Appended to: {RESULTS_FILE.relative_to(REPO_ROOT)}")
+
+
+if __name__ == "__main__":
+    main()
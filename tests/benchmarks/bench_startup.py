@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the daily-knowledge-sync CLI entry points.
+
+Measures interpreter + import time of each script in a fresh process and
+appends the results to tests/benchmarks/results/startup.tsv so regressions
+are visible across runs.
+
+Usage:
+    python tests/benchmarks/bench_startup.py [--runs N] [--max-ms MS]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SCRIPTS_DIR = REPO_ROOT / "plugins" / "daily-knowledge-sync" / "skills" / "daily-knowledge-sync" / "scripts"
+RESULTS_FILE = Path(__file__).parent / "results" / "startup.tsv"
+
+ENTRY_POINTS = [
+    "extract_knowledge",
+    "merge_candidates",
+    "create_knowledge_files",
+    "categorize_knowledge",
+    "check_similarity",
+    "similarity_service",
+    "search_index",
+    "aggregate_stats",
+    "pack_batches",
+    "sync_repo",
+    "manage_daily_trigger",
+]
+
+
+def measure(module: str, runs: int) -> tuple[float, float]:
+    """
+    Measure wall time and self-reported import time of a module.
+
+    Args:
+        module: Script module name
+        runs: Number of fresh processes to start
+
+    Returns:
+        tuple[float, float]: (median wall ms, median import ms from -X importtime)
+    """
+    code = f"import sys; sys.path.insert(0, {str(SCRIPTS_DIR)!r}); import {module}"
+    walls, imports = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True, text=True, check=True,
+        )
+        walls.append((time.perf_counter() - start) * 1000)
+
+        # Last "import time:" line for the module is its cumulative time (us)
+        for line in result.stderr.splitlines():
+            parts = line.split("|")
+            if len(parts) == 3 and parts[2].strip() == module:
+                imports.append(int(parts[1]) / 1000)
+    return statistics.median(walls), statistics.median(imports) if imports else 0.0
+
+
+def last_results() -> dict[str, float]:
+    """Return the most recent wall time per entry point from the results file."""
+    previous = {}
+    if RESULTS_FILE.exists():
+        for line in RESULTS_FILE.read_text().splitlines()[1:]:
+            _, _, module, wall_ms, _ = line.split("\t")
+            previous[module] = float(wall_ms)
+    return previous
+
+
+def git_revision() -> str:
+    """Return the short git revision of the working tree."""
+    result = subprocess.run(
+        ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True
+    )
+    return result.stdout.strip() or "unknown"
+
+
+def main():
+    """CLI interface."""
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup/import time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, help="Exit 1 if any entry point exceeds this median wall time")
+    args = parser.parse_args()
+
+    previous = last_results()
+    timestamp = datetime.now().isoformat(timespec="seconds")
+    revision = git_revision()
+    rows = []
+    failed = False
+
+    print(f"{'entry point':<26} {'wall ms':>9} {'import ms':>10} {'prev ms':>9}")
+    for module in ENTRY_POINTS:
+        wall_ms, import_ms = measure(module, args.runs)
+        prev = previous.get(module)
+        prev_str = f"{prev:9.1f}" if prev is not None else f"{'-':>9}"
+        print(f"{module:<26} {wall_ms:9.1f} {import_ms:10.1f} {prev_str}")
+        rows.append(f"{timestamp}\t{revision}\t{module}\t{wall_ms:.1f}\t{import_ms:.1f}")
+        if args.max_ms is not None and wall_ms > args.max_ms:
+            failed = True
+
+    RESULTS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    new_file = not RESULTS_FILE.exists()
+    with open(RESULTS_FILE, "a") as f:
+        if new_file:
+            f.write("timestamp\trevision\tentry_point\twall_ms\timport_ms\n")
+        f.write("\n".join(rows) + "\n")
+
+    print(f"\n📝 Appended to: {RESULTS_FILE.relative_to(REPO_ROOT)}")
+    if failed:
+        print(f"❌ Startup exceeded {args.max_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
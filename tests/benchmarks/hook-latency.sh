@@ -0,0 +1,279 @@
+#!/bin/bash
+# hook-latency.sh
+# global/hooks のフックを1回起動するごとのコスト（レイテンシ・fork 数）を計測するベンチマーク
+#
+# tests/benchmarks/corpus/ のペイロード（CLAUDE_TOOL_INPUT または stdin）を各フックに
+# N 回ずつ流し、p50/p95/p99 と fork/exec 数を表示する。
+# 結果は tests/benchmarks/results/hook-latency.tsv に追記し、前回の実行と比較する。
+#
+# macOS 専用コマンド（terminal-notifier, osascript）と pgrep, ccstatusline はスタブに
+# 置き換えるため、Linux でもそのまま実行できる。fork 数の計測には strace を使う（無ければ n/a）。
+#
+# 使い方:
+#   tests/benchmarks/hook-latency.sh [-n RUNS] [--hooks-dir DIR] [--only HOOK] [--max-ms MS] [--no-save]
+
+set -eo pipefail
+
+BENCH_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+REPO_ROOT="$(cd "$BENCH_DIR/../.." && pwd)"
+CORPUS_DIR="$BENCH_DIR/corpus"
+RESULTS_FILE="$BENCH_DIR/results/hook-latency.tsv"
+
+RUNS=50
+HOOKS_DIR="$REPO_ROOT/global/hooks"
+ONLY=""
+MAX_MS=""
+SAVE=1
+
+usage() {
+    sed -n '2,13p' "${BASH_SOURCE[0]}" | sed 's/^# \{0,1\}//'
+}
+
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        -n|--runs) RUNS="$2"; shift 2 ;;
+        --hooks-dir) HOOKS_DIR="$(cd "$2" && pwd)"; shift 2 ;;
+        --only) ONLY="$2"; shift 2 ;;
+        --max-ms) MAX_MS="$2"; shift 2 ;;
+        --no-save) SAVE=0; shift ;;
+        -h|--help) usage; exit 0 ;;
+        *) echo "Unknown option: $1" >&2; usage >&2; exit 2 ;;
+    esac
+done
+
+if [[ -z "${EPOCHREALTIME:-}" ]]; then
+    echo "ERROR: bash 5.0 以上が必要です（EPOCHREALTIME を使用）" >&2
+    exit 2
+fi
+if ! [[ "$RUNS" =~ ^[1-9][0-9]*$ ]]; then
+    echo "ERROR: --runs には正の整数を指定してください: $RUNS" >&2
+    exit 2
+fi
+
+# 計測ケース: フック 入力方法(env|stdin) コーパス 追加の環境変数
+CASES=(
+    "protect-secrets.sh read-source     env   tool-input/read-source.json     -"
+    "protect-secrets.sh read-secret     env   tool-input/read-secret.json     -"
+    "protect-secrets.sh bash-git-status env   tool-input/bash-git-status.json -"
+    "protect-secrets.sh bash-long       env   tool-input/bash-long.json       -"
+    "protect-secrets.sh edit            env   tool-input/edit.json            -"
+    "protect-secrets.sh write-large     env   @generated/write-large.json     -"
+    "protect-branch.sh  bash-git-status env   tool-input/bash-git-status.json -"
+    "protect-branch.sh  bash-git-commit env   tool-input/bash-git-commit.json -"
+    "protect-branch.sh  bash-long       env   tool-input/bash-long.json       -"
+    "protect-branch.sh  write-large     env   @generated/write-large.json     -"
+    "statusline.sh      cached          stdin stdin/statusline.json           -"
+    "statusline.sh      uncached        stdin stdin/statusline.json           STATUSLINE_CACHE_TTL=0"
+    "notify.sh          stop            stdin stdin/notify-stop.json          -"
+    "notify.sh          notification    stdin stdin/notify-notification.json  -"
+)
+
+# ===== 実行環境の準備（HOME などを一時ディレクトリに隔離） =====
+WORK_ROOT="$(mktemp -d)"
+trap 'rm -rf "$WORK_ROOT"' EXIT
+
+STUB_BIN="$WORK_ROOT/bin"
+WORK_DIR="$WORK_ROOT/work/app"
+GENERATED_DIR="$WORK_ROOT/generated"
+mkdir -p "$STUB_BIN" "$WORK_DIR/src/handlers" "$GENERATED_DIR" "$WORK_ROOT/home" "$WORK_ROOT/run"
+
+# macOS 専用コマンド・外部ツールのスタブ
+cat > "$STUB_BIN/terminal-notifier" <<'EOF'
+#!/bin/sh
+exit 0
+EOF
+cat > "$STUB_BIN/osascript" <<'EOF'
+#!/bin/sh
+exit 0
+EOF
+# ターミナルアプリは "Terminal" のみ起動している想定（先頭から順に探索される）
+cat > "$STUB_BIN/pgrep" <<'EOF'
+#!/bin/sh
+for arg in "$@"; do last="$arg"; done
+[ "$last" = "Terminal" ]
+EOF
+cat > "$STUB_BIN/ccstatusline" <<'EOF'
+#!/bin/sh
+cat > /dev/null
+echo "Model: Sonnet 4.5 | Ctx: 25k (12%) | ⎇ main | +156 -23"
+EOF
+chmod +x "$STUB_BIN"/*
+
+# 作業ディレクトリは main ブランチ上の Git リポジトリ（protect-branch.sh の通常経路）
+git -C "$WORK_DIR" init -q
+git -C "$WORK_DIR" symbolic-ref HEAD refs/heads/main
+echo "export {};" > "$WORK_DIR/src/handlers/session.ts"
+git -C "$WORK_DIR" add -A
+git -C "$WORK_DIR" -c user.name=bench -c user.email=bench@example.com commit -q -m "init"
+
+# 大きな JSON（Write ツールで約 90KB のファイルを書き込む入力）
+# 環境変数1つあたりの上限（Linux の MAX_ARG_STRLEN = 128KB）を超えると exec 自体が失敗するため、それ未満に収める
+awk -v path="$WORK_DIR/src/generated/fixtures.ts" 'BEGIN {
+    printf "{\"file_path\": \"%s\", \"content\": \"", path
+    for (i = 0; i < 1024; i++) {
+        printf "export const fixture%04d = { id: %d, name: \\\"fixture-%04d\\\", tags: [\\\"a\\\", \\\"b\\\"] };\\n", i, i, i
+    }
+    printf "\"}\n"
+}' > "$GENERATED_DIR/write-large.json"
+
+export HOME="$WORK_ROOT/home"
+export XDG_CACHE_HOME="$WORK_ROOT/cache"
+export XDG_RUNTIME_DIR="$WORK_ROOT/run"
+export PATH="$STUB_BIN:$PATH"
+export DEBUG=0
+unset CLAUDE_TOOL_INPUT STATUSLINE_CACHE_TTL GIT_DIR GIT_WORK_TREE
+
+# ===== 計測 =====
+# ペイロードを読み込み、@WORKDIR@ を作業ディレクトリに置き換えて一時ファイルに書き出す
+prepare_payload() {
+    local corpus="$1"
+    local source_file
+
+    if [[ "$corpus" == @generated/* ]]; then
+        source_file="$GENERATED_DIR/${corpus#@generated/}"
+    else
+        source_file="$CORPUS_DIR/$corpus"
+    fi
+    IFS= read -r -d '' payload < "$source_file" || true
+    payload="${payload%$'\n'}"
+    payload="${payload//@WORKDIR@/$WORK_DIR}"
+    payload_file="$WORK_ROOT/payload.json"
+    printf '%s\n' "$payload" > "$payload_file"
+}
+
+# フックを1回起動する（サブシェルから exec するため、実際の起動と同じ1プロセス）
+# 終了コードは hook_status に設定する（ブロック時の 1 は正常な判定結果）
+invoke_hook() {
+    local hook_path="$1"
+    local mode="$2"
+    local extra_env="$3"
+
+    (
+        cd "$WORK_DIR"
+        [[ "$extra_env" != "-" ]] && export "${extra_env?}"
+        if [[ "$mode" == "env" ]]; then
+            export CLAUDE_TOOL_INPUT="$payload"
+            exec bash "$hook_path" < /dev/null > /dev/null 2>&1
+        else
+            exec bash "$hook_path" < "$payload_file" > /dev/null 2>&1
+        fi
+    ) && hook_status=0 || hook_status=$?
+}
+
+# strace で fork（clone/fork/vfork）と exec の回数を数える
+count_processes() {
+    local hook_path="$1"
+    local mode="$2"
+    local extra_env="$3"
+    local trace_file="$WORK_ROOT/trace"
+
+    forks="n/a"
+    execs="n/a"
+    command -v strace > /dev/null 2>&1 || return 0
+
+    (
+        cd "$WORK_DIR"
+        [[ "$extra_env" != "-" ]] && export "${extra_env?}"
+        if [[ "$mode" == "env" ]]; then
+            export CLAUDE_TOOL_INPUT="$payload"
+            exec strace -f -qq -e trace=process -o "$trace_file" bash "$hook_path" < /dev/null > /dev/null 2>&1
+        else
+            exec strace -f -qq -e trace=process -o "$trace_file" bash "$hook_path" < "$payload_file" > /dev/null 2>&1
+        fi
+    ) || true
+
+    if [[ -f "$trace_file" ]]; then
+        forks=$(grep -cE '(clone3?|v?fork)(\(| resumed>).*= [0-9]+$' "$trace_file" || true)
+        # フック自身の bash 起動を除いた exec 数
+        execs=$(( $(grep -cE 'execve(\(| resumed>).*= 0$' "$trace_file" || true) - 1 ))
+        rm -f "$trace_file"
+    fi
+}
+
+# 昇順ソート済みの値（ms）から nearest-rank でパーセンタイルを求める
+percentiles() {
+    sort -n | awk '
+        { v[NR] = $1 }
+        END {
+            n = NR
+            split("50 95 99", ps, " ")
+            for (i = 1; i <= 3; i++) {
+                rank = int((ps[i] / 100) * n + 0.999999)
+                if (rank < 1) rank = 1
+                printf "%.2f%s", v[rank], (i < 3 ? " " : "\n")
+            }
+        }'
+}
+
+# 前回の結果（フック・ケースごとの最後の p50）
+declare -A previous_p50
+if [[ -f "$RESULTS_FILE" ]]; then
+    while IFS=$'\t' read -r _ _ hook case_name _ p50 _; do
+        [[ "$hook" == "hook" ]] && continue
+        previous_p50["$hook/$case_name"]="$p50"
+    done < "$RESULTS_FILE"
+fi
+
+timestamp="$(date '+%Y-%m-%dT%H:%M:%S')"
+revision="$(git -C "$REPO_ROOT" rev-parse --short HEAD 2>/dev/null || echo unknown)"
+rows=()
+failed=0
+
+printf '%-20s %-16s %9s %9s %9s %6s %6s %10s\n' "hook" "case" "p50(ms)" "p95(ms)" "p99(ms)" "forks" "execs" "vs prev"
+for spec in "${CASES[@]}"; do
+    read -r hook case_name mode corpus extra_env <<< "$spec"
+    if [[ -n "$ONLY" && "$hook" != "$ONLY" && "${hook%.sh}" != "$ONLY" ]]; then
+        continue
+    fi
+    hook_path="$HOOKS_DIR/$hook"
+    if [[ ! -f "$hook_path" ]]; then
+        echo "SKIP: $hook_path が見つかりません" >&2
+        continue
+    fi
+
+    prepare_payload "$corpus"
+
+    # ウォームアップ（設定キャッシュ・statusline キャッシュの作成を計測から除外）
+    invoke_hook "$hook_path" "$mode" "$extra_env"
+    if [[ "$hook_status" -ge 126 ]]; then
+        echo "ERROR: $hook $case_name を起動できません（exit $hook_status）" >&2
+        failed=1
+        continue
+    fi
+
+    samples=""
+    for ((i = 0; i < RUNS; i++)); do
+        start="${EPOCHREALTIME/[.,]/}"
+        invoke_hook "$hook_path" "$mode" "$extra_env"
+        end="${EPOCHREALTIME/[.,]/}"
+        samples+="$(( end - start ))"$'\n'
+    done
+    read -r p50 p95 p99 <<< "$(printf '%s' "$samples" | awk '{ printf "%.3f\n", $1 / 1000 }' | percentiles)"
+
+    count_processes "$hook_path" "$mode" "$extra_env"
+
+    delta="-"
+    prev="${previous_p50["$hook/$case_name"]:-}"
+    if [[ -n "$prev" ]]; then
+        delta=$(awk -v now="$p50" -v prev="$prev" 'BEGIN { if (prev > 0) printf "%+.1f%%", (now - prev) / prev * 100; else print "-" }')
+    fi
+
+    printf '%-20s %-16s %9s %9s %9s %6s %6s %10s\n' "$hook" "$case_name" "$p50" "$p95" "$p99" "$forks" "$execs" "$delta"
+    rows+=("$(printf '%s\t' "$timestamp" "$revision" "$hook" "$case_name" "$RUNS" "$p50" "$p95" "$p99" "$forks")$execs")
+
+    if [[ -n "$MAX_MS" ]] && awk -v v="$p95" -v max="$MAX_MS" 'BEGIN { exit !(v > max) }'; then
+        echo "FAIL: $hook $case_name p95 ${p95}ms > ${MAX_MS}ms" >&2
+        failed=1
+    fi
+done
+
+if [[ "$SAVE" -eq 1 && ${#rows[@]} -gt 0 ]]; then
+    mkdir -p "$(dirname "$RESULTS_FILE")"
+    if [[ ! -f "$RESULTS_FILE" ]]; then
+        printf 'timestamp\trevision\thook\tcase\truns\tp50_ms\tp95_ms\tp99_ms\tforks\texecs\n' > "$RESULTS_FILE"
+    fi
+    printf '%s\n' "${rows[@]}" >> "$RESULTS_FILE"
+    echo "Results appended to ${RESULTS_FILE#"$REPO_ROOT"/}"
+fi
+
+exit "$failed"
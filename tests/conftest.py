@@ -0,0 +1,10 @@
+"""pytest configuration: make the daily-knowledge-sync scripts importable."""
+
+import sys
+from pathlib import Path
+
+SCRIPTS_DIR = (
+    Path(__file__).parent.parent
+    / "plugins" / "daily-knowledge-sync" / "skills" / "daily-knowledge-sync" / "scripts"
+)
+sys.path.insert(0, str(SCRIPTS_DIR))
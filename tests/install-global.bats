@@ -0,0 +1,126 @@
+#!/usr/bin/env bats
+# install-global.sh のテストスイート（差分同期・内容アドレス方式バックアップ）
+
+# テスト用のセットアップ
+setup() {
+    # テスト対象のスクリプトとソースをコピー（ソース変更をテストするため）
+    REPO_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/.." && pwd)"
+    TEST_TEMP_DIR="$(mktemp -d)"
+    mkdir -p "$TEST_TEMP_DIR/repo"
+    cp "$REPO_DIR/install-global.sh" "$TEST_TEMP_DIR/repo/"
+    cp -R "$REPO_DIR/global" "$TEST_TEMP_DIR/repo/global"
+    INSTALL_SCRIPT="$TEST_TEMP_DIR/repo/install-global.sh"
+
+    export HOME="$TEST_TEMP_DIR/home"
+    mkdir -p "$HOME"
+}
+
+# テスト後のクリーンアップ
+teardown() {
+    rm -rf "$TEST_TEMP_DIR"
+}
+
+# ヘルパー関数：インストールを実行
+run_install() {
+    run bash "$INSTALL_SCRIPT" "$@"
+}
+
+# ヘルパー関数：マーカー以降に書き込まれたファイルを列挙
+written_since_marker() {
+    find "$HOME/.claude" "$HOME/.claude_backup" "$HOME/.secrets" -newer "$TEST_TEMP_DIR/marker" 2>/dev/null
+}
+
+# ヘルパー関数：バックアップオブジェクト数
+object_count() {
+    find "$HOME/.claude_backup/objects" -type f 2>/dev/null | wc -l | tr -d ' '
+}
+
+@test "初回インストール: ファイルをコピーしマニフェストを記録する" {
+    run_install
+    [ "$status" -eq 0 ]
+    [ -f "$HOME/.claude/base/CLAUDE-base.md" ]
+    [ -x "$HOME/.claude/hooks/protect-branch.sh" ]
+    [ -f "$HOME/.claude/settings.json" ]
+    grep -q $'\thooks/notify.sh$' "$HOME/.claude/.install-manifest"
+    # 上書きがないのでバックアップは作られない
+    [ ! -d "$HOME/.claude_backup" ]
+}
+
+@test "再インストール: 変更がなければ何も書き込まない" {
+    run_install
+    [ "$status" -eq 0 ]
+    touch "$TEST_TEMP_DIR/marker"
+    sleep 1
+
+    run_install
+    [ "$status" -eq 0 ]
+    [[ "$output" == *"0 updated"* ]]
+    [[ "$output" == *"settings.json is up to date"* ]]
+    [ -z "$(written_since_marker)" ]
+}
+
+@test "ソース変更: 変更されたファイルのみバックアップして更新する" {
+    run_install
+    echo "# v2" >> "$TEST_TEMP_DIR/repo/global/team/CLAUDE-team-standards.md"
+
+    run_install
+    [ "$status" -eq 0 ]
+    [[ "$output" == *"✓ Updated team/CLAUDE-team-standards.md"* ]]
+    [[ "$output" == *"1 updated"* ]]
+    cmp "$TEST_TEMP_DIR/repo/global/team/CLAUDE-team-standards.md" "$HOME/.claude/team/CLAUDE-team-standards.md"
+    [ "$(object_count)" -eq 1 ]
+    # バックアップは旧バージョンの内容
+    cmp "$REPO_DIR/global/team/CLAUDE-team-standards.md" "$HOME/.claude_backup/objects/"*
+    grep -q "team/CLAUDE-team-standards.md" "$HOME/.claude_backup/index.tsv"
+}
+
+@test "同一内容のバックアップは一度だけ保存する" {
+    run_install
+    local dest="$HOME/.claude/hooks/notify.conf"
+
+    echo "local" >> "$dest"
+    run_install
+    [[ "$output" == *"ローカルの変更を上書きします: hooks/notify.conf"* ]]
+
+    echo "local" >> "$dest"
+    run_install
+    [ "$status" -eq 0 ]
+    [ "$(object_count)" -eq 1 ]
+    [ "$(wc -l < "$HOME/.claude_backup/index.tsv" | tr -d ' ')" -eq 2 ]
+}
+
+@test "旧形式の .bak を内容アドレス方式へ移行する" {
+    mkdir -p "$HOME/.claude_backup"
+    echo "old" > "$HOME/.claude_backup/CLAUDE.md.20240101_120000.bak"
+    echo "old" > "$HOME/.claude_backup/CLAUDE.md.20240102_120000.bak"
+
+    run_install
+    [ "$status" -eq 0 ]
+    [ -z "$(ls "$HOME/.claude_backup/"*.bak 2>/dev/null)" ]
+    [ "$(object_count)" -eq 1 ]
+    grep -q $'^20240101_120000\t[0-9a-f]*\tCLAUDE.md$' "$HOME/.claude_backup/index.tsv"
+}
+
+@test "実行権限が外れたフックは内容を書き換えずに権限のみ戻す" {
+    run_install
+    chmod -x "$HOME/.claude/hooks/notify.sh"
+
+    run_install
+    [ "$status" -eq 0 ]
+    [ -x "$HOME/.claude/hooks/notify.sh" ]
+    [[ "$output" == *"0 updated"* ]]
+}
+
+@test "--force: 同一内容でも再コピーし、バックアップは作らない" {
+    run_install
+    run_install --force
+    [ "$status" -eq 0 ]
+    [[ "$output" == *"0 unchanged"* ]]
+    [ "$(object_count)" -eq 0 ]
+}
+
+@test "不明なオプションはエラー" {
+    run_install --bogus
+    [ "$status" -eq 1 ]
+    [[ "$output" == *"Usage:"* ]]
+}
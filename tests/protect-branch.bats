@@ -0,0 +1,286 @@
+#!/usr/bin/env bats
+# protect-branch.sh のテストスイート
+# 書き換え前の実装（tests/fixtures/protect-branch.legacy.sh）と判定結果・実行時間を比較する
+
+# テスト用のセットアップ
+setup() {
+    # テスト対象のスクリプトへのパス
+    SCRIPT_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/.." && pwd)"
+
+    # テスト用の一時ディレクトリ
+    TEST_TEMP_DIR="$(mktemp -d)"
+
+    # 新旧スクリプトを同じ設定ファイルとともに配置
+    HOOK_DIR="$TEST_TEMP_DIR/hooks"
+    LEGACY_DIR="$TEST_TEMP_DIR/legacy"
+    mkdir -p "$HOOK_DIR" "$LEGACY_DIR"
+    cp "$SCRIPT_DIR/global/hooks/protect-branch.sh" "$SCRIPT_DIR/global/hooks/protect-branch.conf" "$HOOK_DIR/"
+    cp "$SCRIPT_DIR/tests/fixtures/protect-branch.legacy.sh" "$LEGACY_DIR/protect-branch.sh"
+    cp "$SCRIPT_DIR/global/hooks/protect-branch.conf" "$LEGACY_DIR/"
+    HOOK_SCRIPT="$HOOK_DIR/protect-branch.sh"
+    LEGACY_SCRIPT="$LEGACY_DIR/protect-branch.sh"
+
+    # 設定キャッシュをテストごとに分離
+    export XDG_CACHE_HOME="$TEST_TEMP_DIR/cache"
+
+    # ユーザー・システムの git 設定の影響を受けないようにする
+    export GIT_CONFIG_NOSYSTEM=1
+    export GIT_CONFIG_GLOBAL=/dev/null
+    export GIT_AUTHOR_NAME="test" GIT_AUTHOR_EMAIL="test@example.com"
+    export GIT_COMMITTER_NAME="test" GIT_COMMITTER_EMAIL="test@example.com"
+    unset GIT_DIR GIT_WORK_TREE
+
+    # DEBUG=1でテストログを有効化（任意）
+    export DEBUG=0
+}
+
+# テスト後のクリーンアップ
+teardown() {
+    rm -rf "$TEST_TEMP_DIR"
+}
+
+# ヘルパー関数：main ブランチに1コミットあるリポジトリを作成
+make_repo() {
+    local repo="$1"
+    mkdir -p "$repo"
+    git -C "$repo" init -q
+    git -C "$repo" symbolic-ref HEAD refs/heads/main
+    echo "init" > "$repo/README.md"
+    git -C "$repo" add README.md
+    git -C "$repo" commit -q -m "init"
+}
+
+# ヘルパー関数：指定ディレクトリでスクリプトを実行
+run_hook_in() {
+    local dir="$1"
+    local script="$2"
+    local input="$3"
+    cd "$dir" && CLAUDE_TOOL_INPUT="$input" bash "$script"
+}
+
+# ヘルパー関数：新旧スクリプトの終了コードと出力が一致することを確認し、新スクリプトの結果を残す
+assert_same_decision() {
+    local dir="$1"
+    local input="$2"
+
+    run run_hook_in "$dir" "$LEGACY_SCRIPT" "$input"
+    local legacy_status="$status"
+    local legacy_output="$output"
+
+    run run_hook_in "$dir" "$HOOK_SCRIPT" "$input"
+    [ "$status" -eq "$legacy_status" ]
+    [ "$output" = "$legacy_output" ]
+}
+
+# テスト1: CLAUDE_TOOL_INPUT未設定時は許可される
+@test "Allow when CLAUDE_TOOL_INPUT is not set" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    cd "$TEST_TEMP_DIR/repo"
+    run bash "$HOOK_SCRIPT"
+    [ "$status" -eq 0 ]
+}
+
+# テスト2: Git リポジトリ外では許可
+@test "Same decision outside a git repository" {
+    mkdir -p "$TEST_TEMP_DIR/plain"
+    assert_same_decision "$TEST_TEMP_DIR/plain" '{"command": "git commit -m test"}'
+    [ "$status" -eq 0 ]
+}
+
+# テスト3: main ブランチでの git commit をブロック
+@test "Same decision for git commit on main" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    assert_same_decision "$TEST_TEMP_DIR/repo" '{"command": "git commit -m test"}'
+    [ "$status" -eq 1 ]
+    [[ "$output" =~ "BLOCK" ]]
+    [[ "$output" =~ "現在のブランチ: main" ]]
+}
+
+# テスト4: main ブランチでも危険でない操作は許可
+@test "Same decision for safe command on main" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    assert_same_decision "$TEST_TEMP_DIR/repo" '{"command": "git status"}'
+    [ "$status" -eq 0 ]
+}
+
+# テスト5: 作業ブランチでの git push は許可
+@test "Same decision for git push on feature branch" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    git -C "$TEST_TEMP_DIR/repo" checkout -q -b feature/login
+    assert_same_decision "$TEST_TEMP_DIR/repo" '{"command": "git push origin feature/login"}'
+    [ "$status" -eq 0 ]
+}
+
+# テスト6: サブディレクトリからでもリポジトリのブランチを判定
+@test "Same decision from a subdirectory" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    mkdir -p "$TEST_TEMP_DIR/repo/src/lib"
+    assert_same_decision "$TEST_TEMP_DIR/repo/src/lib" '{"command": "git merge feature"}'
+    [ "$status" -eq 1 ]
+}
+
+# テスト7: detached HEAD は保護ブランチ扱いしない（git にフォールバック）
+@test "Same decision on detached HEAD" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    git -C "$TEST_TEMP_DIR/repo" checkout -q --detach
+    assert_same_decision "$TEST_TEMP_DIR/repo" '{"command": "git commit -m test"}'
+    [ "$status" -eq 0 ]
+}
+
+# テスト8: worktree 上の main ブランチをブロック
+@test "Same decision in a worktree on main" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    git -C "$TEST_TEMP_DIR/repo" checkout -q -b develop-work
+    git -C "$TEST_TEMP_DIR/repo" worktree add -q "$TEST_TEMP_DIR/wt-main" main
+    assert_same_decision "$TEST_TEMP_DIR/wt-main" '{"command": "git push"}'
+    [ "$status" -eq 1 ]
+}
+
+# テスト9: worktree 上の作業ブランチは許可
+@test "Same decision in a worktree on feature branch" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    git -C "$TEST_TEMP_DIR/repo" worktree add -q -b feature/wt "$TEST_TEMP_DIR/wt-feature"
+    assert_same_decision "$TEST_TEMP_DIR/wt-feature" '{"command": "git push"}'
+    [ "$status" -eq 0 ]
+}
+
+# テスト10: 相対パスの gitdir ファイル（submodule 形式）
+@test "Same decision with a relative gitdir file" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    mkdir -p "$TEST_TEMP_DIR/store"
+    mv "$TEST_TEMP_DIR/repo/.git" "$TEST_TEMP_DIR/store/repo.git"
+    echo "gitdir: ../store/repo.git" > "$TEST_TEMP_DIR/repo/.git"
+    assert_same_decision "$TEST_TEMP_DIR/repo" '{"command": "git commit -m test"}'
+    [ "$status" -eq 1 ]
+}
+
+# テスト11: packed-refs のみにあるブランチ
+@test "Same decision when the branch ref is packed" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    git -C "$TEST_TEMP_DIR/repo" pack-refs --all
+    [ ! -f "$TEST_TEMP_DIR/repo/.git/refs/heads/main" ]
+    assert_same_decision "$TEST_TEMP_DIR/repo" '{"command": "git commit -m test"}'
+    [ "$status" -eq 1 ]
+}
+
+# テスト12: コミットのないブランチ（git rev-parse は失敗するため許可）
+@test "Same decision on an unborn branch" {
+    mkdir -p "$TEST_TEMP_DIR/empty"
+    git -C "$TEST_TEMP_DIR/empty" init -q
+    git -C "$TEST_TEMP_DIR/empty" symbolic-ref HEAD refs/heads/main
+    assert_same_decision "$TEST_TEMP_DIR/empty" '{"command": "git commit -m initial"}'
+    [ "$status" -eq 0 ]
+}
+
+# テスト13: 改行を含む入力でも行単位で判定
+@test "Same decision for multi-line input" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    assert_same_decision "$TEST_TEMP_DIR/repo" $'{"command": "npm test &&\ngit push"}'
+    [ "$status" -eq 1 ]
+}
+
+# テスト14: 設定ファイルの保護ブランチパターン（スラッシュを含むブランチ）
+# 旧実装は GNU stat で所有者判定に失敗し Linux では設定を読まないため、新実装の判定のみ確認する
+@test "Custom protected branch pattern from the config file" {
+    echo 'PROTECTED_BRANCHES="main|release/.*"' >> "$HOOK_DIR/protect-branch.conf"
+    make_repo "$TEST_TEMP_DIR/repo"
+    git -C "$TEST_TEMP_DIR/repo" checkout -q -b release/1.0
+    run run_hook_in "$TEST_TEMP_DIR/repo" "$HOOK_SCRIPT" '{"command": "git commit -m hotfix"}'
+    [ "$status" -eq 1 ]
+    [[ "$output" =~ "BLOCK" ]]
+
+    git -C "$TEST_TEMP_DIR/repo" checkout -q -b feature/hotfix
+    run run_hook_in "$TEST_TEMP_DIR/repo" "$HOOK_SCRIPT" '{"command": "git commit -m hotfix"}'
+    [ "$status" -eq 0 ]
+}
+
+# テスト15: 通常のブランチ判定では git を起動しない
+@test "Resolve branch without invoking git" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    mkdir -p "$TEST_TEMP_DIR/bin"
+    printf '#!/bin/sh\necho called >> "%s"\nexit 1\n' "$TEST_TEMP_DIR/git-called" > "$TEST_TEMP_DIR/bin/git"
+    chmod +x "$TEST_TEMP_DIR/bin/git"
+
+    cd "$TEST_TEMP_DIR/repo"
+    run env PATH="$TEST_TEMP_DIR/bin:$PATH" CLAUDE_TOOL_INPUT='{"command": "git commit -m test"}' bash "$HOOK_SCRIPT"
+    [ "$status" -eq 1 ]
+    [ ! -f "$TEST_TEMP_DIR/git-called" ]
+}
+
+# テスト16: 設定ファイルの変更はキャッシュ済みでも反映される
+@test "Config changes invalidate the cached config" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    git -C "$TEST_TEMP_DIR/repo" checkout -q -b staging
+
+    run run_hook_in "$TEST_TEMP_DIR/repo" "$HOOK_SCRIPT" '{"command": "git push"}'
+    [ "$status" -eq 0 ]
+    [ -n "$(ls "$XDG_CACHE_HOME/claude-hooks/")" ]
+
+    # mtime を確実に進めてから設定を追加
+    sleep 1
+    echo 'PROTECTED_BRANCHES="main|staging"' >> "$HOOK_DIR/protect-branch.conf"
+
+    run run_hook_in "$TEST_TEMP_DIR/repo" "$HOOK_SCRIPT" '{"command": "git push"}'
+    [ "$status" -eq 1 ]
+    [[ "$output" =~ "BLOCK" ]]
+}
+
+# テスト17: 新実装は書き換え前の実装より速い
+@test "Faster than the legacy implementation" {
+    if [[ -z "${EPOCHREALTIME:-}" ]]; then
+        skip "EPOCHREALTIME が使えない bash（5.0 未満）"
+    fi
+    make_repo "$TEST_TEMP_DIR/repo"
+    cd "$TEST_TEMP_DIR/repo"
+
+    local runs=20
+    local script start legacy_us hook_us i
+    for script in "$LEGACY_SCRIPT" "$HOOK_SCRIPT"; do
+        # 初回はキャッシュ作成を含むため計測から除外
+        CLAUDE_TOOL_INPUT='{"command": "git status"}' bash "$script"
+        start="${EPOCHREALTIME/[.,]/}"
+        for ((i = 0; i < runs; i++)); do
+            CLAUDE_TOOL_INPUT='{"command": "git status"}' bash "$script"
+        done
+        if [[ "$script" == "$LEGACY_SCRIPT" ]]; then
+            legacy_us=$(( ${EPOCHREALTIME/[.,]/} - start ))
+        else
+            hook_us=$(( ${EPOCHREALTIME/[.,]/} - start ))
+        fi
+    done
+
+    echo "# legacy: $((legacy_us / runs))us/run, current: $((hook_us / runs))us/run" 2>/dev/null >&3 || true
+    [ "$hook_us" -lt "$legacy_us" ]
+}
+
+# テスト18: 大きな packed-refs は全体を読まずに git で判定する
+@test "Large packed-refs falls back to git" {
+    make_repo "$TEST_TEMP_DIR/repo"
+    git -C "$TEST_TEMP_DIR/repo" pack-refs --all
+    local packed="$TEST_TEMP_DIR/repo/.git/packed-refs"
+    local head_sha
+    head_sha=$(git -C "$TEST_TEMP_DIR/repo" rev-parse HEAD)
+    # main より前に並ぶ 200k 件のブランチ（約 11MB、ソート順を保つ）
+    {
+        echo "# pack-refs with: peeled fully-peeled sorted "
+        awk -v sha="$head_sha" 'BEGIN { for (i = 0; i < 200000; i++) printf "%s refs/heads/archive/%06d\n", sha, i }'
+        echo "$head_sha refs/heads/main"
+    } > "$packed.tmp"
+    mv "$packed.tmp" "$packed"
+
+    # git の起動を記録してから本物の git に渡す
+    local real_git
+    real_git="$(command -v git)"
+    mkdir -p "$TEST_TEMP_DIR/bin"
+    printf '#!/bin/sh\necho called >> "%s"\nexec "%s" "$@"\n' "$TEST_TEMP_DIR/git-called" "$real_git" > "$TEST_TEMP_DIR/bin/git"
+    chmod +x "$TEST_TEMP_DIR/bin/git"
+
+    cd "$TEST_TEMP_DIR/repo"
+    run env PATH="$TEST_TEMP_DIR/bin:$PATH" CLAUDE_TOOL_INPUT='{"command": "git commit -m test"}' bash "$HOOK_SCRIPT"
+    [ "$status" -eq 1 ]
+    [[ "$output" =~ "BLOCK" ]]
+    [ -f "$TEST_TEMP_DIR/git-called" ]
+
+    run env PATH="$TEST_TEMP_DIR/bin:$PATH" CLAUDE_TOOL_INPUT='{"command": "git status"}' bash "$HOOK_SCRIPT"
+    [ "$status" -eq 0 ]
+}
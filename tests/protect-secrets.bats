@@ -10,6 +10,9 @@ setup() {
     # テスト用の一時ディレクトリ
     TEST_TEMP_DIR="$(mktemp -d)"
 
+    # 照合用正規表現のキャッシュをテストごとに分離
+    export XDG_CACHE_HOME="$TEST_TEMP_DIR/cache"
+
     # DEBUG=1でテストログを有効化（任意）
     export DEBUG=0
 }
@@ -197,3 +200,74 @@ run_hook() {
     [ "$status" -eq 1 ]
     [[ "$output" =~ "BLOCK" ]]
 }
+
+# テスト26: 改行を含むコマンドでも行単位で判定
+@test "Block Bash tool multi-line command reading secrets" {
+    run run_hook '{"command": "echo start\ncat ~/.ssh/config"}'
+    [ "$status" -eq 1 ]
+    [[ "$output" =~ "BLOCK" ]]
+}
+
+# テスト27: 読み取り系コマンドを含まない場合は秘密情報パターンがあっても許可
+@test "Allow Bash tool command without read commands" {
+    run run_hook '{"command": "export TOKEN_NAME=x; catalog token"}'
+    [ "$status" -eq 0 ]
+}
+
+# テスト28: 設定ファイルの変更はキャッシュ済みでも反映される
+@test "Config changes invalidate the cached matcher" {
+    cp "$HOOK_SCRIPT" "$SCRIPT_DIR/global/hooks/protect-secrets.conf" "$TEST_TEMP_DIR/"
+    local hook="$TEST_TEMP_DIR/protect-secrets.sh"
+
+    run env CLAUDE_TOOL_INPUT='{"file_path": "/app/custom.vault"}' bash "$hook"
+    [ "$status" -eq 0 ]
+    [ -n "$(ls "$XDG_CACHE_HOME/claude-hooks/")" ]
+
+    # mtime を確実に進めてから設定を追加
+    sleep 1
+    echo 'SECRETS_FILES="\.vault"' >> "$TEST_TEMP_DIR/protect-secrets.conf"
+
+    run env CLAUDE_TOOL_INPUT='{"file_path": "/app/custom.vault"}' bash "$hook"
+    [ "$status" -eq 1 ]
+    [[ "$output" =~ "BLOCK" ]]
+}
+
+# 正規表現非対応の jq（oniguruma なし）を模したラッパーを用意する
+fake_jq() {
+    local real_jq
+    real_jq="$(command -v jq)"
+    mkdir -p "$TEST_TEMP_DIR/bin"
+    cat > "$TEST_TEMP_DIR/bin/jq" <<SCRIPT
+#!/bin/bash
+$1
+exec "$real_jq" "\$@"
+SCRIPT
+    chmod +x "$TEST_TEMP_DIR/bin/jq"
+}
+
+# テスト29: 1回目の jq が失敗しても許可せず、1項目ずつの抽出で判定する
+@test "Block when jq lacks regex support" {
+    if ! command -v jq &>/dev/null; then
+        skip "jq not available"
+    fi
+    fake_jq 'if [[ "$*" == *"sub("* ]]; then echo "jq: error: sub/2 is not defined" >&2; exit 3; fi'
+
+    run env PATH="$TEST_TEMP_DIR/bin:$PATH" CLAUDE_TOOL_INPUT='{"file_path": "/path/to/.env"}' bash "$HOOK_SCRIPT"
+    [ "$status" -eq 1 ]
+    [[ "$output" =~ "BLOCK" ]]
+
+    run env PATH="$TEST_TEMP_DIR/bin:$PATH" CLAUDE_TOOL_INPUT='{"command": "cat ~/.aws/credentials"}' bash "$HOOK_SCRIPT"
+    [ "$status" -eq 1 ]
+}
+
+# テスト30: jq 自体が動かない場合も grep による抽出で判定する
+@test "Block when jq fails entirely" {
+    if ! command -v jq &>/dev/null; then
+        skip "jq not available"
+    fi
+    fake_jq 'exit 127'
+
+    run env PATH="$TEST_TEMP_DIR/bin:$PATH" CLAUDE_TOOL_INPUT='{"file_path": "/path/to/.env"}' bash "$HOOK_SCRIPT"
+    [ "$status" -eq 1 ]
+    [[ "$output" =~ "BLOCK" ]]
+}
@@ -0,0 +1,131 @@
+#!/usr/bin/env bats
+# statusline.sh のテストスイート（キャッシュ層）
+
+# テスト用のセットアップ
+setup() {
+    # テスト対象のスクリプトへのパス
+    SCRIPT_DIR="$(cd "$(dirname "$BATS_TEST_FILENAME")/.." && pwd)"
+    HOOK_SCRIPT="$SCRIPT_DIR/global/hooks/statusline.sh"
+
+    # テスト用の一時ディレクトリ
+    TEST_TEMP_DIR="$(mktemp -d)"
+    export HOME="$TEST_TEMP_DIR/home"
+    export XDG_RUNTIME_DIR="$TEST_TEMP_DIR/run"
+    mkdir -p "$HOME" "$XDG_RUNTIME_DIR" "$TEST_TEMP_DIR/bin" "$TEST_TEMP_DIR/work/project"
+
+    # ccstatusline のスタブ（呼び出し回数を記録）
+    CALLS_FILE="$TEST_TEMP_DIR/calls"
+    stub_ccstatusline 0
+
+    INPUT='{"session_id":"s1","cwd":"'"$TEST_TEMP_DIR"'/work/project","model":{"display_name":"Opus"}}'
+}
+
+# テスト後のクリーンアップ
+teardown() {
+    rm -rf "$TEST_TEMP_DIR"
+}
+
+# ヘルパー関数：ccstatusline スタブを作成（引数は終了コード）
+stub_ccstatusline() {
+    local exit_code="$1"
+    if [[ "$exit_code" -eq 0 ]]; then
+        printf '#!/bin/sh\necho call >> "%s"\ncat >/dev/null\necho "ctx 10%%"\n' "$CALLS_FILE" > "$TEST_TEMP_DIR/bin/ccstatusline"
+    else
+        printf '#!/bin/sh\necho call >> "%s"\necho "boom" >&2\nexit %s\n' "$CALLS_FILE" "$exit_code" > "$TEST_TEMP_DIR/bin/ccstatusline"
+    fi
+    chmod +x "$TEST_TEMP_DIR/bin/ccstatusline"
+}
+
+# ヘルパー関数：スクリプトを標準入力付きで実行
+run_statusline() {
+    echo "$1" | PATH="$TEST_TEMP_DIR/bin:$PATH" bash "$HOOK_SCRIPT"
+}
+
+# ヘルパー関数：ccstatusline の呼び出し回数
+call_count() {
+    if [[ -f "$CALLS_FILE" ]]; then
+        wc -l < "$CALLS_FILE" | tr -d ' '
+    else
+        echo 0
+    fi
+}
+
+# テスト1: cwd の末尾2階層と ccstatusline の出力を表示
+@test "Render cwd segment and ccstatusline output" {
+    run run_statusline "$INPUT"
+    [ "$status" -eq 0 ]
+    [ "$output" = "work/project | ctx 10%" ]
+}
+
+# テスト2: TTL 内は外部プロセスなしでキャッシュから表示
+@test "Serve renders within the TTL from the cache without external processes" {
+    run run_statusline "$INPUT"
+    [ "$(call_count)" -eq 1 ]
+
+    # PATH を空にしても（外部コマンドが起動できなくても）同じ出力になる
+    run env PATH="/nonexistent" /bin/bash "$HOOK_SCRIPT" <<< "$INPUT"
+    [ "$status" -eq 0 ]
+    [ "$output" = "work/project | ctx 10%" ]
+    [ "$(call_count)" -eq 1 ]
+}
+
+# テスト3: session_id が異なれば別のキャッシュエントリ
+@test "Cache entries are keyed by session" {
+    run run_statusline "$INPUT"
+    run run_statusline "${INPUT/\"s1\"/\"s2\"}"
+    [ "$(call_count)" -eq 2 ]
+}
+
+# テスト4: TTL 経過後は再計算
+@test "Recompute after the TTL expires" {
+    export STATUSLINE_CACHE_TTL=1
+    run run_statusline "$INPUT"
+    sleep 1
+    run run_statusline "$INPUT"
+    [ "$(call_count)" -eq 2 ]
+}
+
+# テスト5: STATUSLINE_CACHE_TTL=0 でキャッシュ無効
+@test "Disable the cache with STATUSLINE_CACHE_TTL=0" {
+    export STATUSLINE_CACHE_TTL=0
+    run run_statusline "$INPUT"
+    run run_statusline "$INPUT"
+    [ "$(call_count)" -eq 2 ]
+    [ -z "$(ls "$XDG_RUNTIME_DIR")" ]
+}
+
+# テスト6: .git/HEAD が更新されたらキャッシュを無効化
+@test "Invalidate the cache when .git/HEAD changes" {
+    export STATUSLINE_CACHE_TTL=60
+    git -C "$TEST_TEMP_DIR/work/project" init -q
+    run run_statusline "$INPUT"
+    run run_statusline "$INPUT"
+    [ "$(call_count)" -eq 1 ]
+
+    # mtime を確実に進めてからブランチを切り替え
+    sleep 1
+    git -C "$TEST_TEMP_DIR/work/project" symbolic-ref HEAD refs/heads/feature
+    run run_statusline "$INPUT"
+    [ "$(call_count)" -eq 2 ]
+}
+
+# テスト7: ccstatusline の失敗はキャッシュせず、毎回エラーを記録
+@test "Log ccstatusline errors on every failing render" {
+    stub_ccstatusline 3
+    run run_statusline "$INPUT"
+    [ "$status" -eq 0 ]
+    [[ "$output" =~ "Model: Opus" ]]
+    [[ "$output" =~ "[ccstatusline unavailable]" ]]
+
+    run run_statusline "$INPUT"
+    [ "$(call_count)" -eq 2 ]
+    [ "$(grep -c 'ccstatusline error (exit: 3)' "$HOME/.claude/logs/statusline.log")" -eq 2 ]
+}
+
+# テスト8: キャッシュディレクトリは本人のみアクセス可能
+@test "Cache directory is private to the user" {
+    run run_statusline "$INPUT"
+    local cache_dir="$XDG_RUNTIME_DIR/claude-statusline-$(id -u)"
+    [ -d "$cache_dir" ]
+    [ "$(stat -c '%a' "$cache_dir" 2>/dev/null || stat -f '%Lp' "$cache_dir")" = "700" ]
+}
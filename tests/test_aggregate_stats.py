@@ -0,0 +1,182 @@
+"""StatsAggregator tests for daily-knowledge-sync."""
+
+import json
+
+from aggregate_stats import StatsAggregator, format_rollup
+from extract_knowledge import KnowledgeExtractor
+from merge_candidates import CandidateMerger
+
+CREATION_STATS = {
+    "total": 4,
+    "accepted": 3,
+    "rejected": 1,
+    "duplicates": 1,
+    "created": 2,
+    "by_category": {"errors": 1, "operations": 1},
+    "by_project": {"/work/api": 2},
+    "files": [
+        {"path": "errors/2026-01-31_a.md", "category": "errors", "project": "/work/api", "title": "A"},
+        {"path": "operations/2026-01-31_b.md", "category": "operations", "project": "/work/api", "title": "B"},
+    ],
+}
+
+
+def test_rollups_sum_days_in_period(tmp_path):
+    aggregator = StatsAggregator(str(tmp_path))
+    aggregator.record_extraction(
+        "2026-01-31",
+        {"jsonl_files": 3, "candidates": 5, "excluded": {"Greeting": 2}, "by_project": {"/work/api": 5}},
+    )
+    aggregator.record_creation("2026-01-31", CREATION_STATS, "evaluation.json")
+    aggregator.record_extraction(
+        "2026-02-01",
+        {"jsonl_files": 1, "candidates": 2, "excluded": {"Greeting": 1, "System role": 4}, "by_project": {}},
+    )
+
+    # Re-running extraction replaces the day instead of double counting
+    aggregator.record_extraction(
+        "2026-02-01",
+        {"jsonl_files": 1, "candidates": 2, "excluded": {"Greeting": 1, "System role": 4}, "by_project": {}},
+    )
+
+    # 2026-01-31 is a Saturday: its ISO week ends on 2026-02-01
+    weekly = StatsAggregator(str(tmp_path)).weekly("2026-01-31")
+    assert (weekly["start"], weekly["end"], weekly["days_with_data"]) == ("2026-01-26", "2026-02-01", 2)
+    assert weekly["extraction"]["candidates"] == 7
+    assert weekly["extraction"]["excluded"] == {"Greeting": 3, "System role": 4}
+    assert weekly["creation"]["by_category"] == {"errors": 1, "operations": 1}
+    assert weekly["ratios"] == {"accept": 0.75, "reject": 0.25, "duplicate": 0.333}
+
+    monthly = aggregator.monthly("2026-01-15")
+    assert (monthly["start"], monthly["end"]) == ("2026-01-01", "2026-01-31")
+    assert monthly["extraction"]["candidates"] == 5
+    assert [entry["path"] for entry in monthly["files"]] == ["errors/2026-01-31_a.md", "operations/2026-01-31_b.md"]
+
+    empty = aggregator.daily("2026-03-01")
+    assert empty["days_with_data"] == 0
+    assert empty["ratios"]["accept"] is None
+    assert "| 採用率 / 拒否率 / 重複率 | - / - / - |" in format_rollup(empty)
+
+
+def test_creation_reruns_replace_and_other_runs_add(tmp_path):
+    aggregator = StatsAggregator(str(tmp_path))
+    aggregator.record_creation("2026-01-31", CREATION_STATS, "evaluation.json")
+
+    # Re-running the same evaluation file finds its own files as duplicates
+    rerun = {
+        **CREATION_STATS,
+        "duplicates": 3,
+        "created": 0,
+        "by_category": {},
+        "by_project": {},
+        "files": [],
+    }
+    aggregator.record_creation("2026-01-31", rerun, "evaluation.json")
+    aggregator.record_creation("2026-01-31", CREATION_STATS, "evaluation.json")
+
+    daily = aggregator.daily("2026-01-31")
+    assert {key: daily["creation"][key] for key in ("total", "accepted", "duplicates", "created")} == {
+        "total": 4,
+        "accepted": 3,
+        "duplicates": 1,
+        "created": 2,
+    }
+    assert daily["creation"]["by_project"] == {"/work/api": 2}
+    assert len(daily["files"]) == 2
+
+    # Another evaluation file for the same date adds its counts and files
+    other = {
+        "total": 1,
+        "accepted": 1,
+        "rejected": 0,
+        "duplicates": 0,
+        "created": 1,
+        "by_category": {"errors": 1},
+        "by_project": {"/work/web": 1},
+        "files": [{"path": "errors/2026-01-31_c.md", "category": "errors", "project": "/work/web", "title": "C"}],
+    }
+    aggregator.record_creation("2026-01-31", other, "evaluation-2.json")
+
+    daily = StatsAggregator(str(tmp_path)).daily("2026-01-31")
+    assert (daily["creation"]["total"], daily["creation"]["created"]) == (5, 3)
+    assert daily["creation"]["by_category"] == {"errors": 2, "operations": 1}
+    assert daily["creation"]["by_project"] == {"/work/api": 2, "/work/web": 1}
+
+    store = json.loads((tmp_path / "aggregates.json").read_text())
+    assert store["version"] == 1
+    assert list(store["days"]) == ["2026-01-31"]
+
+
+def test_creation_record_from_before_run_ids_is_kept(tmp_path):
+    (tmp_path / "aggregates.json").write_text(
+        json.dumps(
+            {
+                "version": 1,
+                "days": {
+                    "2026-01-31": {
+                        "creation": {
+                            "total": 4,
+                            "accepted": 3,
+                            "rejected": 1,
+                            "duplicates": 1,
+                            "created": 2,
+                            "by_category": {"errors": 1, "operations": 1},
+                            "by_project": {"/work/api": 2},
+                        },
+                        "files": CREATION_STATS["files"],
+                    }
+                },
+            }
+        )
+    )
+    aggregator = StatsAggregator(str(tmp_path))
+    aggregator.record_creation("2026-01-31", CREATION_STATS, "evaluation.json")
+
+    # Same files: only the evaluation counts of the new run are added
+    creation = aggregator.daily("2026-01-31")["creation"]
+    assert (creation["total"], creation["created"]) == (8, 2)
+
+
+def test_backfill_only_fills_days_without_records(tmp_path):
+    aggregator = StatsAggregator(str(tmp_path))
+    aggregator.record_creation("2026-01-31", CREATION_STATS, "evaluation.json")
+    added = aggregator.backfill(
+        [
+            {"path": "errors/2026-01-31_a.md", "category": "errors", "date": "2026-01-31", "project": "", "title": "A"},
+            {"path": "design/2026-01-20_c.md", "category": "design", "date": "2026-01-20", "project": "/work/web", "title": "C"},
+            {"path": "design/notes.md", "category": "design", "date": "", "project": "", "title": "Notes"},
+        ]
+    )
+
+    assert added == 1
+    assert aggregator.daily("2026-01-31")["creation"]["created"] == 2
+    january = aggregator.monthly("2026-01-01")
+    assert january["creation"]["by_category"] == {"errors": 1, "operations": 1, "design": 1}
+    assert january["creation"]["by_project"] == {"/work/api": 2, "/work/web": 1}
+
+
+def test_extractor_counts_exclusion_reasons(tmp_path):
+    project_dir = tmp_path / "projects" / "-work-api"
+    project_dir.mkdir(parents=True)
+    long_text = "エラーの原因は依存関係のバージョン不一致でした。解決策として lock ファイルを更新します。" * 5
+    lines = [
+        {"timestamp": "2026-01-31T10:00:00Z", "cwd": "/work/api", "message": {"role": "assistant", "content": long_text}},
+        {"timestamp": "2026-01-31T10:01:00Z", "cwd": "/work/api", "message": {"role": "user", "content": "OK"}},
+        {"timestamp": "2026-01-31T10:02:00Z", "cwd": "/work/api", "message": {"role": "user", "content": "了解"}},
+    ]
+    (project_dir / "session.jsonl").write_text("\n".join(json.dumps(line, ensure_ascii=False) for line in lines))
+
+    extractor = KnowledgeExtractor(str(tmp_path / "projects"))
+    candidates = extractor.extract_for_date("2026-01-31")
+    stats = extractor.extraction_stats(candidates)
+
+    assert stats["jsonl_files"] == 1
+    assert stats["candidates"] == len(candidates) == 1
+    assert stats["excluded"] == {"Too short (min 200 chars)": 2}
+    assert stats["by_project"] == {"/work/api": 1}
+
+    # Shard partials carry the stats so the merged run can record them
+    extractor.shard = (0, 1)
+    partial = extractor.build_partial(candidates, "2026-01-31")
+    merged, _ = CandidateMerger().merge([partial])
+    assert CandidateMerger().extraction_stats([partial], merged) == stats
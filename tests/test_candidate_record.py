@@ -0,0 +1,52 @@
+"""CandidateRecord tests for daily-knowledge-sync."""
+
+import json
+
+from candidate_record import CandidateRecord, ms_to_timestamp, timestamp_to_ms, to_json
+
+CANDIDATE = {
+    "timestamp": "2026-01-30T10:00:00.123Z",
+    "role": "assistant",
+    "text": "エラーの原因を解決しました",
+    "tool_uses": [{"name": "Bash", "command": "pytest -q"}],
+    "errors": [],
+    "source_file": "/home/user/.claude/projects/-work-repo/session.jsonl",
+    "line_number": 12,
+    "project_path": "/work/repo",
+    "score": 4.5,
+}
+
+
+def test_json_round_trip_matches_dict_output():
+    record = CandidateRecord.from_dict(CANDIDATE)
+    assert record.timestamp_ms == timestamp_to_ms(CANDIDATE["timestamp"])
+    assert json.dumps([record], indent=2, ensure_ascii=False, default=to_json) == json.dumps(
+        [CANDIDATE], indent=2, ensure_ascii=False
+    )
+
+    # Extra keys (e.g. merge fingerprints) survive after the candidate keys
+    merged = {**CANDIDATE, "fingerprint": "sha256:ab"}
+    assert CandidateRecord.from_dict(merged).to_dict() == merged
+    assert list(CandidateRecord.from_dict(merged)) == [*CANDIDATE, "fingerprint"]
+
+
+def test_mapping_access_and_shared_strings():
+    first = CandidateRecord.from_dict(CANDIDATE)
+    second = CandidateRecord.from_dict({**CANDIDATE, "source_file": "".join(CANDIDATE["source_file"])})
+
+    assert first["text"] == first.get("text") == CANDIDATE["text"]
+    assert first.get("missing", "default") == "default"
+    assert {**first, "fingerprint": "x"}["project_path"] == "/work/repo"
+    assert first == CANDIDATE
+    assert not hasattr(first, "__dict__")
+    assert first.source_file is second.source_file
+
+
+def test_non_canonical_timestamps_are_kept_verbatim():
+    for timestamp in ("2026-01-30T10:00:00Z", "2026-01-30T10:00:00.123456+09:00", None):
+        record = CandidateRecord.from_dict({**CANDIDATE, "timestamp": timestamp})
+        assert record.timestamp_ms is None
+        assert record["timestamp"] == timestamp
+
+    for timestamp in ("1970-01-01T00:00:00.000Z", "2026-12-31T23:59:59.999Z", "1969-12-31T23:59:59.001Z"):
+        assert ms_to_timestamp(timestamp_to_ms(timestamp)) == timestamp
@@ -0,0 +1,48 @@
+"""KnowledgeCategorizer tests for daily-knowledge-sync."""
+
+import os
+
+import categorize_knowledge
+from categorize_knowledge import KnowledgeCategorizer, _load_category_keywords
+
+CONFIG = """categories:
+  errors:
+    keywords: ["error", "fix"]
+  ops:
+    keywords: ["docker"]
+default_category: "ops"
+"""
+
+
+def test_compiled_cache_is_reused_until_config_changes(tmp_path, monkeypatch):
+    config = tmp_path / "categories.yaml"
+    cache = tmp_path / "cache" / "categories.json"
+    config.write_text(CONFIG)
+
+    assert _load_category_keywords(config, cache) == ({"errors": ["error", "fix"], "ops": ["docker"]}, "ops")
+    assert cache.exists()
+
+    # A fresh cache must be served without parsing YAML
+    def fail(_):
+        raise AssertionError("YAML parsed despite fresh cache")
+
+    monkeypatch.setattr(categorize_knowledge, "_compile_category_config", fail)
+    assert _load_category_keywords(config, cache)[1] == "ops"
+    monkeypatch.undo()
+
+    # Changing the config invalidates the cache
+    config.write_text(CONFIG.replace('default_category: "ops"', 'default_category: "errors"'))
+    stat = config.stat()
+    os.utime(config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert _load_category_keywords(config, cache)[1] == "errors"
+
+
+def test_category_dirs_are_provisioned_lazily(tmp_path):
+    categorizer = KnowledgeCategorizer(str(tmp_path / "repo"))
+    assert not (tmp_path / "repo").exists()
+
+    path = categorizer.create_knowledge_file("errors", "2026-01-30_x.md", "X", "body")
+
+    assert path.exists()
+    assert (tmp_path / "repo" / "errors" / "README.md").exists()
+    assert sorted(p.name for p in (tmp_path / "repo").iterdir()) == ["errors"]
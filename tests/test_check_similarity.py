@@ -0,0 +1,52 @@
+"""SimilarityChecker and document analysis tests for daily-knowledge-sync."""
+
+import pytest
+
+from check_similarity import SimilarityChecker
+from document_analysis import DocumentCache
+
+TEXTS = [
+    "Fix the import error by moving the module import into the function body.",
+    "The import error was fixed by moving the import into the function.",
+    "Docker deployment steps: build the image, push it and restart the service.",
+    "エラーの原因は設定ファイルの読み込み順序でした。 import を遅延させて解決。",
+    "the and of",  # stop words only
+    "",
+]
+
+
+def test_tfidf_matches_scikit_learn():
+    sklearn_text = pytest.importorskip("sklearn.feature_extraction.text")
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    checker = SimilarityChecker(analysis_cache=DocumentCache())
+    for text1 in TEXTS[:5]:
+        for text2 in TEXTS[:5]:
+            try:
+                matrix = sklearn_text.TfidfVectorizer(lowercase=True, stop_words="english").fit_transform(
+                    [text1, text2]
+                )
+                expected = float(cosine_similarity(matrix[0:1], matrix[1:2])[0][0])
+            except ValueError:
+                expected = checker._simple_similarity(text1, text2)
+            assert checker.calculate_similarity(text1, text2) == pytest.approx(expected, abs=1e-9)
+
+
+def test_each_text_is_analyzed_once():
+    cache = DocumentCache()
+    checker = SimilarityChecker(analysis_cache=cache)
+    existing = TEXTS[:4]
+
+    for _ in range(3):
+        checker.find_duplicates(TEXTS[0], existing)
+
+    assert cache.misses == len(existing)
+
+
+def test_cache_is_bounded_by_bytes():
+    cache = DocumentCache(max_bytes=10_000)
+    for i in range(100):
+        cache.get(f"document {i} " * 50).terms
+
+    assert cache.size_bytes <= 10_000 or len(cache) == 1
+    assert len(cache) < 100
@@ -0,0 +1,173 @@
+"""KnowledgeExtractor tests for daily-knowledge-sync."""
+
+import bz2
+import gzip
+import json
+import lzma
+
+import pytest
+
+import extract_knowledge
+from candidate_record import to_json
+from compact_candidates import CandidateCompactor
+from extract_knowledge import CandidateRanker, KnowledgeExtractor
+from log_files import LogTimeIndex, zstandard
+
+DATE = "2026-01-30"
+
+
+def _entry(text, minute=0, cwd="/work/repo", content=None):
+    return {
+        "timestamp": f"{DATE}T10:{minute:02d}:00Z",
+        "cwd": cwd,
+        "message": {"role": "assistant", "content": content or [{"type": "text", "text": text}]},
+    }
+
+
+def _write_log(path, entries):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def _text(body, repeat=30):
+    return "エラーの原因を解決する手順を実装しました。" + (body + " ") * repeat
+
+
+def test_candidates_carry_score_and_repeated_text_scores_lower(tmp_path):
+    _write_log(
+        tmp_path / "-work-repo" / "session.jsonl",
+        [_entry(_text("alpha beta gamma"), 0), _entry(_text("alpha beta gamma"), 1)],
+    )
+    candidates = KnowledgeExtractor(str(tmp_path)).extract_for_date(DATE)
+
+    assert len(candidates) == 2
+    # Same words again in the same session: no novelty bonus
+    assert candidates[0]["score"] > candidates[1]["score"]
+
+
+def test_ranker_keeps_top_n_per_project():
+    ranker = CandidateRanker(top_n=2)
+    for project in ("/a", "/b"):
+        for score in (1.0, 5.0, 3.0, 4.0):
+            ranker.add({"timestamp": f"{DATE}T00:00:00Z", "project_path": project, "score": score})
+
+    ranked = ranker.ranked()
+    assert [c["score"] for c in ranked] == [5.0, 5.0, 4.0, 4.0]
+    assert {c["project_path"] for c in ranked} == {"/a", "/b"}
+
+
+def test_extract_for_date_top_n_returns_ranked_subset(tmp_path):
+    entries = [_entry(_text(f"topic{i} " * (i + 1)), i) for i in range(6)]
+    _write_log(tmp_path / "-work-repo" / "session.jsonl", entries)
+    extractor = KnowledgeExtractor(str(tmp_path))
+
+    everything = extractor.extract_for_date(DATE)
+    top = extractor.extract_for_date(DATE, top_n=3)
+
+    assert len(top) == 3
+    assert [c["score"] for c in top] == sorted((c["score"] for c in everything), reverse=True)[:3]
+
+
+def test_tool_inputs_are_summarized_and_errors_excerpted(tmp_path):
+    patch = "+" + "x" * 200_000
+    traceback_text = _text("context") + '\nTraceback (most recent call last)\n  File "app.py", line 3\n'
+    content = [
+        {"type": "text", "text": traceback_text},
+        {"type": "tool_use", "name": "Write", "input": {"file_path": "/work/repo/app.py", "content": patch}},
+        {"type": "tool_use", "name": "Bash", "input": {"command": "pytest -q"}},
+    ]
+    _write_log(tmp_path / "-work-repo" / "session.jsonl", [_entry("", content=content)])
+
+    [candidate] = KnowledgeExtractor(str(tmp_path)).extract_for_date(DATE)
+
+    write, bash = candidate["tool_uses"]
+    assert "input" not in write
+    assert write["paths"] == ["/work/repo/app.py"]
+    assert write["input_size"] > 200_000
+    assert bash["command"] == "pytest -q"
+
+    assert candidate["errors"]
+    for error in candidate["errors"]:
+        start = error["offset"]
+        assert candidate["text"][start:start + error["length"]] in error["excerpt"]
+        assert len(error["excerpt"]) < len(candidate["text"])
+    assert len(json.dumps(candidate, default=to_json)) < 10_000
+
+
+def test_error_past_text_cap_has_no_offset(tmp_path):
+    traceback_text = _text("context") + '\nTraceback (most recent call last)\n  File "app.py", line 3\n'
+    _write_log(tmp_path / "-work-repo" / "session.jsonl", [_entry(traceback_text)])
+
+    [candidate] = KnowledgeExtractor(str(tmp_path), compactor=CandidateCompactor({"text_chars": 200})).extract_for_date(DATE)
+
+    assert "Traceback" not in candidate["text"]
+    [error] = [e for e in candidate["errors"] if "Traceback" in e["pattern"]]
+    assert "offset" not in error and "length" not in error
+    assert "Traceback (most recent call last)" in error["excerpt"]
+
+
+def _log_bytes(entries):
+    return "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries).encode()
+
+
+def test_compressed_and_rotated_logs_are_streamed(tmp_path):
+    project = tmp_path / "-work-repo"
+    _write_log(project / "current.jsonl", [_entry(_text("plain", repeat=60), 0)])
+    _write_log(project / "current.jsonl.1", [_entry(_text("rotated", repeat=60), 1)])
+    (project / "old.jsonl.gz").write_bytes(gzip.compress(_log_bytes([_entry(_text("gzip", repeat=60), 2)])))
+    (project / "old.jsonl.2.bz2").write_bytes(bz2.compress(_log_bytes([_entry(_text("bzip", repeat=60), 3)])))
+    (project / "old.jsonl.3.xz").write_bytes(lzma.compress(_log_bytes([_entry(_text("lzma", repeat=60), 4)])))
+    # Compressed copy of a log that still exists uncompressed is not read twice
+    (project / "current.jsonl.gz").write_bytes(gzip.compress(_log_bytes([_entry(_text("plain", repeat=60), 0)])))
+    (project / "notes.jsonl.bak").write_text("not a log")
+
+    extractor = KnowledgeExtractor(str(tmp_path))
+    names = sorted(path.name for path in extractor.find_jsonl_files(DATE))
+    assert names == ["current.jsonl", "current.jsonl.1", "old.jsonl.2.bz2", "old.jsonl.3.xz", "old.jsonl.gz"]
+
+    candidates = extractor.extract_for_date(DATE)
+    assert sorted(c["text"].split()[1] for c in candidates) == ["bzip", "gzip", "lzma", "plain", "rotated"]
+    assert {c["project_path"] for c in candidates} == {"/work/repo"}
+
+
+@pytest.mark.skipif(zstandard is None, reason="zstandard not installed")
+def test_multi_frame_zstd_log(tmp_path):
+    compressor = zstandard.ZstdCompressor()
+    frames = b"".join(
+        compressor.compress(_log_bytes([_entry(_text(f"frame{i}", repeat=60), i)])) for i in range(3)
+    )
+    path = tmp_path / "-work-repo" / "session.jsonl.zst"
+    path.parent.mkdir()
+    path.write_bytes(frames)
+
+    candidates = KnowledgeExtractor(str(tmp_path)).extract_for_date(DATE)
+    assert [c["text"].split()[1] for c in candidates] == ["frame0", "frame1", "frame2"]
+
+
+def test_time_index_skips_logs_outside_target_date(tmp_path, monkeypatch):
+    projects = tmp_path / "projects"
+    log = projects / "-work-repo" / "old.jsonl.gz"
+    log.parent.mkdir(parents=True)
+    log.write_bytes(gzip.compress(_log_bytes([_entry(_text("gzip", repeat=60), 0)])))
+
+    index_file = tmp_path / "cache" / "log_time_index.json"
+    extractor = KnowledgeExtractor(str(projects), time_index=LogTimeIndex(index_file))
+    assert len(extractor.extract_for_date(DATE)) == 1
+    assert json.loads(index_file.read_text())[str(log)]["first"] == f"{DATE}T10:00:00"
+
+    opened = []
+    original = extract_knowledge.open_log
+    monkeypatch.setattr(extract_knowledge, "open_log", lambda path, *args: opened.append(path.name) or original(path, *args))
+
+    # A fresh index (next run) skips the file for other dates without decompressing it
+    extractor = KnowledgeExtractor(str(projects), time_index=LogTimeIndex(index_file))
+    assert extractor.extract_for_date("2026-02-01") == []
+    assert opened == []
+
+    # A changed file is read again
+    entries = [_entry(_text("gzip", repeat=60), 0), _entry(_text("more", repeat=60), 1)]
+    log.write_bytes(gzip.compress(_log_bytes(entries)))
+    assert len(extractor.extract_for_date(DATE)) == 2
+    assert "old.jsonl.gz" in opened
@@ -0,0 +1,65 @@
+"""JSON backend tests for daily-knowledge-sync."""
+
+import json
+import math
+
+import pytest
+
+from json_backend import available_backends, get_backend
+
+LINES = [
+    '{"timestamp": "2026-01-30T10:00:00Z", "cwd": "/work/repo", "uuid": "u1",'
+    ' "message": {"role": "assistant", "id": "m1", "content": [{"type": "text", "text": "エラー"}]}}',
+    '{"timestamp": "2026-01-30T10:01:00Z", "message": {"role": "user", "content": "hello"}}',
+    '{"type": "summary", "summary": "no timestamp"}',
+    '{"timestamp": 12345, "message": "unexpected shape"}',
+    "[1, 2, 3]",
+    '{"timestamp": "2026-01-30T10:02:00Z", "message": {"role": "user"}}',
+    '{"timestamp": "2026-01-30T10:03:00Z", "cwd": null, "message": null}',
+    '{"timestamp": null, "message": {"role": null, "content": null}}',
+]
+
+
+@pytest.mark.parametrize("name", available_backends())
+def test_backends_agree_with_stdlib(name):
+    backend = get_backend(name)
+    reference = get_backend("json")
+    for line in LINES:
+        assert backend.decode_log_entry(line) == reference.decode_log_entry(line)
+        assert backend.loads(line) == json.loads(line)
+
+    assert backend.decode_log_entry(LINES[0]) == {
+        "timestamp": "2026-01-30T10:00:00Z",
+        "cwd": "/work/repo",
+        "message": {"role": "assistant", "content": [{"type": "text", "text": "エラー"}]},
+    }
+
+
+@pytest.mark.parametrize("name", available_backends())
+def test_backends_accept_what_stdlib_accepts(name):
+    backend = get_backend(name)
+    nan = backend.decode_log_entry('{"timestamp": "2026-01-30T10:00:00Z", "message": {"role": "user", "content": NaN}}')
+    assert math.isnan(nan["message"]["content"])
+    assert backend.loads('{"a": Infinity}') == {"a": math.inf}
+
+    surrogate = '{"timestamp": "2026-01-30T10:00:00Z", "message": {"role": "user", "content": "\\ud800 text"}}'
+    assert backend.decode_log_entry(surrogate) == json.loads(surrogate) == {
+        "timestamp": "2026-01-30T10:00:00Z",
+        "message": {"role": "user", "content": "\ud800 text"},
+    }
+    assert backend.loads(surrogate.encode()) == json.loads(surrogate)
+
+
+@pytest.mark.parametrize("name", available_backends())
+@pytest.mark.parametrize("line", ['{"timestamp": "2026-01-30', "", "not json"])
+def test_invalid_json_raises_json_decode_error(name, line):
+    backend = get_backend(name)
+    with pytest.raises(json.JSONDecodeError):
+        backend.decode_log_entry(line)
+    with pytest.raises(json.JSONDecodeError):
+        backend.loads(line)
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        get_backend("simdjson")
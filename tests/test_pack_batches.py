@@ -0,0 +1,48 @@
+"""CandidatePacker tests for daily-knowledge-sync."""
+
+import pytest
+
+from pack_batches import OUTPUT_TOKENS_PER_CANDIDATE, CandidatePacker, candidate_tokens, estimate_tokens
+
+
+def test_estimate_tokens_counts_cjk_per_character():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("abcdefghi") == 3
+    assert estimate_tokens("エラーを解決") == 6
+    assert estimate_tokens("fix エラー") == 1 + 3
+
+
+def test_pack_respects_budget_and_keeps_indices():
+    candidates = [{"text": "x" * size} for size in (4000, 200, 200, 3000, 200, 1600)]
+    budget = 1000
+    batches = CandidatePacker(budget).pack(candidates)
+
+    indices = sorted(item["index"] for batch in batches for item in batch["candidates"])
+    assert indices == list(range(len(candidates)))
+    for batch in batches:
+        for item in batch["candidates"]:
+            assert item["text"] == candidates[item["index"]]["text"]
+        assert batch["tokens"] == sum(candidate_tokens(item) for item in batch["candidates"])
+        if not batch["oversized"]:
+            assert batch["tokens"] <= budget
+
+    # The 4000-char candidate does not fit any budget and gets its own flagged batch
+    [oversized] = [batch for batch in batches if batch["oversized"]]
+    assert [item["index"] for item in oversized["candidates"]] == [0]
+
+    # Small candidates fill the gaps next to large ones instead of opening new batches
+    assert len(batches) == 3
+    assert [batch["batch"] for batch in batches] == [0, 1, 2]
+
+
+def test_many_small_candidates_share_batches():
+    candidates = [{"text": "短い候補"} for _ in range(100)]
+    batches = CandidatePacker(budget_tokens=(candidate_tokens({"index": 99, **candidates[0]}) * 50)).pack(candidates)
+    assert len(batches) == 2
+    assert all(OUTPUT_TOKENS_PER_CANDIDATE * 50 < batch["tokens"] for batch in batches)
+
+
+def test_invalid_budget():
+    with pytest.raises(ValueError):
+        CandidatePacker(0)
@@ -0,0 +1,179 @@
+"""KnowledgeSearchIndex tests for daily-knowledge-sync."""
+
+import json
+import os
+
+import search_index
+from create_knowledge_files import KnowledgeFileCreator
+from search_index import KnowledgeSearchIndex, parse_knowledge_file
+
+CREATOR_FILE = """# Docker ビルドのキャッシュが効かない
+
+**プロジェクト**: `/work/api`
+
+**日時**: 2026-01-31T10:00:00Z
+
+---
+
+COPY の順序を変えて依存関係のインストールをキャッシュさせる。
+"""
+
+FRONTMATTER_FILE = """---
+title: Fix ImportError in pytest
+category: errors
+tags: [python, pytest]
+date: 2026-02-01
+---
+
+# Fix ImportError in pytest
+
+Add the scripts directory to sys.path in conftest.py.
+"""
+
+
+def _write(repo, relative, content):
+    path = repo / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+def test_parse_both_file_formats():
+    creator = parse_knowledge_file(CREATOR_FILE, "operations/2026-01-31_docker-cache.md")
+    assert creator["title"] == "Docker ビルドのキャッシュが効かない"
+    assert creator["project"] == "/work/api"
+    assert creator["date"] == "2026-01-31"
+    assert creator["category"] == "operations"
+    assert creator["body"].startswith("COPY の順序")
+
+    frontmatter = parse_knowledge_file(FRONTMATTER_FILE, "errors/2026-02-01_fix-importerror.md")
+    assert frontmatter["title"] == "Fix ImportError in pytest"
+    assert frontmatter["tags"] == "python pytest"
+    assert frontmatter["date"] == "2026-02-01"
+    assert frontmatter["body"].startswith("# Fix ImportError")
+
+
+def test_search_ranks_japanese_and_short_queries(tmp_path):
+    _write(tmp_path, "operations/2026-01-31_docker-cache.md", CREATOR_FILE)
+    _write(tmp_path, "errors/2026-02-01_fix-importerror.md", FRONTMATTER_FILE)
+    _write(tmp_path, "errors/README.md", "# Errors\n\nキャッシュ\n")
+
+    index = KnowledgeSearchIndex(str(tmp_path))
+    assert index.update()["added"] == 2
+
+    hits = index.search("キャッシュ")
+    assert [hit["path"] for hit in hits] == ["operations/2026-01-31_docker-cache.md"]
+    assert "キャッシュ" in hits[0]["snippet"]
+
+    assert [hit["path"] for hit in index.search("pytest", category="errors")] == [
+        "errors/2026-02-01_fix-importerror.md"
+    ]
+    assert index.search("pytest", category="operations") == []
+
+    # Terms shorter than a trigram fall back to a substring scan
+    assert [hit["path"] for hit in index.search("依存")] == ["operations/2026-01-31_docker-cache.md"]
+
+    # The index directory ignores itself in the knowledge repository
+    assert (tmp_path / ".index" / ".gitignore").read_text() == "*\n"
+
+
+def test_update_reindexes_only_changed_files(tmp_path, monkeypatch):
+    first = _write(tmp_path, "errors/a.md", FRONTMATTER_FILE)
+    second = _write(tmp_path, "operations/b.md", CREATOR_FILE)
+    index = KnowledgeSearchIndex(str(tmp_path))
+    index.update()
+
+    # Unchanged stat: nothing is parsed
+    parsed = []
+    original = search_index.parse_knowledge_file
+    monkeypatch.setattr(search_index, "parse_knowledge_file", lambda *args: parsed.append(args[1]) or original(*args))
+    assert index.update()["unchanged"] == 2
+    assert parsed == []
+
+    # Touched but identical content: re-hashed, not re-parsed
+    stat = first.stat()
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert index.update()["unchanged"] == 2
+    assert parsed == []
+
+    second.write_text(CREATOR_FILE.replace("キャッシュが効かない", "レイヤーが肥大化する"), encoding="utf-8")
+    first.unlink()
+    stats = index.update()
+    assert (stats["updated"], stats["removed"]) == (1, 1)
+    assert parsed == ["operations/b.md"]
+    assert index.search("肥大化")[0]["path"] == "operations/b.md"
+    assert index.search("ImportError") == []
+
+    # A fresh connection sees the persisted index
+    index.close()
+    assert KnowledgeSearchIndex(str(tmp_path)).search("肥大化")[0]["path"] == "operations/b.md"
+
+
+def test_content_is_stored_once(tmp_path):
+    first = _write(tmp_path, "errors/a.md", FRONTMATTER_FILE)
+    _write(tmp_path, "operations/b.md", CREATOR_FILE)
+    index = KnowledgeSearchIndex(str(tmp_path))
+    index.update()
+
+    def check_integrity():
+        # rank = 1 also compares the FTS index with the content it reads from files
+        index.conn.execute("INSERT INTO docs (docs, rank) VALUES ('integrity-check', 1)")
+
+    # External-content FTS: no shadow copy of the documents
+    tables = {row["name"] for row in index.conn.execute("SELECT name FROM sqlite_master")}
+    assert "docs_content" not in tables
+    check_integrity()
+    assert "conftest.py" in index.search("conftest")[0]["snippet"]
+    assert dict(index.conn.execute("SELECT body FROM doc_fields WHERE title = 'Fix ImportError in pytest'").fetchone()) == {
+        "body": parse_knowledge_file(FRONTMATTER_FILE, "errors/a.md")["body"]
+    }
+
+    first.write_text(FRONTMATTER_FILE.replace("conftest.py", "pytest.ini"), encoding="utf-8")
+    (tmp_path / "operations" / "b.md").unlink()
+    index.update()
+    check_integrity()
+    assert index.search("conftest") == []
+    assert [hit["path"] for hit in index.search("pytest.ini")] == ["errors/a.md"]
+
+    index.rebuild()
+    check_integrity()
+    assert [hit["path"] for hit in index.search("pytest.ini")] == ["errors/a.md"]
+
+    # An index written by an older schema is rebuilt
+    index.conn.execute("UPDATE meta SET value = '1' WHERE key = 'schema_version'")
+    index.conn.commit()
+    index.close()
+    reopened = KnowledgeSearchIndex(str(tmp_path))
+    assert reopened.search("pytest.ini") == []
+    assert reopened.update()["added"] == 1
+
+
+def test_creator_dedupes_against_index_within_one_run(tmp_path):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    text = (
+        "Use docker buildx cache mounts to speed up pip install layers in CI builds. "
+        "Mount /root/.cache/pip as a cache volume so wheels persist between docker builds "
+        "and pip install only downloads changed requirements"
+    )
+    candidates = [
+        {"text": text, "timestamp": "2026-01-31T10:00:00Z", "project_path": "/work/api"},
+        {"text": text + " quickly", "timestamp": "2026-01-31T11:00:00Z", "project_path": "/work/api"},
+    ]
+    evaluations = [
+        {"index": 0, "decision": "accept", "category": "operations", "title": "Docker cache mounts", "filename": "docker-cache-mounts"},
+        {"index": 1, "decision": "accept", "category": "operations", "title": "Docker cache mounts again", "filename": "docker-cache-mounts-2"},
+    ]
+    candidates_file = tmp_path / "candidates.json"
+    evaluations_file = tmp_path / "evaluations.json"
+    candidates_file.write_text(json.dumps(candidates))
+    evaluations_file.write_text(json.dumps(evaluations))
+
+    creator = KnowledgeFileCreator(str(repo))
+    creator._git_commit = lambda files, date: None
+    stats = creator.create_files(candidates_file, evaluations_file, "2026-01-31")
+
+    assert (stats["created"], stats["duplicates"]) == (1, 1)
+    hits = creator.search_index.search("buildx")
+    assert [hit["path"] for hit in hits] == ["operations/2026-01-31_docker-cache-mounts.md"]
+    assert hits[0]["project"] == "/work/api"
@@ -0,0 +1,150 @@
+"""Sharded extraction and merge tests for daily-knowledge-sync."""
+
+import json
+import random
+
+import pytest
+
+from extract_knowledge import KnowledgeExtractor, parse_shard, shard_for_project
+from merge_candidates import CandidateMerger, lsh_keys
+
+DATE = "2026-01-30"
+SHARD_COUNT = 3
+
+
+def _message(topic: str) -> str:
+    return (
+        f"{topic} のエラーを解決した手順をまとめます。原因は設定ファイルの読み込み順序で、"
+        f"fix として import を遅延させる実装に変更しました。"
+        + f" {topic} details." * 20
+    )
+
+
+def _write_log(project_dir, name, texts):
+    project_dir.mkdir(parents=True, exist_ok=True)
+    with open(project_dir / f"{name}.jsonl", "w") as f:
+        for i, text in enumerate(texts):
+            entry = {
+                "timestamp": f"{DATE}T10:{i:02d}:00Z",
+                "cwd": f"/work/{project_dir.name}",
+                "message": {"role": "assistant", "content": [{"type": "text", "text": text}]},
+            }
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+@pytest.fixture
+def projects_dir(tmp_path):
+    root = tmp_path / "projects"
+    for p in range(8):
+        _write_log(root / f"-work-project{p}", "session", [_message(f"project{p}-topic{t}") for t in range(2)])
+    return root
+
+
+def _run_shards(projects_dir, tmp_path):
+    partial_files = []
+    for index in range(SHARD_COUNT):
+        extractor = KnowledgeExtractor(str(projects_dir), shard=(index, SHARD_COUNT))
+        partial = extractor.build_partial(extractor.extract_for_date(DATE), DATE)
+        partial_file = tmp_path / f"shard-{index}.json"
+        partial_file.write_text(json.dumps(partial, ensure_ascii=False))
+        partial_files.append(partial_file)
+    return partial_files
+
+
+def test_parse_shard_rejects_out_of_range():
+    assert parse_shard("2/3") == (2, 3)
+    with pytest.raises(ValueError):
+        parse_shard("3/3")
+    with pytest.raises(ValueError):
+        parse_shard("1-3")
+
+
+def test_shards_partition_projects(projects_dir):
+    seen = []
+    for index in range(SHARD_COUNT):
+        extractor = KnowledgeExtractor(str(projects_dir), shard=(index, SHARD_COUNT))
+        files = extractor.find_jsonl_files(DATE)
+        assert all(shard_for_project(f.parent.name, SHARD_COUNT) == index for f in files)
+        seen.extend(files)
+
+    assert sorted(seen) == sorted(KnowledgeExtractor(str(projects_dir)).find_jsonl_files(DATE))
+
+
+def test_merge_matches_single_machine_extraction(projects_dir, tmp_path):
+    merger = CandidateMerger()
+    partials = [merger.load_partial(f) for f in _run_shards(projects_dir, tmp_path)]
+    merged, stats = merger.merge(partials)
+
+    expected = KnowledgeExtractor(str(projects_dir)).extract_for_date(DATE)
+    assert stats["missing_shards"] == []
+    assert sorted(c["text"] for c in merged) == sorted(c["text"] for c in expected)
+    assert all(c["fingerprint"].startswith("sha256:") for c in merged)
+
+
+def test_merge_dedupes_across_shard_directories(tmp_path):
+    # Each "machine" holds its own projects directory; two of them logged the same message
+    shared = _message("shared")
+    for index in range(SHARD_COUNT):
+        root = tmp_path / f"machine{index}"
+        project = next(
+            f"-work-repo{n}" for n in range(100) if shard_for_project(f"-work-repo{n}", SHARD_COUNT) == index
+        )
+        texts = [_message(f"machine{index}")]
+        if index < 2:
+            texts.append(shared if index == 0 else shared.upper())
+        _write_log(root / project, "session", texts)
+
+    merger = CandidateMerger()
+    partials = []
+    for index in range(SHARD_COUNT):
+        extractor = KnowledgeExtractor(str(tmp_path / f"machine{index}"), shard=(index, SHARD_COUNT))
+        partials.append(extractor.build_partial(extractor.extract_for_date(DATE), DATE))
+
+    merged, stats = merger.merge(partials)
+    assert stats["input"] == 5
+    assert stats["exact_duplicates"] == 1
+    assert len(merged) == 4
+
+
+def _partial(index, texts):
+    return {
+        "shard": {"index": index, "count": SHARD_COUNT},
+        "date": DATE,
+        "candidates": [
+            {"timestamp": f"{DATE}T10:{i:02d}:00Z", "text": text, "source_file": f"s{index}", "line_number": i}
+            for i, text in enumerate(texts)
+        ],
+    }
+
+
+def test_merge_removes_near_duplicate_from_other_shard():
+    shared = _message("shared")
+    # Not an exact duplicate after normalization: a word changed and a sentence added
+    near = shared.replace("details.", "details!", 1) + " Restarted the worker afterwards."
+    assert set(lsh_keys(shared)) & set(lsh_keys(near))
+
+    merger = CandidateMerger()
+    merged, stats = merger.merge([_partial(0, [shared]), _partial(1, [near, _message("other")])])
+    assert stats["exact_duplicates"] == 0
+    assert stats["near_duplicates"] == 1
+    assert sorted(c["text"] for c in merged) == sorted([shared, _message("other")])
+
+
+def test_near_duplicate_check_compares_within_buckets_only():
+    rng = random.Random(0)
+    vocabulary = [f"word{i}" for i in range(5000)]
+    texts = [" ".join(rng.choice(vocabulary) for _ in range(60)) for _ in range(300)]
+
+    merger = CandidateMerger()
+    merged, stats = merger.merge([_partial(i % SHARD_COUNT, texts[i::SHARD_COUNT]) for i in range(SHARD_COUNT)])
+    assert len(merged) == 300
+    # All-pairs comparison across shards would be 30000
+    assert stats["near_comparisons"] < 300
+
+
+def test_merge_rejects_mismatched_shard_counts(projects_dir, tmp_path):
+    merger = CandidateMerger()
+    partial = merger.load_partial(_run_shards(projects_dir, tmp_path)[0])
+    other = {**partial, "shard": {"index": 0, "count": 2}}
+    with pytest.raises(ValueError):
+        merger.merge([partial, other])
@@ -0,0 +1,213 @@
+"""Similarity service tests for daily-knowledge-sync."""
+
+import os
+import threading
+
+import pytest
+
+import similarity_service
+from check_similarity import SimilarityChecker
+from create_knowledge_files import KnowledgeFileCreator
+from document_analysis import DocumentCache
+from similarity_service import ServiceError, SimilarityService, connect
+
+IMPORT_FIX = "Fix the import error by moving the module import into the function body."
+IMPORT_FIX_AGAIN = "The import error was fixed by moving the import into the function."
+DOCKER = "Docker deployment steps: build the image, push it and restart the service."
+
+
+def _write(repo, relative, content):
+    path = repo / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return path
+
+
+@pytest.fixture
+def running(tmp_path):
+    """Serve a repository in a background thread; yields (repo, socket path, service)."""
+    repo = tmp_path / "kb"
+    _write(repo, "errors/README.md", f"# Errors\n\n{IMPORT_FIX}\n")
+    _write(repo, "ops/2026-01-31_docker.md", f"# Docker\n\n{DOCKER}\n")
+    socket_path = tmp_path / "s.sock"
+
+    service = SimilarityService(str(repo), poll_interval=0)
+    service.load()
+    ready = threading.Event()
+    thread = threading.Thread(
+        target=similarity_service.serve, args=(service, socket_path), kwargs={"ready": ready}, daemon=True
+    )
+    thread.start()
+    assert ready.wait(5)
+
+    yield repo, socket_path, service
+
+    client = connect(socket_path=socket_path)
+    if client:
+        client.request("shutdown")
+        client.close()
+    thread.join(5)
+    assert not socket_path.exists()
+
+
+def test_results_match_in_process_checker(tmp_path, running):
+    repo, socket_path, _ = running
+    client = connect(str(repo), socket_path)
+    checker = SimilarityChecker(analysis_cache=DocumentCache())
+
+    texts = [IMPORT_FIX_AGAIN, DOCKER]
+    assert client.find_duplicates(IMPORT_FIX, texts) == pytest.approx(checker.find_duplicates(IMPORT_FIX, texts))
+    assert client.find_duplicates(IMPORT_FIX, texts, threshold=0.0)[1][0] == 1
+
+    knowledge = _write(tmp_path, "notes.md", f"# Import\n\n{IMPORT_FIX}\n\n# Docker\n\n{DOCKER}\n")
+    assert client.check_knowledge_file(IMPORT_FIX_AGAIN, knowledge) == [
+        pytest.approx(dup) for dup in checker.check_knowledge_file(IMPORT_FIX_AGAIN, knowledge)
+    ]
+    client.close()
+
+
+def test_is_duplicate_tracks_repository_changes(running):
+    repo, socket_path, service = running
+    client = connect(str(repo), socket_path)
+    assert client.ping()["documents"] == 1
+
+    # README.md is not knowledge
+    assert client.is_duplicate(IMPORT_FIX_AGAIN, "errors") is None
+
+    # Added files are seen on the next request
+    _write(repo, "errors/2026-02-01_import.md", f"# Import\n\n{IMPORT_FIX}\n")
+    match = client.is_duplicate(IMPORT_FIX_AGAIN, "errors")
+    assert match["path"] == "errors/2026-02-01_import.md"
+    assert match["similarity"] >= 0.7
+
+    # In-place edits are picked up by the mtime sweep
+    path = repo / "errors" / "2026-02-01_import.md"
+    path.write_text(f"# Docker\n\n{DOCKER}\n", encoding="utf-8")
+    os.utime(path, ns=(0, 0))
+    assert client.is_duplicate(IMPORT_FIX_AGAIN, "errors") is None
+    assert client.is_duplicate(DOCKER, "errors")["path"] == "errors/2026-02-01_import.md"
+
+    # Removed files and missing categories
+    path.unlink()
+    assert client.is_duplicate(DOCKER, "errors") is None
+    assert client.is_duplicate(DOCKER, "design") is None
+    assert service.document_count == 1
+
+    with pytest.raises(ServiceError):
+        client.request("no_such_op")
+    client.close()
+
+
+def test_load_warms_configured_categories_only(tmp_path):
+    repo = tmp_path / "kb"
+    _write(repo, "errors/2026-02-01_import.md", f"# Import\n\n{IMPORT_FIX}\n")
+    _write(repo, "operations/2026-01-31_docker.md", f"# Docker\n\n{DOCKER}\n")
+    _write(repo, "node_modules/pkg/README.md", f"# Pkg\n\n{DOCKER}\n")
+
+    service = SimilarityService(str(repo), categories=["errors", "ops"])
+    service.load()
+    assert set(service._corpus) == {"errors"}
+
+    # Categories outside the configuration are still loaded on demand
+    assert service.is_duplicate(DOCKER, "operations")["path"] == "operations/2026-01-31_docker.md"
+    assert set(service._corpus) == {"errors", "operations"}
+
+
+def test_corpus_larger_than_cache_budget_is_not_reanalyzed(tmp_path):
+    repo = tmp_path / "kb"
+    for i in range(50):
+        _write(repo, f"errors/2026-01-{i % 28 + 1:02d}_note-{i}.md", f"# Note {i}\n\n{DOCKER} variant {i}\n")
+    _write(repo, "errors/2026-02-01_import.md", f"# Import\n\n{IMPORT_FIX}\n")
+
+    service = SimilarityService(str(repo), poll_interval=3600)
+    # Budget far below the corpus: cached lookups would evict and re-analyze every document
+    service.checker.analysis_cache = DocumentCache(max_bytes=1)
+    service.load()
+    held = {path: entry[2] for path, entry in service._category_files("errors").items()}
+
+    checker = SimilarityChecker(analysis_cache=DocumentCache())
+    for _ in range(3):
+        match = service.is_duplicate(IMPORT_FIX_AGAIN, "errors")
+        assert match["path"] == "errors/2026-02-01_import.md"
+        assert match["similarity"] == pytest.approx(checker.calculate_similarity(IMPORT_FIX_AGAIN, f"# Import\n\n{IMPORT_FIX}\n"))
+        assert service.is_duplicate("kubernetes ingress certificate rotation", "errors") is None
+
+    cache = service.checker.analysis_cache
+    assert (cache.hits, cache.misses) == (0, 0)
+    assert all(entry[2] is held[path] for path, entry in service._category_files("errors").items())
+
+
+def test_connect_falls_back_when_unavailable(tmp_path, running, monkeypatch):
+    repo, socket_path, _ = running
+    assert connect(socket_path=tmp_path / "missing.sock") is None
+    assert connect(str(tmp_path / "other-repo"), socket_path) is None
+
+    monkeypatch.setenv(similarity_service.SERVICE_ENV_VAR, "0")
+    assert connect(str(repo), socket_path) is None
+
+
+def test_creator_uses_service_and_falls_back(running):
+    repo, socket_path, _ = running
+    _write(repo, "errors/2026-02-01_import.md", f"# Import\n\n{IMPORT_FIX}\n")
+
+    creator = KnowledgeFileCreator(str(repo), similarity_service=connect(str(repo), socket_path))
+    assert creator._is_duplicate(IMPORT_FIX_AGAIN, "errors")
+    assert not creator._is_duplicate(DOCKER, "errors")
+
+    # A failing service is dropped and the check runs in-process
+    creator.similarity_service.close()
+    creator.search_index.update()
+    assert creator._is_duplicate(IMPORT_FIX_AGAIN, "errors")
+    assert creator.similarity_service is None
+
+
+def test_second_service_on_same_socket_is_refused(running):
+    repo, socket_path, _ = running
+    with pytest.raises(RuntimeError):
+        similarity_service.serve(SimilarityService(str(repo)), socket_path, idle_timeout=1)
+
+
+def test_foreign_socket_paths_are_refused(tmp_path, running, monkeypatch):
+    repo, socket_path, _ = running
+
+    # A regular file at the socket path is neither connected to nor replaced
+    squatted = tmp_path / "squatted.sock"
+    squatted.write_text("")
+    assert connect(socket_path=squatted) is None
+    with pytest.raises(RuntimeError, match="Refusing"):
+        similarity_service.serve(SimilarityService(str(repo)), squatted, idle_timeout=1)
+    assert squatted.exists()
+
+    # A socket owned by another user (simulated by changing our uid)
+    uid = os.getuid()
+    monkeypatch.setattr(os, "getuid", lambda: uid + 1)
+    assert connect(str(repo), socket_path) is None
+    with pytest.raises(RuntimeError, match="Refusing"):
+        similarity_service.serve(SimilarityService(str(repo)), socket_path, idle_timeout=1)
+    monkeypatch.setattr(os, "getuid", lambda: uid)
+    assert connect(str(repo), socket_path).ping()["documents"] == 1
+
+
+def test_default_socket_lives_in_private_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    socket_path = similarity_service.default_socket_path()
+    assert socket_path.parent == tmp_path / f"daily-knowledge-sync-{os.getuid()}"
+
+    repo = tmp_path / "kb"
+    _write(repo, "errors/2026-02-01_import.md", f"# Import\n\n{IMPORT_FIX}\n")
+    ready = threading.Event()
+    thread = threading.Thread(
+        target=similarity_service.serve, args=(SimilarityService(str(repo)),), kwargs={"ready": ready}, daemon=True
+    )
+    thread.start()
+    assert ready.wait(5)
+    assert socket_path.parent.stat().st_mode & 0o777 == 0o700
+    client = connect(str(repo))
+    client.request("shutdown")
+    client.close()
+    thread.join(5)
+
+    # A directory others can enter is not used
+    socket_path.parent.chmod(0o755)
+    with pytest.raises(RuntimeError, match="socket directory"):
+        similarity_service.serve(SimilarityService(str(repo)), idle_timeout=1)
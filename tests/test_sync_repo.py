@@ -0,0 +1,113 @@
+"""KnowledgeRepoSync tests against a local bare repository."""
+
+import subprocess
+
+import pytest
+
+from sync_repo import KnowledgeRepoSync
+
+CATEGORIES = ["errors", "patterns"]
+
+
+def _git(cwd, *args):
+    return subprocess.run(
+        ["git", *args], cwd=cwd, capture_output=True, text=True, check=True
+    ).stdout.strip()
+
+
+def _commit(worktree, relative, content, message):
+    path = worktree / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    _git(worktree, "add", relative)
+    _git(worktree, "commit", "-q", "-m", message)
+
+
+@pytest.fixture
+def remote(tmp_path, monkeypatch):
+    """Bare repository serving partial clones, plus a full clone acting as another machine."""
+    monkeypatch.setenv("GIT_CONFIG_GLOBAL", str(tmp_path / "gitconfig"))
+    monkeypatch.setenv("GIT_CONFIG_NOSYSTEM", "1")
+    for var in ("GIT_AUTHOR", "GIT_COMMITTER"):
+        monkeypatch.setenv(f"{var}_NAME", "Test")
+        monkeypatch.setenv(f"{var}_EMAIL", "test@example.com")
+
+    bare = tmp_path / "remote.git"
+    _git(tmp_path, "init", "-q", "--bare", "--initial-branch=main", str(bare))
+    _git(bare, "config", "uploadpack.allowFilter", "true")
+    _git(bare, "config", "uploadpack.allowAnySHA1InWant", "true")
+
+    other = tmp_path / "other"
+    _git(tmp_path, "clone", "-q", str(bare), str(other))
+    _git(other, "checkout", "-q", "-b", "main")
+    _commit(other, "README.md", "# Knowledge\n", "init")
+    _commit(other, "errors/2026-01-30_cors.md", "# CORS\n", "errors")
+    _commit(other, "drafts/large.bin", "x" * 100_000, "unrelated")
+    _git(other, "push", "-q", "origin", "main")
+
+    return {"url": f"file://{bare}", "other": other}
+
+
+def test_setup_clones_blobless_and_sparse(tmp_path, remote):
+    sync = KnowledgeRepoSync(str(tmp_path / "kb"), url=remote["url"], categories=CATEGORIES)
+    assert sync.setup() == "cloned"
+
+    repo = sync.repo_path
+    assert (repo / "README.md").exists()
+    assert (repo / "errors" / "2026-01-30_cors.md").exists()
+    assert not (repo / "drafts").exists()
+    assert _git(repo, "config", "remote.origin.partialclonefilter") == "blob:none"
+    assert sorted(_git(repo, "sparse-checkout", "list").split()) == [".index", "errors", "patterns"]
+
+    # Blobs outside the sparse paths were never downloaded
+    blob = _git(remote["other"], "rev-parse", "HEAD:drafts/large.bin")
+    missing = _git(repo, "rev-list", "--objects", "--missing=print", "HEAD")
+    assert f"?{blob}" in missing.split()
+
+
+def test_pull_fast_forwards_and_rebases_local_commits(tmp_path, remote):
+    sync = KnowledgeRepoSync(str(tmp_path / "kb"), url=remote["url"], categories=CATEGORIES)
+    sync.setup()
+    assert sync.pull() == "up-to-date"
+
+    _commit(remote["other"], "patterns/2026-01-31_di.md", "# DI\n", "patterns")
+    _git(remote["other"], "push", "-q", "origin", "main")
+    assert sync.pull() == "fast-forward"
+    assert (sync.repo_path / "patterns" / "2026-01-31_di.md").exists()
+
+    _commit(sync.repo_path, "errors/2026-02-01_local.md", "# Local\n", "local")
+    _commit(remote["other"], "errors/2026-02-01_remote.md", "# Remote\n", "remote")
+    _git(remote["other"], "push", "-q", "origin", "main")
+    assert sync.pull() == "rebased"
+    assert _git(sync.repo_path, "log", "--format=%s", "-2").split() == ["local", "remote"]
+
+
+def test_push_rebases_when_remote_moved(tmp_path, remote):
+    sync = KnowledgeRepoSync(str(tmp_path / "kb"), url=remote["url"], categories=CATEGORIES)
+    sync.setup()
+    assert sync.push() == 0
+
+    _commit(sync.repo_path, "errors/2026-02-01_local.md", "# Local\n", "local")
+    _commit(remote["other"], "patterns/2026-02-01_remote.md", "# Remote\n", "remote")
+    _git(remote["other"], "push", "-q", "origin", "main")
+
+    assert sync.push() == 1
+    _git(remote["other"], "pull", "-q", "--rebase", "origin", "main")
+    assert _git(remote["other"], "log", "--format=%s", "-2").split() == ["local", "remote"]
+    assert (remote["other"] / "errors" / "2026-02-01_local.md").exists()
+
+
+def test_setup_converts_existing_full_clone(tmp_path, remote):
+    full = tmp_path / "kb"
+    _git(tmp_path, "clone", "-q", remote["url"], str(full))
+    assert (full / "drafts" / "large.bin").exists()
+
+    sync = KnowledgeRepoSync(str(full), categories=CATEGORIES)
+    assert sync.setup() == "configured"
+    assert not (full / "drafts").exists()
+    assert _git(full, "config", "remote.origin.promisor") == "true"
+
+
+def test_setup_without_url_fails(tmp_path):
+    with pytest.raises(ValueError):
+        KnowledgeRepoSync(str(tmp_path / "kb"), categories=CATEGORIES).setup()
@@ -0,0 +1,105 @@
+"""IOThrottle tests for daily-knowledge-sync."""
+
+import gzip
+import json
+
+import pytest
+
+from extract_knowledge import KnowledgeExtractor
+from log_files import open_log
+from throttle import BYTES_PER_MB, IOThrottle, configure_background
+
+DATE = "2026-01-30"
+
+
+class FakeClock:
+    """Clock whose sleep advances time instantly."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def _throttle(rate, clock, load=0.0, burst_seconds=0.0):
+    return IOThrottle(
+        rate, clock=clock, sleep=clock.sleep, load_average=lambda: load, cpu_count=4, burst_seconds=burst_seconds
+    )
+
+
+def test_consume_caps_throughput():
+    clock = FakeClock()
+    throttle = _throttle(1 * BYTES_PER_MB, clock, burst_seconds=0.25)
+    start = clock.now
+    for _ in range(160):
+        throttle.consume(64 * 1024)
+
+    # 10 MB at 1 MB/s, minus the 0.25 s burst
+    assert clock.now - start == pytest.approx(9.75, abs=0.01)
+
+
+def test_pace_slows_down_under_load():
+    clock = FakeClock()
+    # Load 5.6 on 4 CPUs = 1.4 per CPU = twice the target
+    throttle = _throttle(1 * BYTES_PER_MB, clock, load=5.6)
+    throttle.consume(BYTES_PER_MB)
+    assert throttle.bytes_per_sec == BYTES_PER_MB / 2
+    assert clock.now - 1000.0 == pytest.approx(2.0)
+
+    start = clock.now
+    throttle.pause_between_files()
+    assert clock.now - start == pytest.approx(0.02)
+
+
+def test_extractor_read_rate_stays_under_cap(tmp_path):
+    # Mostly multi-byte text: the cap applies to bytes read from disk, not characters
+    text = "エラーの原因を解決する手順を実装しました。" * 60 + "detail " * 40
+    for session in range(5):
+        log = tmp_path / f"-work-repo{session}" / "session.jsonl"
+        log.parent.mkdir()
+        with open(log, "w") as f:
+            for minute in range(40):
+                entry = {
+                    "timestamp": f"{DATE}T10:{minute:02d}:00Z",
+                    "cwd": f"/work/repo{session}",
+                    "message": {"role": "assistant", "content": text},
+                }
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    corpus_bytes = sum(path.stat().st_size for path in tmp_path.rglob("*.jsonl"))
+
+    clock = FakeClock()
+    rate = 256 * 1024
+    throttle = _throttle(rate, clock)
+    extractor = KnowledgeExtractor(str(tmp_path), throttle=throttle)
+    start = clock.now
+    assert len(extractor.extract_for_date(DATE)) == 200
+
+    # Every byte is read at least once (the project path probe re-reads the first buffer)
+    elapsed = clock.now - start
+    assert corpus_bytes / elapsed <= rate
+    assert elapsed <= corpus_bytes * 1.1 / rate + 5 * 0.01
+
+
+@pytest.mark.parametrize("name", ["session.jsonl", "session.jsonl.gz"])
+def test_open_log_meters_bytes_read_from_disk(tmp_path, name):
+    text = "".join(json.dumps({"message": f"エラー {i}"}, ensure_ascii=False) + "\n" for i in range(2000))
+    log = tmp_path / name
+    log.write_bytes(gzip.compress(text.encode()) if name.endswith(".gz") else text.encode())
+
+    reads = []
+    with open_log(log, reads.append) as f:
+        assert f.read() == text
+    # Compressed logs are metered at their on-disk (compressed) size
+    assert sum(reads) == log.stat().st_size
+    assert f.closed
+
+
+def test_configure_background_options():
+    assert configure_background(False, None) is None
+    assert configure_background(False, 2).bytes_per_sec == 2 * BYTES_PER_MB
+    with pytest.raises(ValueError):
+        configure_background(False, -1)